@@ -19,7 +19,9 @@ from hyview.log import get_logger
 
 from hyview.plugins import rpc
 
-from hyview.app import app, build
+from hyview.app import app, build, build_many, build_lod, update, stats, \
+    profile
 from hyview.hy.init import start_houdini
 
-from hyview.interface import AttributeDefinition, Point, Geometry
+from hyview.interface import AttributeDefinition, Point, Geometry, \
+    GeometryStream, Sequence
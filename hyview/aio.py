@@ -0,0 +1,245 @@
+"""
+Asyncio interface for applications built on an asyncio event loop.
+
+The transport is built on gevent, and patching gevent into an asyncio loop
+isn't an option. Instead the app runs within its own thread and gevent hub,
+calls are handed over to it, and their results come back as asyncio futures.
+Loading data and building it in Houdini then overlap within the one loop.
+
+This isn't an asyncio-native transport: zerorpc's protocol is tied to gevent,
+and reimplementing it over an asyncio ZeroMQ socket was out of scope. The
+cost is a hop to the hub thread and back for every call, on the order of
+tens of microseconds plus the GIL contention of a second busy thread. That
+is negligible next to a build, but adds up for many small rpc calls, which
+are better batched, such as with `build_many`.
+
+Examples
+--------
+>>> import hyview.aio
+>>> async def main():
+...     geo = await load()
+...     name = await hyview.aio.build(geo, name='cells')
+...     nodes = await hyview.aio.rpc.all_nodes()
+
+Unlike the rest of the package, this module requires python 3.
+"""
+import asyncio
+import functools
+import threading
+
+from kids.cache import cache
+
+import gevent
+import gevent.event
+
+import hyview
+import hyview.plugins
+
+from typing import *
+
+
+_logger = hyview.get_logger(__name__)
+
+
+class Hub(object):
+    """
+    Thread running the gevent hub the app lives on. The app's greenlets are
+    bound to this hub, so all calls to it must go through `call`.
+    """
+    def __init__(self):
+        self._loop = None  # type: gevent.libev.corecext.loop
+        self._error = None  # type: Optional[BaseException]
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hyview')
+        self._thread.daemon = True
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        try:
+            self._loop = gevent.get_hub().loop
+            # Start the app on this thread.
+            hyview.app()
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        _logger.debug('Running the app on thread {!r}'.format(
+            self._thread.name))
+        # Keep the hub running for the life of the process.
+        gevent.event.Event().wait()
+
+    @staticmethod
+    def _resolve(future, value=None, error=None):
+        """
+        Resolve an asyncio future from the hub thread.
+
+        Parameters
+        ----------
+        future : asyncio.Future
+        value : Any
+        error : Optional[BaseException]
+        """
+        def _set():
+            if future.cancelled():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+        future.get_loop().call_soon_threadsafe(_set)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call a function within a greenlet on the hub.
+
+        Parameters
+        ----------
+        func : Callable
+        args : *Any
+        kwargs : **Any
+
+        Returns
+        -------
+        asyncio.Future
+            Future for the return value of `func`.
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        def _call():
+            try:
+                value = func(*args, **kwargs)
+            except BaseException as e:
+                self._resolve(future, error=e)
+            else:
+                self._resolve(future, value)
+
+        self._loop.run_callback_threadsafe(gevent.spawn, _call)
+        return future
+
+    def wait(self, result):
+        """
+        Wait for a gevent future from the app.
+
+        Parameters
+        ----------
+        result : gevent.event.AsyncResult
+
+        Returns
+        -------
+        asyncio.Future
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        def _done(x):
+            self._resolve(future, x.value, x.exception)
+
+        self._loop.run_callback_threadsafe(result.rawlink, _done)
+        return future
+
+
+@cache
+def hub():
+    """
+    Get the hub the app runs on, starting it on first use.
+
+    Note: This is a cached method with the intention of treating the hub like
+     a singleton. Don't mix it with `hyview.app` being used from another
+     thread.
+
+    Returns
+    -------
+    Hub
+    """
+    return Hub()
+
+
+async def call(func, *args, **kwargs):
+    """
+    Call a blocking hyview function on the hub, e.g. `hyview.stats`.
+
+    Parameters
+    ----------
+    func : Callable
+    args : *Any
+    kwargs : **Any
+
+    Returns
+    -------
+    Any
+    """
+    return await hub().call(func, *args, **kwargs)
+
+
+async def build(obj, name=None, frame=1):
+    """
+    Build a houdini object remotely. See `hyview.build`.
+
+    Examples
+    --------
+    >>> names = await asyncio.gather(
+    ...     *[hyview.aio.build(geo, name=name) for name, geo in geos])
+
+    Parameters
+    ----------
+    obj : Union[hyview.Geometry, hyview.Sequence]
+    name : Optional[str]
+        Unique identifier
+    frame : int
+        Represents time. Ignored for sequences.
+
+    Returns
+    -------
+    str
+        Name of the built node.
+    """
+    result = await hub().call(hyview.build, obj, name=name, frame=frame)
+    return await hub().wait(result)
+
+
+async def build_many(items):
+    """
+    Build many houdini objects remotely. See `hyview.build_many`.
+
+    Parameters
+    ----------
+    items : Iterable[Tuple[Optional[str], Union[hyview.Geometry, hyview.Sequence], int]]
+        The name, geometry and frame of each build.
+
+    Returns
+    -------
+    List[str]
+        Names of the built nodes, in order of `items`.
+    """
+    results = await hub().call(hyview.build_many, list(items))
+    return await asyncio.gather(*[hub().wait(x) for x in results])
+
+
+class RPCProxy(object):
+    """
+    Async proxies of the `hyview.rpc` registered methods.
+
+    Examples
+    --------
+    >>> await hyview.aio.rpc.clear()
+    """
+    def __getattr__(self, name):
+        if name not in hyview.plugins.RPC_METHODS:
+            raise AttributeError('No RPC method named {!r}'.format(name))
+
+        @functools.wraps(hyview.plugins.RPC_METHODS[name])
+        async def _call(*args, **kwargs):
+            return await hub().call(
+                hyview.plugins.call, name, *args, **kwargs)
+
+        return _call
+
+    def __dir__(self):
+        return sorted(hyview.plugins.RPC_METHODS)
+
+
+rpc = RPCProxy()
@@ -1,4 +1,9 @@
+import os
+import time
+import errno
+import collections
 import string
+import uuid
 import six
 
 import attr
@@ -6,11 +11,19 @@ import attr
 from kids.cache import cache
 
 import gevent
-from gevent.event import Event
+from gevent.event import AsyncResult, Event
 
+import hyview.cache
+import hyview.codec
+import hyview.compression
 import hyview.transport
-from hyview.constants import HOST, PORT, APP_PORT
+from hyview.constants import HOST, PORT, APP_PORT, CHUNK_SIZE, SHARED_DIR, \
+    QUANTIZE, REGIONS
 from hyview.c4 import C4
+import hyview.interface
+import hyview.lod
+import hyview.spatial
+import hyview.telemetry
 
 import hyview.hy.impl
 
@@ -20,75 +33,968 @@ from typing import *
 _logger = hyview.get_logger(__name__)
 
 
+def _offload(func, *args):
+    """
+    Run CPU-bound work, such as hashing or encoding geometry, on the hub's
+    threadpool. The calling greenlet waits for it, but the hub keeps serving
+    Houdini's pulls meanwhile.
+
+    Parameters
+    ----------
+    func : Callable
+    args : *Any
+
+    Returns
+    -------
+    Any
+        What `func` returned.
+    """
+    return gevent.get_hub().threadpool.apply(func, args)
+
+
+@attr.s
+class Build(object):
+    """
+    A geometry staged for Houdini to build.
+    """
+    name = attr.ib(type=str)
+    # C4 id of the geometry, which it is cached by.
+    key = attr.ib(type=str)
+    # Released once the geometry is known to be cached in Houdini.
+    geo = attr.ib(
+        type=Optional[Union['hyview.interface.Geometry',
+                            'hyview.interface.Sequence']],
+        repr=False)
+    frame = attr.ib(type=int, default=1)
+    # Frame numbers of a sequence, which are all built into one node.
+    frames = attr.ib(type=Optional[List[int]], default=None)
+    # Set once Houdini has finished cooking the geometry.
+    is_done = attr.ib(type=Event, default=attr.Factory(Event), repr=False)
+    # Future holding the name of the built node.
+    result = attr.ib(
+        type=AsyncResult, default=attr.Factory(AsyncResult), repr=False)
+    # File the geometry is memory-mapped from, if any.
+    mapped = attr.ib(type=Optional[str], default=None, repr=False)
+    # Changed columns of an update, see `hyview.codec.patch_layout`.
+    patch = attr.ib(
+        type=Optional[List[Dict[str, Any]]], default=None, repr=False)
+    # Timings of the build's stages on this end.
+    timer = attr.ib(
+        type=hyview.telemetry.Timer,
+        default=attr.Factory(hyview.telemetry.Timer), repr=False)
+    # Timings Houdini sent once done cooking.
+    remote = attr.ib(
+        type=Dict[str, Any], default=attr.Factory(dict), repr=False)
+
+
 class ApplicationInterface(object):
     """
     Object for streaming data to Houdini. This is the object hosted by the
     zerorpc.Server and is what Houdini will interface with for pulling data
-    between processes. There should only be one object "active" at a time
-    while it waits for Houdini to consume the object being built.
+    between processes.
+
+    Any number of builds can be staged at once. Each is keyed by its name,
+    which the Houdini python nodes provide to pull their geometry.
+
+    Geometry built from memory is kept by name, along with a spatial index
+    built on demand, so Houdini can pull just the points within a bounding
+    box. It's kept until another geometry is built with the same name, or
+    until it's one of the least recently used once more than `REGIONS` are
+    kept.
     """
     def __init__(self):
-        self._active = None  # type: hyview.interface.Geometry
-        self.is_done = Event()
+        self._builds = {}  # type: Dict[str, Build]
+        # Ordered from least to most recently used.
+        self._regions = collections.OrderedDict()  # type: Dict[str, hyview.spatial.IndexedGeometry]
+        # Transfer stats of the last build of each name.
+        self._stats = {}  # type: Dict[str, Dict[str, Any]]
+        # Mapped files which couldn't be removed yet, see `_unmap`.
+        self._stale = []  # type: List[str]
 
     def build(self, obj, name=None, frame=1):
         """
-        Build a houdini object remotely.
+        Build a houdini object remotely. This does not wait for Houdini to
+        build the geometry, see `build_many`.
+
+        Parameters
+        ----------
+        obj : Union[hyview.Geometry, hyview.Sequence]
+        name : Optional[str]
+            Unique identifier
+        frame : int
+            Ignored for sequences, which provide their own frames.
+
+        Returns
+        -------
+        gevent.event.AsyncResult
+            Future for the name of the built node.
+        """
+        return self.build_many([(name, obj, frame)])[0]
+
+    def build_many(self, items):
+        """
+        Build many houdini objects remotely. Builds of the same frame are
+        created by Houdini in one call. This does not wait for Houdini to
+        build the geometry.
+
+        Geometry is cached by the C4 id of its contents. Houdini is asked
+        which geometry it has cached up front, and those are never sent.
+        A sequence is only cached once all of its frames are.
+
+        Hashing, and later encoding, the geometry runs on the hub's
+        threadpool. Houdini's pulls are served by greenlets of the calling
+        thread's hub though, so builds only progress while the caller yields
+        to it, such as by waiting on the results with `get()`.
+
+        Parameters
+        ----------
+        items : Iterable[Tuple[Optional[str], Union[hyview.Geometry, hyview.Sequence], int]]
+            The name, geometry and frame of each build. The frame is ignored
+            for sequences.
+
+        Returns
+        -------
+        List[gevent.event.AsyncResult]
+            Futures for the names of the built nodes, in order of `items`.
+        """
+        builds = []
+        regions = []
+        for name, obj, frame in items:
+            if isinstance(obj, hyview.interface.Geometry):
+                # Geometry built from points is converted once rather than
+                # each time its columns are read, leaving the caller's as is.
+                obj = _offload(obj.columnar)
+            timer = hyview.telemetry.Timer()
+            with timer.stage('c4'):
+                key = str(_offload(C4, obj))
+            if name is not None:
+                # We want valid names for houdini.
+                assert isinstance(name, six.string_types)
+                assert name[0] in string.ascii_letters
+            elif name is None:
+                name = key
+
+            if name in self._builds or name in [x.name for x in builds]:
+                raise ValueError(
+                    'Build {!r} is already in progress'.format(name))
+
+            frames = None
+            if isinstance(obj, hyview.interface.Sequence):
+                frames = obj.numbers
+                if not frames:
+                    raise ValueError(
+                        'Sequence {!r} has no frames'.format(name))
+                frame = frames[0]
+
+            build = Build(
+                name=name, key=key, geo=obj, frame=frame, frames=frames,
+                timer=timer)
+            builds.append(build)
+            if isinstance(obj, hyview.interface.Geometry):
+                regions.append((build, obj))
+
+        if not builds:
+            return []
+
+        start = time.time()
+        existing = set(hyview.hy.impl.all_nodes())
+        for build in builds:
+            assert build.name not in existing
+
+        idents = dict(
+            (x.name, [hyview.cache.ident(x.key, f)
+                      for f in x.frames or [x.frame]])
+            for x in builds)
+        cached = set(hyview.hy.impl.cached(
+            [x for v in idents.values() for x in v]))
+        for build in builds:
+            build.timer.since('preflight', start)
+            if cached.issuperset(idents[build.name]):
+                _logger.debug('Using cache for {!r}'.format(build.name))
+                build.geo = None
+
+        for build in builds:
+            _logger.debug('Starting build {!r}'.format(build.name))
+            self._builds[build.name] = build
+            self._regions.pop(build.name, None)
+            self._stats.pop(build.name, None)
+
+        for build, obj in regions:
+            self._keep_region(build.name, hyview.spatial.IndexedGeometry(
+                obj, key=build.key))
+
+        gevent.spawn(self._run, builds)
+        return [x.result for x in builds]
+
+    def build_lod(self, obj, name=None, frame=1, levels=hyview.lod.LEVELS,
+                  method=hyview.lod.METHOD_RANDOM):
+        """
+        Build a geometry progressively from a pyramid of levels of detail.
+        The coarsest level is built first and the node is then refined with
+        each finer level. This does not wait for Houdini to build the
+        geometry.
 
         Parameters
         ----------
         obj : hyview.Geometry
         name : Optional[str]
             Unique identifier
+        frame : int
+        levels : Iterable[int]
+            See `hyview.lod.pyramid`.
+        method : str
+            See `hyview.lod.METHODS`.
+
+        Returns
+        -------
+        gevent.event.AsyncResult
+            Future for the name of the built node, set once the finest level
+            is built.
+        """
+        geos = hyview.lod.pyramid(obj, levels=levels, method=method)
+        first = self.build(geos[0], name=name, frame=frame)
+        result = AsyncResult()
+        gevent.spawn(self._refine, first, geos[1:], frame, result)
+        return result
+
+    def _refine(self, first, geos, frame, result):
+        """
+        Refine a built node with each geometry in turn.
+
+        Parameters
+        ----------
+        first : gevent.event.AsyncResult
+            Future for the name of the node to refine.
+        geos : List[hyview.Geometry]
+        frame : int
+        result : gevent.event.AsyncResult
+        """
+        try:
+            name = first.get()
+            for geo in geos:
+                timer = hyview.telemetry.Timer()
+                with timer.stage('c4'):
+                    key = str(_offload(C4, geo))
+                build = Build(
+                    name=name, key=key, geo=geo, frame=frame, timer=timer)
+                with timer.stage('preflight'):
+                    cached = hyview.hy.impl.cached(
+                        [hyview.cache.ident(key, frame)])
+                if cached:
+                    _logger.debug('Using cache for {!r}'.format(name))
+                    build.geo = None
+
+                _logger.debug('Refining build {!r}'.format(name))
+                self._builds[name] = build
+                self._keep_region(
+                    name, hyview.spatial.IndexedGeometry(geo, key=key))
+                self._stats.pop(name, None)
+                try:
+                    with timer.stage('create'):
+                        hyview.hy.impl.refine(name, key, frame)
+                    timer.mark('created')
+                    build.is_done.wait()
+                    with timer.stage('sync'):
+                        hyview.hy.impl.sync_complete(name)
+                    self._finish(build)
+                finally:
+                    self._release(build)
+        except Exception as e:
+            result.set_exception(e)
+        else:
+            _logger.debug('Done refining {!r}'.format(name))
+            result.set(name)
+
+    def update(self, name, columns, frame=1):
+        """
+        Update attributes of an existing geometry in place. Only the points
+        of each column which changed are sent, and Houdini patches them into
+        the geometry it already has cached. This does not wait for Houdini
+        to update the geometry.
+
+        The geometry must have been built from memory by this application.
+
+        Parameters
+        ----------
+        name : str
+        columns : Dict[str, numpy.ndarray]
+            Point attribute values by attribute name. New attributes are
+            added.
+        frame : int
+
+        Returns
+        -------
+        gevent.event.AsyncResult
+            Future for the name of the updated node.
         """
-        if name is not None:
-            # We want valid names for houdini.
-            assert isinstance(name, six.string_types)
-            assert name[0] in string.ascii_letters
-        elif name is None:
-            name = str(C4(obj))
+        try:
+            region = self._region(name)
+        except KeyError:
+            raise KeyError('No geometry named {!r} to update'.format(name))
+        if name in self._builds:
+            raise ValueError('Build {!r} is already in progress'.format(name))
+
+        if hyview.codec.POSITION in columns:
+            raise ValueError('Positions can not be updated')
+
+        timer = hyview.telemetry.Timer()
+        old = region.geo
+        geo = old.with_columns(columns)
+        with timer.stage('c4'):
+            key = str(_offload(C4, geo))
+
+        ranges = {}
+        for k in columns:
+            changed = hyview.codec.changed_range(
+                old.columns.get(k), geo.columns[k])
+            if changed is not None:
+                ranges[k] = changed
 
-        assert name not in hyview.hy.impl.all_nodes()
+        build = Build(name=name, key=key, geo=geo, frame=frame, timer=timer)
+        build.patch = hyview.codec.patch_layout(geo, ranges)
 
-        _logger.debug('Starting build {!r}'.format(name))
+        _logger.debug('Starting update {!r}'.format(name))
+        self._builds[name] = build
+        self._keep_region(name, region.with_geometry(geo, key=key))
+        self._stats.pop(name, None)
 
-        self._active = obj
+        gevent.spawn(self._update, build, region.key)
+        return build.result
 
-        hyview.hy.impl.create(name, frame)
+    def _update(self, build, base):
+        """
+        Have Houdini patch a geometry and wait for it to finish.
+
+        Parameters
+        ----------
+        build : Build
+        base : str
+            C4 id of the geometry being patched.
+        """
+        name = build.name
+        timer = build.timer
+        try:
+            ident = hyview.cache.ident(build.key, build.frame)
+            with timer.stage('preflight'):
+                cached = build.key == base or hyview.hy.impl.cached([ident])
+            with timer.stage('create'):
+                if cached:
+                    _logger.debug('Using cache for {!r}'.format(name))
+                    build.geo = None
+                    hyview.hy.impl.refine(name, build.key, build.frame)
+                elif not hyview.hy.impl.patch(
+                        name, build.key, base, build.frame):
+                    # Houdini no longer has the geometry to patch.
+                    _logger.debug('Rebuilding {!r}'.format(name))
+                    build.patch = None
+                    hyview.hy.impl.refine(name, build.key, build.frame)
+            timer.mark('created')
+            build.is_done.wait()
+            with timer.stage('sync'):
+                hyview.hy.impl.sync_complete(name)
+            self._finish(build)
+        except Exception as e:
+            build.result.set_exception(e)
+        else:
+            _logger.debug('Done updating {!r}'.format(name))
+            build.result.set(name)
+        finally:
+            self._release(build)
 
-        # block until complete is called
-        self.is_done.wait()
+    def _run(self, builds):
+        """
+        Have Houdini build the geometries and wait for them to finish.
+
+        Parameters
+        ----------
+        builds : List[Build]
+        """
+        names = [x.name for x in builds]
 
-        hyview.hy.impl.sync_complete(name)
+        frames = {}
+        for build in builds:
+            frames.setdefault(build.frame, []).append(build)
 
-        _logger.debug('Done building {!r}'.format(name))
+        try:
+            for frame in sorted(frames):
+                start = time.time()
+                hyview.hy.impl.create_many(
+                    [x.name for x in frames[frame]], frame,
+                    keys=[x.key for x in frames[frame]],
+                    frames=[x.frames for x in frames[frame]])
+                for build in frames[frame]:
+                    build.timer.since('create', start)
+                    build.timer.mark('created')
+
+            # block until complete is called
+            for build in builds:
+                build.is_done.wait()
+
+            start = time.time()
+            hyview.hy.impl.sync_complete_many(names)
+            for build in builds:
+                build.timer.since('sync', start)
+                self._finish(build)
+        except Exception as e:
+            for build in builds:
+                build.result.set_exception(e)
+        else:
+            for build in builds:
+                _logger.debug('Done building {!r}'.format(build.name))
+                build.result.set(build.name)
+        finally:
+            for build in builds:
+                self._release(build)
+
+    def _release(self, build):
+        """
+        Parameters
+        ----------
+        build : Build
+        """
+        self._builds.pop(build.name, None)
+        self._unmap(build)
+
+    def _unmap(self, build):
+        """
+        Remove the file a build is memory-mapped from. This never raises, as
+        it's called while releasing builds whatever their outcome.
+
+        A file which can't be removed yet, such as on Windows while Houdini
+        still has it mapped, is tried again whenever another one is removed.
+
+        Parameters
+        ----------
+        build : Build
+        """
+        if build.mapped is not None:
+            self._stale.append(build.mapped)
+            build.mapped = None
+
+        stale = []
+        for path in self._stale:
+            try:
+                os.remove(path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    _logger.debug('Could not remove {!r} yet: {}'.format(
+                        path, e))
+                    stale.append(path)
+        self._stale = stale
+
+    def _get(self, name):
+        """
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        Build
+        """
+        try:
+            build = self._builds[name]
+        except KeyError:
+            raise KeyError('No build named {!r}'.format(name))
+        if build.geo is None:
+            raise KeyError('Build {!r} is cached'.format(name))
+        return build
+
+    def _region(self, name):
+        """
+        Get a kept geometry, marking it as the most recently used.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        hyview.spatial.IndexedGeometry
+        """
+        region = self._regions.pop(name)
+        self._regions[name] = region
+        return region
+
+    def _keep_region(self, name, region):
+        """
+        Keep a geometry as the most recently used, dropping the least
+        recently used ones beyond `REGIONS`. Those of builds in progress are
+        never dropped.
+
+        Parameters
+        ----------
+        name : str
+        region : hyview.spatial.IndexedGeometry
+        """
+        self._regions.pop(name, None)
+        self._regions[name] = region
+        for k in list(self._regions):
+            if len(self._regions) <= REGIONS:
+                break
+            if k not in self._builds:
+                _logger.debug('Dropping the geometry of {!r}'.format(k))
+                del self._regions[k]
+
+    def _geometry(self, name, frame=None, bbox=None):
+        """
+        Parameters
+        ----------
+        name : str
+        frame : Optional[int]
+            Frame of a sequence.
+        bbox : Optional[Iterable[Iterable[float]]]
+            Crop to the points within a bounding box. See `hyview.spatial`.
+
+        Returns
+        -------
+        Union[hyview.Geometry, hyview.GeometryStream]
+        """
+        if bbox is not None:
+            try:
+                region = self._region(name)
+            except KeyError:
+                raise KeyError('No geometry named {!r} to crop'.format(name))
+            return region.crop(bbox)
+
+        geo = self._get(name).geo
+        if isinstance(geo, hyview.interface.Sequence):
+            if frame is None:
+                raise KeyError('Build {!r} is a sequence'.format(name))
+            return geo.get(frame)
+        return geo
+
+    def stats(self, name):
+        """
+        Get the transfer stats and timings of the last build of a geometry.
+        Stats add up over every transfer of the build, such as each frame of
+        a sequence.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        Dict[str, Any]
+            mode : str
+                Transfer mode, see `hyview.codec`.
+            compression : Optional[str]
+                Compressor of the chunks, see `hyview.compression`.
+            quantized : List[str]
+                Columns sent with lossy encodings.
+            bytes : int
+                Size of the geometry data sent, before encoding.
+            sent : int
+                Size of the data actually sent.
+            points : int
+                Number of points sent.
+            seconds : float
+                Time from the start of the build until it was done.
+            points_per_second : float
+            stages : Dict[str, float]
+                Seconds spent in each stage on this end: `c4` naming the
+                geometry, `preflight` checking the existing nodes and cache,
+                `create` creating the nodes, `wait` until Houdini started
+                cooking, `transfer` from then until it was done cooking and
+                `sync` removing the python nodes.
+            houdini : Dict[str, float]
+                Seconds spent in each stage within Houdini: `negotiate`,
+                `receive` waiting on the data, `build` building it and
+                `write` writing the cache.
+            peak_memory : Optional[int]
+                Peak memory of this process in bytes.
+            houdini_peak_memory : Optional[int]
+                Peak memory of Houdini in bytes.
+        """
+        try:
+            return dict(self._stats[name])
+        except KeyError:
+            raise KeyError('No stats for {!r}'.format(name))
+
+    def _stats_for(self, name):
+        """
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        return self._stats.setdefault(
+            name, {'bytes': 0, 'sent': 0, 'points': 0})
+
+    def _record(self, name, mode, count, compression=None, layout=None):
+        """
+        Record the negotiated transfer of a geometry.
+
+        Parameters
+        ----------
+        name : str
+        mode : str
+        count : int
+            Number of points transferred.
+        compression : Optional[str]
+        layout : Optional[List[Dict[str, Any]]]
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        stats = self._stats_for(name)
+        stats['points'] += count
+        stats['mode'] = mode
+        stats['compression'] = compression
+        stats['quantized'] = [
+            x['name'] for x in layout or [] if 'encoding' in x]
+        return stats
+
+    def _finish(self, build):
+        """
+        Combine the timings of both ends of a finished build into its stats
+        and emit them. See `hyview.telemetry`.
+
+        Parameters
+        ----------
+        build : Build
+        """
+        timer = build.timer
+        created = timer.marks.get('created', timer.started)
+        completed = timer.marks.get('completed', time.time())
+        pulled = timer.marks.get('pulled')
+        # Houdini may start cooking before the create call returns.
+        if pulled is None:
+            timer.add('wait', max(0.0, completed - created))
+        else:
+            timer.add('wait', max(0.0, pulled - created))
+            timer.add('transfer', max(0.0, completed - max(pulled, created)))
 
-    def complete(self):
-        self.is_done.set()
-        self.is_done.clear()
-        self._active = None
+        seconds = timer.elapsed()
+        stats = self._stats_for(build.name)
+        stats.update({
+            'seconds': seconds,
+            'points_per_second': stats['points'] / seconds if seconds else 0.0,
+            'stages': dict(timer.stages),
+            'houdini': dict(build.remote.get('stages', {})),
+            'peak_memory': hyview.telemetry.peak_memory(),
+            'houdini_peak_memory': build.remote.get('peak_memory'),
+        })
+        hyview.telemetry.emit(dict(
+            stats, name=build.name, key=build.key,
+            frames=build.frames or [build.frame], cached=build.geo is None,
+            started=timer.started))
 
-    def iter_attributes(self):
+    def builds(self):
+        """
+        Get the names of all builds in progress.
+
+        Returns
+        -------
+        List[str]
+        """
+        return sorted(self._builds)
+
+    def complete(self, name, telemetry=None):
+        """
+        Called by Houdini once the geometry is cooked.
+
+        Parameters
+        ----------
+        name : str
+        telemetry : Optional[Dict[str, Any]]
+            stages : Dict[str, float]
+                Seconds Houdini spent in each stage.
+            peak_memory : Optional[int]
+        """
+        try:
+            build = self._builds[name]
+        except KeyError:
+            raise KeyError('No build named {!r}'.format(name))
+        build.timer.mark('completed')
+        build.remote = telemetry or {}
+        build.is_done.set()
+
+    def bounds(self, name):
+        """
+        Get the bounding box of a geometry built from memory.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        List[List[float]]
+            The lower and upper corners.
+        """
+        try:
+            index = self._region(name).index
+        except KeyError:
+            raise KeyError('No geometry named {!r} to crop'.format(name))
+        return [index.lower.tolist(), index.upper.tolist()]
+
+    def iter_attributes(self, name, frame=None, bbox=None):
         """
         Yield all custom attributes of the geometry.
 
+        Parameters
+        ----------
+        name : str
+        frame : Optional[int]
+            Frame of a sequence.
+        bbox : Optional[Iterable[Iterable[float]]]
+            Only the points within a bounding box.
+
         Returns
         -------
         Iterator[Dict[str, Any]]
         """
-        for x in self._active.attributes:
+        for x in self._geometry(name, frame, bbox).attributes:
             yield attr.asdict(x)
 
-    def iter_points(self):
+    def iter_points(self, name, frame=None, bbox=None):
         """
         Yield all the points of the geometry.
 
+        Parameters
+        ----------
+        name : str
+        frame : Optional[int]
+            Frame of a sequence.
+        bbox : Optional[Iterable[Iterable[float]]]
+            Only the points within a bounding box.
+
         Returns
         -------
         Iterator[Dict[str, Any]]
+            The `x`, `y` and `z` position and `attrs` values of each point,
+            built from the blocks of `iter_point_blocks`.
         """
-        for x in self._active.points:
-            yield attr.asdict(x)
+        for block in self.iter_point_blocks(name, CHUNK_SIZE, frame, bbox):
+            columns = block['columns']
+            for i, (x, y, z) in enumerate(block['positions']):
+                yield {
+                    'x': x, 'y': y, 'z': z,
+                    'attrs': dict((k, v[i]) for k, v in columns.items()),
+                }
+
+    def iter_point_blocks(self, name, chunk_size, frame=None, bbox=None):
+        """
+        Yield the points of the geometry in blocks of plain values. This is
+        how geometry with columns that have no binary representation, such
+        as strings, is sent.
+
+        Parameters
+        ----------
+        name : str
+        chunk_size : int
+        frame : Optional[int]
+            Frame of a sequence.
+        bbox : Optional[Iterable[Iterable[float]]]
+            Only the points within a bounding box.
+
+        Returns
+        -------
+        Iterator[Dict[str, Any]]
+            Blocks holding the `start` and `count` of their points, their
+            `positions` as [x, y, z] lists and the `columns` of their values
+            by attribute name.
+        """
+        geo = self._geometry(name, frame, bbox)
+        names = sorted(x.name for x in geo.point_attributes)
+        for start, columns in hyview.codec.iter_blocks(geo, chunk_size):
+            positions = columns[0]
+            yield {
+                'start': start,
+                'count': len(positions),
+                'positions': positions.tolist(),
+                'columns': dict(
+                    (k, v.tolist()) for k, v in zip(names, columns[1:])),
+            }
+
+    def iter_points_in_box(self, name, bbox):
+        """
+        Yield the points of the geometry within a bounding box. The points
+        are found with a spatial index rather than testing every point.
+
+        Parameters
+        ----------
+        name : str
+        bbox : Iterable[Iterable[float]]
+            The lower and upper corners.
+
+        Returns
+        -------
+        Iterator[Dict[str, Any]]
+        """
+        return self.iter_points(name, bbox=bbox)
+
+    def negotiate(self, name, options, frame=None):
+        """
+        Agree on how the geometry is transferred. Houdini provides the
+        transfer modes it supports and the application picks one.
+
+        Parameters
+        ----------
+        name : str
+        options : Dict[str, Any]
+            modes : List[str]
+                Supported transfer modes, see `hyview.codec`.
+            chunk_size : Optional[int]
+                Preferred number of points per chunk.
+            bbox : Optional[List[List[float]]]
+                Only transfer the points within a bounding box.
+            compressions : Optional[List[str]]
+                Compressors Houdini can decompress chunks with.
+            quantize : Optional[bool]
+                Whether Houdini can decode quantized columns.
+        frame : Optional[int]
+            Frame of a sequence.
+
+        Returns
+        -------
+        Dict[str, Any]
+            mode : str
+            chunk_size : int
+                Only for the chunked mode.
+            compression : Optional[str]
+                Only for the chunked mode. See `hyview.compression`.
+            count : int
+                Only for the chunked and mapped modes.
+            layout : List[Dict[str, Any]]
+                Only for the chunked and mapped modes. See
+                `hyview.codec.layout`.
+            path : str
+                Only for the mapped mode. File to map the columns from.
+        """
+        bbox = options.get('bbox')
+        geo = self._geometry(name, frame, bbox)
+        if bbox is None:
+            self._get(name).timer.mark('pulled')
+        modes = options.get('modes', [hyview.codec.MODE_POINTS])
+
+        # Crops are small and short lived, so they're never mapped.
+        if bbox is None \
+                and hyview.codec.MODE_MAPPED in modes \
+                and hyview.codec.is_local(HOST) \
+                and hyview.codec.supports(geo):
+            build = self._get(name)
+            if build.mapped is not None and build.frames:
+                # Each frame of a sequence gets a new file, as Houdini may
+                # still have the previous one mapped.
+                self._unmap(build)
+            if build.mapped is None:
+                build.mapped = os.path.join(
+                    SHARED_DIR, 'hyview-{}.bin'.format(uuid.uuid4().hex))
+            layout = _offload(hyview.codec.write_mapped, geo, build.mapped)
+            stats = self._record(name, hyview.codec.MODE_MAPPED, geo.count)
+            stats['bytes'] += sum(x['stride'] * geo.count for x in layout)
+            return {
+                'mode': hyview.codec.MODE_MAPPED,
+                'path': build.mapped,
+                'count': geo.count,
+                'layout': layout,
+            }
+
+        if hyview.codec.MODE_CHUNKED in modes and hyview.codec.supports(geo):
+            layout = hyview.codec.layout(geo)
+            if QUANTIZE and options.get('quantize'):
+                layout = hyview.codec.quantize(
+                    layout, bounds=_offload(hyview.codec.bounds, geo))
+            compression = hyview.compression.choose(
+                options.get('compressions') or [],
+                remote=not hyview.codec.is_local(HOST))
+            self._record(
+                name, hyview.codec.MODE_CHUNKED, geo.count,
+                compression=compression, layout=layout)
+            return {
+                'mode': hyview.codec.MODE_CHUNKED,
+                'chunk_size': options.get('chunk_size') or CHUNK_SIZE,
+                'compression': compression,
+                'count': geo.count,
+                'layout': layout,
+            }
+
+        self._record(name, hyview.codec.MODE_POINTS, geo.count)
+        return {'mode': hyview.codec.MODE_POINTS}
+
+    def patch_layout(self, name):
+        """
+        Describe the changed columns of an update.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            See `hyview.codec.patch_layout`.
+        """
+        build = self._get(name)
+        if build.patch is None:
+            raise KeyError('Build {!r} is not an update'.format(name))
+        build.timer.mark('pulled')
+        return build.patch
+
+    def iter_patch(self, name, chunk_size):
+        """
+        Yield the changed points of each column of an update packed into
+        binary chunks.
+
+        Parameters
+        ----------
+        name : str
+        chunk_size : int
+
+        Returns
+        -------
+        Iterator[Dict[str, Any]]
+        """
+        build = self._get(name)
+        stats = self._stats_for(name)
+        for x in hyview.codec.iter_patch_chunks(
+                build.geo, self.patch_layout(name), chunk_size):
+            # Patches aren't compressed, so both counts are the same.
+            stats['bytes'] += len(x['data'])
+            stats['sent'] += len(x['data'])
+            yield x
+
+    def iter_chunks(self, name, chunk_size, frame=None, bbox=None,
+                    layout=None, compression=None):
+        """
+        Yield all the points of the geometry packed into binary chunks.
+
+        Parameters
+        ----------
+        name : str
+        chunk_size : int
+        frame : Optional[int]
+            Frame of a sequence.
+        bbox : Optional[Iterable[Iterable[float]]]
+            Only the points within a bounding box.
+        layout : Optional[List[Dict[str, Any]]]
+            The negotiated layout.
+        compression : Optional[str]
+            The negotiated compressor.
+
+        Returns
+        -------
+        Iterator[Dict[str, Any]]
+        """
+        geo = self._geometry(name, frame, bbox)
+        stats = self._stats_for(name)
+        chunks = hyview.codec.iter_chunks(
+            geo, chunk_size, entries=layout, compression=compression)
+        while True:
+            # Each chunk is encoded and compressed off the hub.
+            x = _offload(next, chunks, None)
+            if x is None:
+                break
+            stats['bytes'] += x['size']
+            stats['sent'] += len(x['data'])
+            yield x
 
 
 class App(object):
@@ -107,7 +1013,7 @@ class App(object):
 
         self._thread = None  # type: gevent.Greenlet
         self.server = None  # type: hyview.transport.Server
-        self.client = None  # type: hyview.transport.Client
+        self.pool = None  # type: hyview.transport.Pool
         self.start()
 
     def __enter__(self):
@@ -117,9 +1023,10 @@ class App(object):
         self.stop()
 
     def start(self):
-        # TODO: confirm it's connected
-        self.client = hyview.transport.Client()
-        self.client.connect('tcp://{}:{}'.format(HOST, APP_PORT))
+        # Connections to Houdini are made as needed and reconnected if it's
+        # restarted.
+        self.pool = hyview.transport.Pool(
+            'tcp://{}:{}'.format(HOST, APP_PORT))
 
         self.server = hyview.transport.Server(self.interface)
         self.server.bind('tcp://{}:{}'.format(HOST, PORT))
@@ -130,7 +1037,8 @@ class App(object):
         self._thread.join()
         self._thread = None
         self.server = None
-        self.client = None
+        self.pool.close()
+        self.pool = None
 
 
 @cache
@@ -152,6 +1060,79 @@ def build(obj, name=None, frame=1):
     """
     Build a houdini object remotely.
 
+    Builds run concurrently, so more geometry can be prepared while Houdini
+    cooks. Call `get()` on the result to wait for the build to finish.
+
+    Houdini pulls the geometry from greenlets of the calling thread's gevent
+    hub, which only run while the caller yields to it, such as when waiting
+    on a result or sleeping with `gevent.sleep`. Long CPU-bound work between
+    builds stalls them, so run it on `gevent.get_hub().threadpool`, as
+    hashing and encoding the geometry already are.
+
+    Examples
+    --------
+    >>> futures = [hyview.build(geo, name=name) for name, geo in geos]
+    >>> names = [x.get() for x in futures]
+
+    A `hyview.Sequence` is built into a single node with a frame for each of
+    its geometries.
+
+    Parameters
+    ----------
+    obj : Union[hyview.Geometry, hyview.Sequence]
+    name : Optional[str]
+        Unique identifier
+    frame : int
+        Represents time. Ignored for sequences.
+
+    Returns
+    -------
+    gevent.event.AsyncResult
+        Future for the name of the built node.
+    """
+    return app().interface.build(obj, name=name, frame=frame)
+
+
+def build_many(items):
+    """
+    Build many houdini objects remotely.
+
+    All builds of the same frame are created in Houdini with a single call,
+    which is far cheaper than calling `build` for each when there are many
+    small pieces.
+
+    Examples
+    --------
+    >>> futures = hyview.build_many(
+    ...     (name, geo, 1) for name, geo in geos)
+    >>> names = [x.get() for x in futures]
+
+    Parameters
+    ----------
+    items : Iterable[Tuple[Optional[str], Union[hyview.Geometry, hyview.Sequence], int]]
+        The name, geometry and frame of each build. The frame is ignored for
+        sequences.
+
+    Returns
+    -------
+    List[gevent.event.AsyncResult]
+        Futures for the names of the built nodes, in order of `items`.
+    """
+    return app().interface.build_many(items)
+
+
+def build_lod(obj, name=None, frame=1, levels=hyview.lod.LEVELS,
+              method=hyview.lod.METHOD_RANDOM):
+    """
+    Build a large geometry progressively from levels of detail.
+
+    The coarsest level shows up in Houdini almost immediately, and the same
+    node is then refined as each finer level arrives.
+
+    Examples
+    --------
+    >>> hyview.build_lod(geo, name='cloud', levels=(64, 8, 1)).get()
+
     Parameters
     ----------
     obj : hyview.Geometry
@@ -159,5 +1140,94 @@ def build(obj, name=None, frame=1):
         Unique identifier
     frame : int
         Represents time.
+    levels : Iterable[int]
+        Fraction of the points kept by each level, as a denominator. See
+        `hyview.lod.pyramid`.
+    method : str
+        How points are picked. See `hyview.lod.METHODS`.
+
+    Returns
+    -------
+    gevent.event.AsyncResult
+        Future for the name of the built node, set once the finest level is
+        built.
+    """
+    return app().interface.build_lod(
+        obj, name=name, frame=frame, levels=levels, method=method)
+
+
+def update(name, attributes, frame=1):
+    """
+    Update point attributes of a built geometry in place.
+
+    Only the changed points of the changed attributes are sent to Houdini,
+    so recoloring a million points costs one column rather than a rebuild.
+
+    Examples
+    --------
+    >>> hyview.build(geo, name='cloud').get()
+    >>> hyview.update('cloud', attributes={'Cd': colors}).get()
+
+    Parameters
+    ----------
+    name : str
+        Name of a geometry built from memory.
+    attributes : Dict[str, numpy.ndarray]
+        Point attribute values by attribute name.
+    frame : int
+        Represents time.
+
+    Returns
+    -------
+    gevent.event.AsyncResult
+        Future for the name of the updated node.
+    """
+    return app().interface.update(name, attributes, frame=frame)
+
+
+def stats(name):
+    """
+    Get the transfer stats of the last build of a geometry, such as how
+    much data was sent, how it was compressed and how long each stage of the
+    build took.
+
+    Parameters
+    ----------
+    name : str
+
+    Returns
+    -------
+    Dict[str, Any]
+        See `ApplicationInterface.stats`.
+    """
+    return app().interface.stats(name)
+
+
+def profile(houdini=False, reset=False):
+    """
+    Get the profile of the rpc calls served by this application, or by
+    Houdini. Calls are only profiled on an end started with `HYVIEW_PROFILE`
+    set, see `hyview.profiling`.
+
+    Examples
+    --------
+    >>> stats = hyview.profile(houdini=True)
+    >>> stats['create']['p99']
+
+    Parameters
+    ----------
+    houdini : bool
+        Get the profile of Houdini's server.
+    reset : bool
+        Start over once the stats are taken.
+
+    Returns
+    -------
+    Optional[Dict[str, Dict[str, Any]]]
+        Stats of each method by name, or None when profiling is off. See
+        `hyview.profiling.MethodStats.to_dict`.
     """
-    app().interface.build(obj, name=name, frame=frame)
+    if houdini:
+        with app().pool.connection() as c:
+            return c._hyview_profile(reset)
+    return app().server._hyview_profile(reset)
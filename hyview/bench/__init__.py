@@ -0,0 +1,3 @@
+"""
+Benchmarks and tools for measuring hyview without a running Houdini.
+"""
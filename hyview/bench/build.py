@@ -0,0 +1,215 @@
+"""
+Compare building geometry point by point against building it in bulk from
+chunks or from a memory-mapped file.
+
+Both builds run against the `hou` stand-in from `hyview.bench.fakehou`, so
+the timings measure the work hyview does around the geometry calls rather
+than Houdini itself.
+
+Examples
+--------
+$ python -m hyview.bench.build 10000 100000 1000000
+"""
+import os
+import sys
+import time
+import uuid
+
+import attr
+import numpy
+
+import hyview.codec
+import hyview.bench.fakehou
+from hyview.constants import CHUNK_SIZE, SHARED_DIR
+from hyview.interface import AttributeDefinition, Geometry
+
+from typing import *
+
+
+COUNTS = (10000, 100000, 1000000)
+
+
+def get_geo(count, seed=0):
+    """
+    Get a geometry with random positions and colors.
+
+    Parameters
+    ----------
+    count : int
+    seed : int
+
+    Returns
+    -------
+    hyview.Geometry
+    """
+    random = numpy.random.RandomState(seed)
+    return Geometry.from_arrays(
+        random.random_sample((count, 3)) * 100,
+        columns={
+            'Cd': random.random_sample((count, 3)),
+            'id': numpy.arange(count, dtype=numpy.int32),
+        },
+        attributes=[
+            AttributeDefinition(
+                name='Cd', type='Point', default=(0.1, 0.1, 0.1)),
+            AttributeDefinition(
+                name='id', type='Point', default=0),
+        ])
+
+
+def build_points(geo):
+    """
+    Build with the per point stream.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+
+    Returns
+    -------
+    hyview.bench.fakehou.Geometry
+    """
+    import hyview.hy.impl
+
+    with hyview.bench.fakehou.installed() as hou:
+        result = hou.Geometry()
+        hyview.hy.impl.build(
+            result,
+            (attr.asdict(x) for x in geo.attributes),
+            (attr.asdict(x) for x in geo.points))
+    return result
+
+
+def build_chunks(geo, chunk_size=CHUNK_SIZE):
+    """
+    Build with the chunked stream.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+    chunk_size : int
+
+    Returns
+    -------
+    hyview.bench.fakehou.Geometry
+    """
+    import hyview.hy.impl
+
+    info = {
+        'mode': hyview.codec.MODE_CHUNKED,
+        'chunk_size': chunk_size,
+        'count': geo.count,
+        'layout': hyview.codec.layout(geo),
+    }
+
+    with hyview.bench.fakehou.installed() as hou:
+        result = hou.Geometry()
+        hyview.hy.impl.build_chunks(
+            result,
+            (attr.asdict(x) for x in geo.attributes),
+            info,
+            hyview.codec.iter_chunks(geo, chunk_size))
+    return result
+
+
+def build_mapped(geo):
+    """
+    Build from a memory-mapped file. This includes writing the file.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+
+    Returns
+    -------
+    hyview.bench.fakehou.Geometry
+    """
+    import hyview.hy.impl
+
+    path = os.path.join(SHARED_DIR, 'hyview-{}.bin'.format(uuid.uuid4().hex))
+    try:
+        info = {
+            'mode': hyview.codec.MODE_MAPPED,
+            'path': path,
+            'count': geo.count,
+            'layout': hyview.codec.write_mapped(geo, path),
+        }
+        with hyview.bench.fakehou.installed() as hou:
+            result = hou.Geometry()
+            hyview.hy.impl.build_mapped(
+                result, (attr.asdict(x) for x in geo.attributes), info)
+    finally:
+        os.remove(path)
+    return result
+
+
+def timed(func, *args):
+    """
+    Parameters
+    ----------
+    func : Callable
+    args : *Any
+
+    Returns
+    -------
+    Tuple[float, Any]
+        Seconds taken and the result of `func`.
+    """
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def run(counts=COUNTS):
+    """
+    Run the benchmark and print a table of the results.
+
+    Parameters
+    ----------
+    counts : Iterable[int]
+        Number of points to build for each run.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    results = []
+
+    print('{:>10} {:>12} {:>12} {:>12} {:>9} {:>8}'.format(
+        'points', 'per point', 'chunked', 'mapped', 'speedup', 'calls'))
+
+    for count in counts:
+        geo = get_geo(count)
+
+        points_time, points_geo = timed(build_points, geo)
+        chunks_time, chunks_geo = timed(build_chunks, geo)
+        mapped_time, mapped_geo = timed(build_mapped, geo)
+
+        for other in [chunks_geo, mapped_geo]:
+            for name in ['P', 'Cd']:
+                assert numpy.allclose(
+                    points_geo.pointFloatAttribValues(name),
+                    other.pointFloatAttribValues(name))
+            assert points_geo.pointIntAttribValues('id') == \
+                other.pointIntAttribValues('id')
+
+        result = {
+            'count': count,
+            'points': points_time,
+            'chunks': chunks_time,
+            'mapped': mapped_time,
+            'points_calls': sum(points_geo.calls.values()),
+            'chunks_calls': sum(chunks_geo.calls.values()),
+        }
+        results.append(result)
+
+        print('{:>10} {:>11.3f}s {:>11.3f}s {:>11.3f}s {:>8.1f}x {:>8}'.format(
+            count, points_time, chunks_time, mapped_time,
+            points_time / max(chunks_time, 1e-9),
+            result['chunks_calls']))
+
+    return results
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or COUNTS)
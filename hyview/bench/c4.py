@@ -0,0 +1,146 @@
+"""
+Measure the throughput of C4 hashing and the cost of generating C4 ids.
+
+Examples
+--------
+$ python -m hyview.bench.c4 64 512
+"""
+import sys
+import time
+
+import numpy
+
+from hyview.c4 import C4
+import hyview.bench.build
+
+from typing import *
+
+
+# Sizes of the arrays hashed, in megabytes.
+SIZES = (64, 512)
+
+# Number of ids generated.
+IDS = 1000000
+
+
+def timed(func, *args, **kwargs):
+    """
+    Parameters
+    ----------
+    func : Callable
+    args : *Any
+    kwargs : **Any
+
+    Returns
+    -------
+    float
+        Fastest seconds taken over `repeat` calls.
+    """
+    repeat = kwargs.pop('repeat', 3)
+    result = None
+    for _ in range(repeat):
+        start = time.time()
+        func(*args)
+        taken = time.time() - start
+        if result is None or taken < result:
+            result = taken
+    return result
+
+
+def run_ids(count=IDS):
+    """
+    Time generating and comparing C4 ids and print the results.
+
+    Parameters
+    ----------
+    count : int
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    results = []
+
+    c4s = [C4(i) for i in range(count)]
+    other = [C4(i) for i in range(count)]
+
+    def generate():
+        for x in c4s:
+            str(x)
+
+    def compare():
+        for x, y in zip(c4s, other):
+            x == y
+
+    print('{:<24} {:>10} {:>10} {:>10}'.format(
+        'ids', 'count', 'seconds', 'us/id'))
+
+    # Memoized ids are only timed after the first run generates them.
+    for name, func in [('generate', generate),
+                       ('generate (memoized)', generate),
+                       ('compare', compare)]:
+        seconds = timed(func, repeat=1)
+        results.append({'name': name, 'count': count, 'seconds': seconds})
+        print('{:<24} {:>10} {:>10.4f} {:>10.3f}'.format(
+            name, count, seconds, seconds / count * 1e6))
+
+    return results
+
+
+def run(sizes=SIZES):
+    """
+    Run the benchmark and print the results.
+
+    Parameters
+    ----------
+    sizes : Iterable[int]
+        Size of the arrays to hash, in megabytes.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    results = []
+
+    print('{:<24} {:>10} {:>10} {:>10}'.format(
+        'object', 'MB', 'seconds', 'GB/s'))
+
+    def report(name, nbytes, seconds):
+        results.append({'name': name, 'bytes': nbytes, 'seconds': seconds})
+        print('{:<24} {:>10.1f} {:>10.4f} {:>10.2f}'.format(
+            name, nbytes / 2.0 ** 20, seconds,
+            nbytes / 2.0 ** 30 / max(seconds, 1e-9)))
+
+    for size in sizes:
+        array = numpy.random.random_sample(size * 2 ** 20 // 8)
+        report('ndarray', array.nbytes, timed(C4, array))
+
+        strided = array.reshape(-1, 2)[:, 0]
+        report('ndarray (strided)', strided.nbytes, timed(C4, strided))
+
+        geo = hyview.bench.build.get_geo(size * 2 ** 20 // 28)
+        nbytes = geo.positions.nbytes + sum(
+            x.nbytes for x in geo.columns.values())
+        report('Geometry', nbytes, timed(C4, geo))
+
+    kwargs = {
+        'size': None,
+        'znth': None,
+        'nth': 8,
+        'zmult': 5.0,
+        'colorize': False,
+        'minimum': 0.5,
+        'channels': ('dna',),
+        'filters': list(range(100)),
+    }
+    seconds = timed(lambda: [str(C4(kwargs)) for _ in range(1000)]) / 1000
+    results.append({'name': 'kwargs', 'seconds': seconds})
+    print('{:<24} {:>10} {:>10.4f}'.format('kwargs', '-', seconds))
+
+    return results
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or SIZES)
+    print('')
+    run_ids()
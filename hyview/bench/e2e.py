@@ -0,0 +1,262 @@
+"""
+Measure builds end to end, from `hyview.build` until Houdini is done with
+them, against the `hou` stand-in from `hyview.bench.fakehou`.
+
+The Houdini end runs within this process much like it does in Houdini: the
+rpc server started by `hyview.hy.init` runs on its own thread and the python
+nodes are cooked on another. Geometry is random, so every build is sent
+rather than read from the cache. Point `HYVIEW_CACHE_DIR` at a scratch
+directory to keep the bench out of the real cache.
+
+Examples
+--------
+$ HYVIEW_CACHE_DIR=/tmp/hyview-bench python -m hyview.bench.e2e rand many
+"""
+import sys
+import time
+import contextlib
+
+import numpy
+import gevent
+
+import hyview
+import hyview.bench.build
+import hyview.bench.fakehou
+import hyview.bench.neuron
+import hyview.hy.impl
+import hyview.hy.init
+
+from typing import *
+
+
+# Number and size of the builds of each scenario.
+RAND = (10, 10000)
+MANY = (200, 100)
+# Shape (z, y, x) of the synthetic neuron volume.
+NEURON = (10, 250, 250)
+
+_started = False
+
+
+@contextlib.contextmanager
+def session():
+    """
+    Context manager running the Houdini end within this process.
+
+    Returns
+    -------
+    ContextManager[ModuleType]
+        The `hou` stand-in.
+    """
+    global _started
+
+    with hyview.bench.fakehou.installed() as hou:
+        if not _started:
+            hou.reset()
+            hyview.hy.init.start_houdini()
+            _started = True
+        # Blocks until the server is up.
+        hyview.hy.impl.clear()
+        yield hou
+
+
+def get_rand(count=RAND[0], size=RAND[1]):
+    """
+    Get geometry of random points from `hyview_samples.rand`, built from
+    points rather than arrays.
+
+    Parameters
+    ----------
+    count : int
+    size : int
+
+    Returns
+    -------
+    List[Tuple[str, hyview.Geometry]]
+    """
+    import hyview_samples.rand
+
+    return [('rand{}'.format(i), hyview_samples.rand.get_geo(size=size))
+            for i in range(count)]
+
+
+def get_many(count=MANY[0], size=MANY[1]):
+    """
+    Get many small geometries.
+
+    Parameters
+    ----------
+    count : int
+    size : int
+
+    Returns
+    -------
+    List[Tuple[str, hyview.Geometry]]
+    """
+    seed = numpy.random.randint(2 ** 31)
+    return [('many{}'.format(i), hyview.bench.build.get_geo(size, seed + i))
+            for i in range(count)]
+
+
+def get_neuron(shape=NEURON):
+    """
+    Get geometry of each label of a synthetic neuron volume.
+
+    Parameters
+    ----------
+    shape : Tuple[int, int, int]
+
+    Returns
+    -------
+    List[Tuple[str, hyview.Geometry]]
+    """
+    import hyview_samples.neuron
+
+    images, labels = hyview.bench.neuron.get_volume(
+        shape, seed=numpy.random.randint(2 ** 31))
+    geos = hyview_samples.neuron.geogen(
+        images, labels, group='label', colorize=True, size=0, znth=0, nth=2,
+        zmult=10)
+    return [('neuron{}'.format(i), geo) for i, (_, geo) in enumerate(geos)]
+
+
+def build_each(geos):
+    """
+    Build each geometry with its own `hyview.build` call, all at once.
+
+    Parameters
+    ----------
+    geos : List[Tuple[str, hyview.Geometry]]
+
+    Returns
+    -------
+    List[gevent.event.AsyncResult]
+    """
+    return [hyview.build(geo, name=name) for name, geo in geos]
+
+
+def build_many(geos):
+    """
+    Build all geometry with one `hyview.build_many` call.
+
+    Parameters
+    ----------
+    geos : List[Tuple[str, hyview.Geometry]]
+
+    Returns
+    -------
+    List[gevent.event.AsyncResult]
+    """
+    return hyview.build_many((name, geo, 1) for name, geo in geos)
+
+
+# Name, geometry and how it's built of each scenario.
+SCENARIOS = [
+    ('rand', get_rand, build_each),
+    ('neuron', get_neuron, build_many),
+    ('many', get_many, build_many),
+    ('many-each', get_many, build_each),
+]
+
+
+def measure(geos, method):
+    """
+    Build geometry and time each build.
+
+    Parameters
+    ----------
+    geos : List[Tuple[str, hyview.Geometry]]
+    method : Callable[[List[Tuple[str, hyview.Geometry]]], List[gevent.event.AsyncResult]]
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+    def _wait(future):
+        future.get()
+        return time.time() - start
+
+    start = time.time()
+    futures = method(geos)
+    waits = [gevent.spawn(_wait, x) for x in futures]
+    latencies = numpy.array([x.get() for x in waits])
+    seconds = time.time() - start
+    names = [x.get() for x in futures]
+
+    stages = {}  # type: Dict[str, List[float]]
+    for name in names:
+        stats = hyview.stats(name)
+        for k, v in stats['stages'].items():
+            stages.setdefault(k, []).append(v)
+        for k, v in stats['houdini'].items():
+            stages.setdefault('houdini.' + k, []).append(v)
+
+    points = sum(geo.count for _, geo in geos)
+    return {
+        'builds': len(names),
+        'points': points,
+        'seconds': seconds,
+        'builds_per_second': len(names) / seconds,
+        'points_per_second': points / seconds,
+        'p50': numpy.percentile(latencies, 50),
+        'p90': numpy.percentile(latencies, 90),
+        'p99': numpy.percentile(latencies, 99),
+        'stages': dict((k, numpy.mean(v)) for k, v in stages.items()),
+    }
+
+
+def run(names=None):
+    """
+    Run the benchmark and print the results.
+
+    Parameters
+    ----------
+    names : Optional[Iterable[str]]
+        Scenarios to run, defaults to all of them.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    names = set(names or [x[0] for x in SCENARIOS])
+    unknown = names - set(x[0] for x in SCENARIOS)
+    if unknown:
+        raise ValueError('Unknown scenarios {!r}'.format(sorted(unknown)))
+
+    results = []
+
+    print('{:<10} {:>7} {:>9} {:>9} {:>9} {:>11} {:>8} {:>8} {:>8}'.format(
+        'scenario', 'builds', 'points', 'seconds', 'builds/s', 'points/s',
+        'p50', 'p90', 'p99'))
+
+    with session():
+        for name, get, method in SCENARIOS:
+            if name not in names:
+                continue
+            result = measure(get(), method)
+            result['scenario'] = name
+            results.append(result)
+            hyview.hy.impl.clear()
+
+            print('{:<10} {:>7} {:>9} {:>8.3f}s {:>9.1f} {:>11.0f} '
+                  '{:>7.3f}s {:>7.3f}s {:>7.3f}s'.format(
+                      name, result['builds'], result['points'],
+                      result['seconds'], result['builds_per_second'],
+                      result['points_per_second'], result['p50'],
+                      result['p90'], result['p99']))
+
+    stages = sorted(set(k for x in results for k in x['stages']))
+    print('')
+    print('Mean seconds of each stage per build')
+    print('{:<20} '.format('stage') + ' '.join(
+        '{:>10}'.format(x['scenario']) for x in results))
+    for stage in stages:
+        print('{:<20} '.format(stage) + ' '.join(
+            '{:>10.4f}'.format(x['stages'].get(stage, 0.0))
+            for x in results))
+
+    return results
+
+
+if __name__ == '__main__':
+    run(sys.argv[1:])
@@ -0,0 +1,815 @@
+"""
+In-process stand-in for the Houdini `hou` module.
+
+Only the parts of `hou` that hyview uses are implemented. Every call made on
+a geometry is recorded so the work done by a build can be verified.
+
+Nodes are cooked much like Houdini does. Changing a node dirties it and the
+nodes downstream of it, and while the update mode is `AutoUpdate` the
+displayed node of each changed object is cooked on a separate thread, which
+plays the part of the Houdini main thread. Calls from other threads wait for
+a cook to finish, as they would for the real `hou`. Python nodes run their
+code, file nodes write the geometry of their input or read it back, and
+other nodes pass their input through.
+
+The UI is reported as available, and functions handed to the main thread by
+`hdefereval.executeInMainThreadWithResult` run on the cooking thread between
+cooks. `installed` makes the `hdefereval` stand-in importable too.
+
+Examples
+--------
+>>> with installed() as hou:
+...     geo = hou.Geometry()
+...     hyview.hy.impl.build_columns(geo, attrs, positions, columns)
+>>> geo.calls['createPoint']
+0
+"""
+import os
+import re
+import sys
+import types
+import pickle
+import logging
+import threading
+import traceback
+import contextlib
+from collections import Counter
+
+import numpy
+
+from typing import *
+
+
+class attribType(object):
+    Global = 'Global'
+    Point = 'Point'
+    Prim = 'Prim'
+    Vertex = 'Vertex'
+
+
+class numericData(object):
+    Int8 = 'Int8'
+    Int16 = 'Int16'
+    Int32 = 'Int32'
+    Int64 = 'Int64'
+    Float16 = 'Float16'
+    Float32 = 'Float32'
+    Float64 = 'Float64'
+
+
+_NUMERIC_DTYPES = {
+    numericData.Int8: numpy.int8,
+    numericData.Int16: numpy.int16,
+    numericData.Int32: numpy.int32,
+    numericData.Int64: numpy.int64,
+    numericData.Float16: numpy.float16,
+    numericData.Float32: numpy.float32,
+    numericData.Float64: numpy.float64,
+}
+
+
+class updateMode(object):
+    AutoUpdate = 'AutoUpdate'
+    OnMouseUp = 'OnMouseUp'
+    Manual = 'Manual'
+
+
+_logger = logging.getLogger(__name__)
+
+
+class Vector3(tuple):
+
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return super(Vector3, cls).__new__(cls, (float(x) for x in values))
+
+
+class Point(object):
+
+    def __init__(self, geometry, number):
+        self._geometry = geometry
+        self._number = number
+
+    def number(self):
+        return self._number
+
+    def position(self):
+        return Vector3(self._geometry.attribValue('P', self._number))
+
+    def setPosition(self, position):
+        self._geometry._record('setPosition')
+        self._geometry._set(self._number, 'P', tuple(position))
+
+    def attribValue(self, name):
+        return self._geometry.attribValue(name, self._number)
+
+    def setAttribValue(self, name, value):
+        self._geometry._record('setAttribValue')
+        self._geometry._set(self._number, name, value)
+
+
+class Attrib(object):
+
+    def __init__(self, geometry, name):
+        self._geometry = geometry
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def size(self):
+        return self._geometry._size(self._name)
+
+
+class BoundingBox(object):
+
+    def __init__(self, lower, upper):
+        self._lower = Vector3(lower)
+        self._upper = Vector3(upper)
+
+    def minvec(self):
+        return self._lower
+
+    def maxvec(self):
+        return self._upper
+
+
+class Geometry(object):
+    """
+    Point geometry storing each attribute as a column.
+    """
+    def __init__(self):
+        self.calls = Counter()  # type: Counter
+        self._reset()
+
+    def _reset(self):
+        self._count = 0
+        self._attribs = {'P': (attribType.Point, (0.0, 0.0, 0.0))}
+        # Columns are lists while built per point and arrays when set in bulk.
+        self._values = {'P': []}  # type: Dict[str, Union[list, numpy.ndarray]]
+
+    def _record(self, name):
+        self.calls[name] += 1
+
+    def _array(self, name):
+        values = self._values[name]
+        if isinstance(values, numpy.ndarray):
+            return values
+        return numpy.asarray(values)
+
+    def _column(self, name):
+        values = self._values[name]
+        if isinstance(values, numpy.ndarray):
+            values = [tuple(x) if isinstance(x, list) else x
+                      for x in values.tolist()]
+            self._values[name] = values
+        return values
+
+    def _set(self, number, name, value):
+        if name not in self._attribs:
+            raise KeyError('Unknown attribute {!r}'.format(name))
+        self._column(name)[number] = value
+
+    def _size(self, name):
+        default = self._attribs[name][1]
+        if isinstance(default, (tuple, list)):
+            return len(default)
+        return 1
+
+    def addAttrib(self, type, name, default_value):
+        self._record('addAttrib')
+        if name in self._attribs:
+            raise ValueError('Attribute {!r} already exists'.format(name))
+        self._attribs[name] = (type, default_value)
+        if type == attribType.Point:
+            self._values[name] = [default_value] * self._count
+
+    def findPointAttrib(self, name):
+        if name in self._attribs:
+            return Attrib(self, name)
+        return None
+
+    def points(self):
+        return [Point(self, i) for i in range(self._count)]
+
+    def iterPoints(self):
+        for i in range(self._count):
+            yield Point(self, i)
+
+    def attribValue(self, name, number):
+        return self._column(name)[number]
+
+    def createPoint(self):
+        self._record('createPoint')
+        for name, (type, default) in self._attribs.items():
+            if type == attribType.Point:
+                self._column(name).append(default)
+        self._count += 1
+        return Point(self, self._count - 1)
+
+    def createPoints(self, point_positions):
+        self._record('createPoints')
+        start = self._count
+        positions = list(point_positions)
+        for name, (type, default) in self._attribs.items():
+            if type == attribType.Point:
+                self._column(name).extend([default] * len(positions))
+        self._count += len(positions)
+        self._column('P')[start:] = [tuple(x) for x in positions]
+        return [Point(self, i) for i in range(start, self._count)]
+
+    def _set_from_string(self, name, values, data_type):
+        if name not in self._attribs:
+            raise KeyError('Unknown attribute {!r}'.format(name))
+        array = numpy.frombuffer(values, dtype=_NUMERIC_DTYPES[data_type])
+        size = self._size(name)
+        if array.size != self._count * size:
+            raise ValueError(
+                'Expected {} values for {!r}, got {}'.format(
+                    self._count * size, name, array.size))
+        if size > 1:
+            array = array.reshape(self._count, size)
+        self._values[name] = array
+
+    def setPointFloatAttribValuesFromString(
+            self, name, values, float_type=numericData.Float32):
+        self._record('setPointFloatAttribValuesFromString')
+        self._set_from_string(name, values, float_type)
+
+    def setPointIntAttribValuesFromString(
+            self, name, values, int_type=numericData.Int32):
+        self._record('setPointIntAttribValuesFromString')
+        self._set_from_string(name, values, int_type)
+
+    def _values_as_string(self, name, data_type):
+        values = numpy.asarray(
+            self._column(name), dtype=_NUMERIC_DTYPES[data_type])
+        return values.tobytes()
+
+    def pointFloatAttribValuesAsString(
+            self, name, float_type=numericData.Float32):
+        self._record('pointFloatAttribValuesAsString')
+        return self._values_as_string(name, float_type)
+
+    def pointIntAttribValuesAsString(
+            self, name, int_type=numericData.Int32):
+        self._record('pointIntAttribValuesAsString')
+        return self._values_as_string(name, int_type)
+
+    def pointFloatAttribValues(self, name):
+        return tuple(numpy.asarray(
+            self._column(name), dtype=numpy.float64).ravel().tolist())
+
+    def pointIntAttribValues(self, name):
+        return tuple(numpy.asarray(
+            self._column(name), dtype=numpy.int64).ravel().tolist())
+
+    def clear(self):
+        self._record('clear')
+        self._reset()
+
+    def merge(self, geometry):
+        self._record('merge')
+        count = geometry._count
+        for name, (type, default) in geometry._attribs.items():
+            self._attribs.setdefault(name, (type, default))
+        for name, (type, default) in self._attribs.items():
+            if type != attribType.Point:
+                continue
+            if name in geometry._values:
+                other = geometry._array(name)
+            else:
+                other = numpy.asarray([default] * count)
+            if not self._count:
+                self._values[name] = other.copy()
+            elif count:
+                self._values[name] = numpy.concatenate(
+                    [self._array(name), other])
+        self._count += count
+
+    def boundingBox(self):
+        positions = self._array('P')
+        if not self._count:
+            return BoundingBox((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+        return BoundingBox(positions.min(axis=0), positions.max(axis=0))
+
+    def saveToFile(self, file_name):
+        self._record('saveToFile')
+        state = {
+            'count': self._count,
+            'attribs': self._attribs,
+            'values': dict((k, self._array(k)) for k in self._values),
+        }
+        with open(file_name, 'wb') as f:
+            pickle.dump(state, f, protocol=2)
+
+    def loadFromFile(self, file_name):
+        self._record('loadFromFile')
+        with open(file_name, 'rb') as f:
+            state = pickle.load(f)
+        self._count = state['count']
+        self._attribs = state['attribs']
+        self._values = state['values']
+
+
+# Held by the cooking thread while it cooks and by every node call, like the
+# lock guarding the real `hou`.
+_lock = threading.RLock()
+
+
+class _State(object):
+    """
+    The scene, the playbar and the objects waiting to be cooked.
+    """
+    def __init__(self):
+        self.root = Node(None, 'root', '')
+        obj = Node(self.root, 'obj', 'obj')
+        self.root._children.append(obj)
+        self.frame = 1.0
+        self.mode = updateMode.AutoUpdate
+        self.dirty = []  # type: List[Node]
+        self.cooking = []  # type: List[Node]
+        # Functions handed to the main thread, see `hdefereval`.
+        self.calls = []  # type: List[_Call]
+        self.wakeup = threading.Condition(_lock)
+        self.thread = None  # type: Optional[threading.Thread]
+
+
+_state = None  # type: _State
+
+
+def reset():
+    """
+    Start over with an empty scene.
+    """
+    global _state
+    with _lock:
+        _state = _State()
+
+
+class NodeType(object):
+
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+
+def _expand(value):
+    if not isinstance(value, str):
+        return value
+    frame = int(round(_state.frame))
+    value = re.sub(r'\$\{?F(\d)\}?', lambda m: '{:0{}d}'.format(
+        frame, int(m.group(1))), value)
+    return re.sub(r'\$\{?F\}?', str(frame), value)
+
+
+class Parm(object):
+
+    def __init__(self, node, name, value=''):
+        self._node = node
+        self._name = name
+        self._value = value
+
+    def name(self):
+        return self._name
+
+    def set(self, value):
+        with _lock:
+            self._value = value
+            self._node._changed()
+
+    def unexpandedString(self):
+        return self._value
+
+    def eval(self):
+        return _expand(self._value)
+
+    def evalAsString(self):
+        return str(self.eval())
+
+
+class ParmTuple(object):
+
+    def __init__(self, node, name, value=(0.0, 0.0, 0.0)):
+        self._node = node
+        self._name = name
+        self._value = tuple(value)
+
+    def name(self):
+        return self._name
+
+    def set(self, values):
+        with _lock:
+            self._value = tuple(values)
+            self._node._changed()
+
+    def eval(self):
+        return self._value
+
+
+class Node(object):
+    """
+    A node within the scene. Nodes within a `geo` object are SOPs, which
+    have geometry and are cooked.
+    """
+    def __init__(self, parent, type, name):
+        self._parent = parent
+        self._type = type
+        self._name = name
+        self._children = []  # type: List[Node]
+        self._inputs = {}  # type: Dict[int, Node]
+        self._parms = {}  # type: Dict[str, Parm]
+        self._tuples = {}  # type: Dict[str, ParmTuple]
+        self._display = None  # type: Optional[Node]
+        self._render = None  # type: Optional[Node]
+        self._geometry = None  # type: Optional[Geometry]
+        self._errors = []  # type: List[str]
+        self._dirty = True
+        self._destroyed = False
+
+    def __repr__(self):
+        return '<hou.Node {}>'.format(self.path())
+
+    def name(self):
+        return self._name
+
+    def path(self):
+        if self._parent is None:
+            return '/'
+        return '{}/{}'.format(
+            '' if self._parent._parent is None else self._parent.path(),
+            self._name)
+
+    def parent(self):
+        return self._parent
+
+    def type(self):
+        return NodeType(self._type)
+
+    def children(self):
+        with _lock:
+            return tuple(self._children)
+
+    def node(self, path):
+        with _lock:
+            result = self
+            for name in path.strip('/').split('/'):
+                if name == '..':
+                    result = result._parent
+                    continue
+                for child in result._children:
+                    if child._name == name:
+                        result = child
+                        break
+                else:
+                    return None
+            return result
+
+    def _is_sop(self):
+        return self._parent is not None and self._parent._type == 'geo'
+
+    def _unique(self, name):
+        names = set(x._name for x in self._children)
+        if name not in names:
+            return name
+        base = name.rstrip('0123456789')
+        i = 1
+        while '{}{}'.format(base, i) in names:
+            i += 1
+        return '{}{}'.format(base, i)
+
+    def createNode(self, node_type_name, node_name=None):
+        with _lock:
+            name = self._unique(node_name or '{}1'.format(node_type_name))
+            child = Node(self, node_type_name, name)
+            self._children.append(child)
+            if child._is_sop() and self._display is None:
+                self._display = child
+            child._changed()
+            return child
+
+    def destroy(self):
+        with _lock:
+            parent = self._parent
+            for x in self._outputs():
+                for k, v in list(x._inputs.items()):
+                    if v is self:
+                        del x._inputs[k]
+                x._changed()
+            parent._children.remove(self)
+            if parent._display is self:
+                parent._display = parent._children[-1] \
+                    if parent._children else None
+                if parent._display is not None:
+                    parent._display._changed()
+            if parent._render is self:
+                parent._render = None
+            self._destroyed = True
+
+    def _outputs(self):
+        if self._parent is None:
+            return []
+        return [x for x in self._parent._children
+                if self in x._inputs.values()]
+
+    def _object(self):
+        return self._parent if self._is_sop() else self
+
+    def _changed(self):
+        # Changes made by a node to itself while it cooks, such as clearing
+        # its code, don't cook it again.
+        if self in _state.cooking:
+            return
+        self._dirty = True
+        for x in self._outputs():
+            x._changed()
+        _schedule(self._object())
+
+    def setInput(self, input_index, item_to_become_input, output_index=0):
+        with _lock:
+            if item_to_become_input is None:
+                self._inputs.pop(input_index, None)
+            else:
+                self._inputs[input_index] = item_to_become_input
+            self._changed()
+
+    def input(self, input_index):
+        return self._inputs.get(input_index)
+
+    def inputs(self):
+        return tuple(self._inputs[k] for k in sorted(self._inputs))
+
+    def setDisplayFlag(self, on):
+        with _lock:
+            if on:
+                self._parent._display = self
+            elif self._parent._display is self:
+                self._parent._display = None
+            self._changed()
+
+    def isDisplayFlagSet(self):
+        return self._parent is not None and self._parent._display is self
+
+    def setRenderFlag(self, on):
+        with _lock:
+            if on:
+                self._parent._render = self
+            elif self._parent._render is self:
+                self._parent._render = None
+
+    def moveToGoodPosition(self):
+        return None
+
+    def parm(self, parm_path):
+        with _lock:
+            if parm_path not in self._parms:
+                self._parms[parm_path] = Parm(self, parm_path)
+            return self._parms[parm_path]
+
+    def parmTuple(self, parm_path):
+        with _lock:
+            if parm_path not in self._tuples:
+                self._tuples[parm_path] = ParmTuple(self, parm_path)
+            return self._tuples[parm_path]
+
+    def evalParm(self, parm_path):
+        return self.parm(parm_path).eval()
+
+    def geometry(self):
+        if self._geometry is None:
+            self._geometry = Geometry()
+        return self._geometry
+
+    def errors(self):
+        return tuple(self._errors)
+
+    def _iter_all(self):
+        for x in self._children:
+            yield x
+            for y in x._iter_all():
+                yield y
+
+    def cook(self, force=False):
+        with _lock:
+            if force:
+                self._dirty = True
+            _cook(self)
+
+
+def _cook_python(node):
+    code = node.evalParm('python')
+    if not code:
+        return
+    exec(compile(code, node.path(), 'exec'),
+         {'hou': sys.modules[__name__], '__name__': '__main__'})
+
+
+def _cook_file(node):
+    path = node.evalParm('file')
+    geo = node.geometry()
+    if node.input(0) is not None:
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        geo.saveToFile(path)
+    elif os.path.exists(path):
+        geo.loadFromFile(path)
+    else:
+        raise IOError('Unable to read file {!r}'.format(path))
+
+
+def _cook_box(node):
+    size = numpy.asarray(node.parmTuple('size').eval(), dtype=numpy.float64)
+    center = numpy.asarray(node.parmTuple('t').eval(), dtype=numpy.float64)
+    corners = numpy.indices((2, 2, 2)).reshape(3, -1).T - 0.5
+    node.geometry().createPoints(corners * size + center)
+
+
+_COOKS = {
+    'python': _cook_python,
+    'file': _cook_file,
+    'box': _cook_box,
+}
+
+
+def _cook(node):
+    """
+    Cook a node and its inputs, if they're dirty. The lock must be held.
+    """
+    if not node._dirty:
+        return
+    for x in node.inputs():
+        _cook(x)
+
+    node._geometry = Geometry()
+    node._errors = []
+    first = node.input(0)
+    if first is not None:
+        node._geometry.merge(first.geometry())
+
+    _state.cooking.append(node)
+    try:
+        _COOKS.get(node._type, lambda x: None)(node)
+    except Exception:
+        node._errors.append(traceback.format_exc())
+        _logger.error('Error cooking {}\n{}'.format(
+            node.path(), node._errors[-1]))
+    finally:
+        _state.cooking.remove(node)
+        node._dirty = False
+
+
+def _start():
+    """
+    Start the thread playing the main thread, and wake it up.
+    """
+    if _state.thread is None:
+        _state.thread = threading.Thread(
+            target=_run, args=(_state,), name='hou')
+        _state.thread.daemon = True
+        _state.thread.start()
+    _state.wakeup.notify()
+
+
+def _schedule(obj):
+    """
+    Queue an object to have its displayed node cooked.
+    """
+    if obj not in _state.dirty:
+        _state.dirty.append(obj)
+    if _state.mode == updateMode.AutoUpdate:
+        _start()
+
+
+def _run(state):
+    """
+    Run the functions handed to the main thread and cook the changed objects
+    as they come in.
+    """
+    with _lock:
+        while state is _state:
+            if state.calls:
+                state.calls.pop(0)()
+                continue
+            if not state.dirty or state.mode != updateMode.AutoUpdate:
+                state.wakeup.wait()
+                continue
+            obj = state.dirty.pop(0)
+            if not obj._destroyed and obj._display is not None:
+                _cook(obj._display)
+
+
+class _Call(object):
+    """
+    A function handed to the main thread.
+    """
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # type: Optional[BaseException]
+
+    def __call__(self):
+        try:
+            self.result = self.func(*self.args, **self.kwargs)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+
+def isUIAvailable():
+    return True
+
+
+def _execute_in_main_thread(func, *args, **kwargs):
+    """
+    Stand-in for `hdefereval.executeInMainThreadWithResult`.
+    """
+    if threading.current_thread() is _state.thread:
+        return func(*args, **kwargs)
+    call = _Call(func, args, kwargs)
+    with _lock:
+        _state.calls.append(call)
+        _start()
+    call.done.wait()
+    if call.error is not None:
+        raise call.error
+    return call.result
+
+
+hdefereval = types.ModuleType('hdefereval')
+hdefereval.executeInMainThreadWithResult = _execute_in_main_thread
+
+
+def node(path):
+    with _lock:
+        if path == '/':
+            return _state.root
+        return _state.root.node(path)
+
+
+def pwd():
+    if _state.cooking:
+        return _state.cooking[-1]
+    return _state.root.node('obj')
+
+
+def updateModeSetting():
+    return _state.mode
+
+
+def setUpdateMode(mode):
+    with _lock:
+        _state.mode = mode
+        if mode == updateMode.AutoUpdate and _state.dirty:
+            _schedule(_state.dirty[0])
+
+
+def frame():
+    return _state.frame
+
+
+def intFrame():
+    return int(round(_state.frame))
+
+
+def setFrame(frame):
+    with _lock:
+        if frame == _state.frame:
+            return
+        _state.frame = float(frame)
+        # File paths depend on the frame.
+        for obj in _state.root.node('obj')._iter_all():
+            if obj._type == 'file' and '$F' in str(
+                    obj.parm('file').unexpandedString()):
+                obj._changed()
+
+
+reset()
+
+
+@contextlib.contextmanager
+def installed():
+    """
+    Context manager which makes this module importable as `hou`, along with
+    the `hdefereval` stand-in.
+
+    Returns
+    -------
+    ContextManager[ModuleType]
+    """
+    modules = {'hou': sys.modules[__name__], 'hdefereval': hdefereval}
+    previous = dict((k, sys.modules.get(k)) for k in modules)
+    sys.modules.update(modules)
+    try:
+        yield sys.modules[__name__]
+    finally:
+        for k, v in previous.items():
+            if v is None:
+                del sys.modules[k]
+            else:
+                sys.modules[k] = v
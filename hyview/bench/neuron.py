@@ -0,0 +1,115 @@
+"""
+Compare generating the neuron sample geometry point by point against the
+vectorized generator on a synthetic volume.
+
+Examples
+--------
+$ python -m hyview.bench.neuron 25 625 625
+"""
+import sys
+import time
+import random
+
+import numpy
+
+import hyview_samples.neuron
+
+from typing import *
+
+
+# Shape (z, y, x) of the synthetic volume.
+SHAPE = (25, 625, 625)
+
+
+def get_volume(shape=SHAPE, seed=0):
+    """
+    Get a synthetic volume of images and labels. Labels are blobs of
+    neighbouring voxels much like the segmented neurons.
+
+    Parameters
+    ----------
+    shape : Tuple[int, int, int]
+    seed : int
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    state = numpy.random.RandomState(seed)
+    images = state.randint(0, 256, shape).astype(numpy.uint8)
+    z, y, x = numpy.indices(shape)
+    labels = (x // 50) + (y // 50) * 100 + (z // 5) * 10000
+    return images, labels.astype(numpy.uint64)
+
+
+def timed(func, *args, **kwargs):
+    """
+    Parameters
+    ----------
+    func : Callable
+    args : *Any
+    kwargs : **Any
+
+    Returns
+    -------
+    Tuple[float, List[Tuple[str, hyview.Geometry]]]
+        Seconds taken and the geometry generated.
+    """
+    # Colors are random, seed them so both runs get the same ones.
+    random.seed(0)
+    start = time.time()
+    result = []
+    for name, geo in func(*args, **kwargs):
+        # Point geometry is generated lazily, convert it to be fair.
+        geo.positions
+        result.append((name, geo))
+    return time.time() - start, result
+
+
+def run(shape=SHAPE):
+    """
+    Run the benchmark and print the results.
+
+    Parameters
+    ----------
+    shape : Tuple[int, int, int]
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    images, labels = get_volume(shape)
+
+    results = []
+
+    print('{:<8} {:>8} {:>10} {:>12} {:>12} {:>9}'.format(
+        'group', 'geos', 'points', 'per point', 'vectorized', 'speedup'))
+
+    for group in ['label', 'z', None]:
+        kwargs = dict(
+            group=group, colorize=True, size=0, znth=0, nth=2, zmult=10)
+
+        points_time, points_geos = timed(
+            hyview_samples.neuron.geogen_points, images, labels, **kwargs)
+        arrays_time, arrays_geos = timed(
+            hyview_samples.neuron.geogen, images, labels, **kwargs)
+
+        assert points_geos == arrays_geos
+
+        count = sum(x.count for _, x in arrays_geos)
+        results.append({
+            'group': group,
+            'count': count,
+            'points': points_time,
+            'arrays': arrays_time,
+        })
+
+        print('{:<8} {:>8} {:>10} {:>11.3f}s {:>11.3f}s {:>8.1f}x'.format(
+            str(group), len(arrays_geos), count, points_time, arrays_time,
+            points_time / max(arrays_time, 1e-9)))
+
+    return results
+
+
+if __name__ == '__main__':
+    run(tuple(int(x) for x in sys.argv[1:4]) or SHAPE)
@@ -28,10 +28,20 @@ crawls directories.
 ...     f.write(b'bar')
 >>> c4_2 = C4('/tmp/c4example')
 >>> assert c4_1 != c4_2
+
+The ids of lists, tuples, dicts, floats, None and numpy arrays changed with
+version 2 of the ids, see `hyview.constants.C4_VERSION`, when they got
+dedicated hashers. Anything persisted by id, such as the geometry cache,
+is keyed by the version too.
 """
 import os
+import json
+import mmap
 import inspect
 import hashlib
+import binascii
+import threading
+from multiprocessing.pool import ThreadPool
 
 try:
     import cPickle as pickle
@@ -42,6 +52,13 @@ import six
 
 from kids.cache import hashing
 
+from hyview.constants import C4_CACHE, C4_THREADS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from typing import *
 
 
@@ -63,6 +80,7 @@ else:
 __all__ = [
     'C4',
     'C4Error',
+    'FileDigestCache',
     'to_bytes',
 ]
 
@@ -97,6 +115,11 @@ def to_bytes(obj):
         return obj.encode()
     elif isinstance(obj, int):
         return obj.to_bytes((obj.bit_length() + 7) // 8, 'big', signed=obj < 0)
+    elif isinstance(obj, float):
+        # repr is the shortest string that round trips to the same float.
+        return to_bytes(repr(obj))
+    elif obj is None:
+        return b'None'
 
     try:
         # FIXME: Could this end up in a recursive loop with some broken
@@ -112,6 +135,14 @@ def to_bytes(obj):
                 'your object. See `C4.register` for more information.')
 
 
+_B58_CHARS = '123456789abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ'
+_B58_BASE = len(_B58_CHARS)
+# Every pair of digits, so each division of the large integer yields two
+# digits at once.
+_B58_PAIRS = [a + b for a in _B58_CHARS for b in _B58_CHARS]
+_B58_PAIR_BASE = len(_B58_PAIRS)
+
+
 def _b58encode(b):
     """
     Base58 encode bytes to string.
@@ -124,22 +155,18 @@ def _b58encode(b):
     -------
     str
     """
-    _b58chars = '123456789abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ'
-    _b58base = len(_b58chars)
     if six.PY2:
-        long_value = int(b.encode("hex_codec"), 16)
+        long_value = int(binascii.hexlify(b), 16)
     else:
-        long_value = int(b.hex(), 16)
+        long_value = int.from_bytes(b, 'big')
 
-    result = ''
-    while long_value >= _b58base:
-        div, mod = divmod(long_value, _b58base)
-        result = _b58chars[mod] + result
-        long_value = div
+    pairs = []
+    while long_value:
+        long_value, mod = divmod(long_value, _B58_PAIR_BASE)
+        pairs.append(_B58_PAIRS[mod])
 
-    result = _b58chars[long_value] + result
-
-    return result
+    # The leading pair may start with a zero ('1').
+    return ''.join(reversed(pairs)).lstrip('1') or '1'
 
 
 class C4(object):
@@ -177,19 +204,24 @@ class C4(object):
         objects : *Any
         """
         self._hash = hashlib.sha512()
+        # Memoized until the next update.
+        self._digest = None  # type: Optional[bytes]
+        self._id = None  # type: Optional[str]
         if objects:
             self.update(*objects)
 
     def __str__(self):
-        b58_hash = _b58encode(self._hash.digest())
+        if self._id is None:
+            b58_hash = _b58encode(self.digest())
 
-        # pad with '1's if needed
-        padding = ''
-        if len(b58_hash) < (self.ID_LENGTH - 2):
-            padding = ('1' * (self.ID_LENGTH - 2 - len(b58_hash)))
+            # pad with '1's if needed
+            padding = ''
+            if len(b58_hash) < (self.ID_LENGTH - 2):
+                padding = ('1' * (self.ID_LENGTH - 2 - len(b58_hash)))
 
-        # combine to form C4 ID
-        return 'c4' + padding + b58_hash
+            # combine to form C4 ID
+            self._id = 'c4' + padding + b58_hash
+        return self._id
 
     def __repr__(self):
         return '<{}({!r})>'.format(self.__class__.__name__, str(self))
@@ -197,7 +229,47 @@ class C4(object):
     def __eq__(self, other):
         if not isinstance(other, C4):
             return False
-        return str(self) == str(other)
+        return self.digest() == other.digest()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    @classmethod
+    def iter_blocks(cls, obj):
+        """
+        Get the blocks of data to hash for an object using the registered
+        hashers.
+
+        Parameters
+        ----------
+        obj : Any
+
+        Returns
+        -------
+        Iterator[bytes]
+        """
+        for claim, f in cls._hashers:
+            if claim(obj):
+                if inspect.isgeneratorfunction(f):
+                    for block in f(obj):
+                        yield block
+                else:
+                    yield f(obj)
+                break
+        else:
+            yield to_bytes(obj)
+
+    def digest(self):
+        """
+        Get the raw sha512 digest.
+
+        Returns
+        -------
+        bytes
+        """
+        if self._digest is None:
+            self._digest = self._hash.digest()
+        return self._digest
 
     def update(self, *objects):
         """
@@ -207,17 +279,11 @@ class C4(object):
         ----------
         objects : *Any
         """
+        self._digest = None
+        self._id = None
         for obj in objects:
-            for claim, f in self._hashers:
-                if claim(obj):
-                    if inspect.isgeneratorfunction(f):
-                        for block in f(obj):
-                            self._hash.update(block)
-                    else:
-                        self._hash.update(f(obj))
-                    break
-            else:
-                self._hash.update(to_bytes(obj))
+            for block in self.iter_blocks(obj):
+                self._hash.update(block)
 
 
 def _claim_c4(obj):
@@ -251,6 +317,116 @@ def hash_c4(obj):
     return to_bytes(str(obj))
 
 
+def _claim_sequence(obj):
+    """
+    Claim method for lists and tuples.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(obj, (list, tuple))
+
+
+@C4.register(_claim_sequence)
+def hash_sequence(obj):
+    """
+    Yield bytes from the items of a sequence. Each item is hashed on its own,
+    so the boundaries between items are part of the hash.
+
+    Parameters
+    ----------
+    obj : Union[list, tuple]
+
+    Returns
+    -------
+    Iterator[bytes]
+    """
+    yield to_bytes('{}:{}'.format(type(obj).__name__, len(obj)))
+    for item in obj:
+        yield C4(item).digest()
+
+
+def _claim_mapping(obj):
+    """
+    Claim method for dictionaries.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(obj, dict)
+
+
+@C4.register(_claim_mapping)
+def hash_mapping(obj):
+    """
+    Yield bytes from the items of a dictionary. Items are sorted by the hash
+    of their keys so the result doesn't depend on insertion order.
+
+    Parameters
+    ----------
+    obj : dict
+
+    Returns
+    -------
+    Iterator[bytes]
+    """
+    yield to_bytes('dict:{}'.format(len(obj)))
+    for key, value in sorted(
+            (C4(k).digest(), C4(v).digest()) for k, v in obj.items()):
+        yield key
+        yield value
+
+
+def _claim_ndarray(obj):
+    """
+    Claim method for numpy arrays and scalars.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return numpy is not None \
+        and isinstance(obj, (numpy.ndarray, numpy.generic))
+
+
+@C4.register(_claim_ndarray)
+def hash_ndarray(obj):
+    """
+    Yield bytes from the dtype, shape and buffer of a numpy array. The buffer
+    of a contiguous array is hashed without copying it.
+
+    Parameters
+    ----------
+    obj : Union[numpy.ndarray, numpy.generic]
+
+    Returns
+    -------
+    Iterator[Union[bytes, numpy.ndarray]]
+    """
+    obj = numpy.asarray(obj)
+    yield to_bytes('ndarray:{}:{}'.format(obj.dtype.str, obj.shape))
+    if obj.dtype.hasobject:
+        # The buffer of an object array only holds pointers.
+        yield C4(obj.tolist()).digest()
+    else:
+        # A flat byte view of the same buffer.
+        yield numpy.ascontiguousarray(obj).reshape(-1).view(numpy.uint8)
+
+
 def _claim_filepath(obj):
     """
     Claim method for filepath objects.
@@ -270,11 +446,153 @@ def _claim_filepath(obj):
     return os.sep in str(obj) and os.path.exists(obj)
 
 
+def _stat(path):
+    """
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    Tuple[int, int]
+        Size and modification time in nanoseconds.
+    """
+    stat = os.stat(path)
+    return stat.st_size, getattr(
+        stat, 'st_mtime_ns', int(stat.st_mtime * 1e9))
+
+
+class FileDigestCache(object):
+    """
+    Cache of file digests keyed by path, size and modification time, so
+    unchanged files aren't read again.
+
+    The cache is kept in memory and optionally persisted to `filepath`.
+    """
+    def __init__(self, filepath=None):
+        """
+        Parameters
+        ----------
+        filepath : Optional[str]
+            JSON file to persist the cache to.
+        """
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._entries = None  # type: Dict[str, Tuple[int, int, str]]
+        self._dirty = False
+
+    def _load(self):
+        # type: () -> Dict[str, Tuple[int, int, str]]
+        if self._entries is None:
+            entries = {}
+            if self.filepath and os.path.exists(self.filepath):
+                try:
+                    with open(self.filepath, 'r') as f:
+                        entries = json.load(f)
+                except (IOError, OSError, ValueError):
+                    pass
+            self._entries = entries
+        return self._entries
+
+    def get(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        Optional[bytes]
+        """
+        size, mtime = _stat(path)
+        with self._lock:
+            entry = self._load().get(path)
+        if entry is None or entry[0] != size or entry[1] != mtime:
+            return None
+        return binascii.unhexlify(entry[2])
+
+    def set(self, path, stat, digest):
+        """
+        Parameters
+        ----------
+        path : str
+        stat : Tuple[int, int]
+            Size and modification time of the file before it was read.
+        digest : bytes
+        """
+        with self._lock:
+            self._load()[path] = \
+                [stat[0], stat[1], binascii.hexlify(digest).decode('ascii')]
+            self._dirty = True
+
+    def save(self):
+        """
+        Persist the cache if it has a filepath.
+        """
+        with self._lock:
+            if not self.filepath or not self._dirty:
+                return
+            directory = os.path.dirname(self.filepath)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            tmp = '{}.{}.tmp'.format(self.filepath, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(self._entries, f)
+            getattr(os, 'replace', os.rename)(tmp, self.filepath)
+            self._dirty = False
+
+
+# Set to None to always read files.
+FILE_CACHE = FileDigestCache(C4_CACHE)  # type: Optional[FileDigestCache]
+
+
+def hash_file(path):
+    """
+    Get the sha512 digest of the contents of a file. The file is memory-mapped
+    rather than read into memory.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    bytes
+    """
+    path = os.path.abspath(path)
+
+    cache = FILE_CACHE
+    if cache is not None:
+        result = cache.get(path)
+        if result is not None:
+            return result
+        stat = _stat(path)
+
+    h = hashlib.sha512()
+    with open(path, 'rb') as f:
+        # Empty files can not be mapped.
+        if os.fstat(f.fileno()).st_size:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                h.update(m)
+            finally:
+                m.close()
+    result = h.digest()
+
+    if cache is not None:
+        cache.set(path, stat, result)
+    return result
+
+
 @C4.register(_claim_filepath)
 def hash_filepath(obj):
     """
     Yield bytes from the contents of a filepath.
 
+    Providing a directory hashes all files within. Files are hashed in
+    parallel and combined in order of their path relative to the directory,
+    so the result doesn't depend on the order they finish in.
+
     Parameters
     ----------
     obj : PathT
@@ -283,25 +601,31 @@ def hash_filepath(obj):
     -------
     Iterator[bytes]
     """
-    obj = os.path.expanduser(os.path.expandvars(obj))
+    obj = os.path.expanduser(os.path.expandvars(str(obj)))
 
-    # Providing a directory will crawl all contents within.
     if os.path.isdir(obj):
+        paths = []
         for root, dirs, files in os.walk(obj):
             for f in files:
-                for block in hash_filepath(os.path.join(root, f)):
-                    yield block
+                paths.append(os.path.join(root, f))
+        paths.sort()
+
+        if len(paths) > 1 and C4_THREADS > 1:
+            pool = ThreadPool(min(C4_THREADS, len(paths)))
+            try:
+                digests = pool.map(hash_file, paths)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            digests = [hash_file(x) for x in paths]
+
+        for path, digest in zip(paths, digests):
+            yield to_bytes(os.path.relpath(path, obj).replace(os.sep, '/'))
+            yield digest
 
     else:
-        with open(obj, 'r') as f:
-            block_size = 100 * (2 ** 20)
-            while True:
-                try:
-                    block = f.read(block_size)
-                except UnicodeDecodeError:
-                    break
-                if not block:
-                    break
-                if six.PY3:
-                    block = block.encode('utf-8')
-                yield block
+        yield hash_file(obj)
+
+    if FILE_CACHE is not None:
+        FILE_CACHE.save()
@@ -0,0 +1,298 @@
+"""
+Content-addressed cache of built geometry.
+
+Geometry is cached to `DIRECTORY` by the C4 id of its contents, so building
+the same data twice reads it back from disk instead of transferring it again.
+An index of the cached files, their size and when they were last used is kept
+alongside them, which is used to evict the least recently used files once the
+cache grows over `CACHE_SIZE`.
+
+Houdini updates the index from its rpc and main threads, and several Houdini
+sessions may share a cache, so updates hold both a thread lock and, where
+`fcntl` is available, a lock file. As Houdini uses the index itself, this
+module must stay python2.7 compatible.
+"""
+import os
+import json
+import time
+import errno
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where only threads of one process are serialized.
+    fcntl = None
+
+from hyview.constants import CACHE_DIR, CACHE_SIZE, C4_VERSION
+
+from typing import *
+
+
+# Each version of the C4 ids gets its own directory and index, as the same
+# data has a different id in each. Files cached by other versions are never
+# read, and can be deleted.
+DIRECTORY = os.path.join(CACHE_DIR, 'c4v{}'.format(C4_VERSION))
+
+INDEX_NAME = 'index.json'
+LOCK_NAME = 'index.lock'
+
+# Serializes updates of the index from threads of this process, whichever
+# `Index` instance they use.
+_lock = threading.Lock()
+
+
+def _makedirs(directory):
+    # type: (str) -> None
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def _remove(path):
+    """
+    Remove a file which may already have been removed by another process.
+
+    Parameters
+    ----------
+    path : str
+    """
+    try:
+        os.remove(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+def ident(key, frame):
+    """
+    Identifier of a cached file.
+
+    Parameters
+    ----------
+    key : str
+        C4 id of the geometry.
+    frame : int
+
+    Returns
+    -------
+    str
+    """
+    return '{}.{:04d}'.format(key, int(frame))
+
+
+def pattern(key):
+    """
+    Path of the cached files of a geometry with the frame left as a Houdini
+    variable.
+
+    Parameters
+    ----------
+    key : str
+        C4 id of the geometry.
+
+    Returns
+    -------
+    str
+    """
+    return os.path.join(DIRECTORY, '{}.$F4.bgeo'.format(key))
+
+
+def path(key, frame):
+    """
+    Path of a cached file. This is `pattern` expanded at `frame`.
+
+    Parameters
+    ----------
+    key : str
+        C4 id of the geometry.
+    frame : int
+
+    Returns
+    -------
+    str
+    """
+    return os.path.join(DIRECTORY, '{}.bgeo'.format(ident(key, frame)))
+
+
+class Index(object):
+    """
+    Index of the files within the cache directory.
+
+    Entries are keyed by `ident` and hold the `path`, `size` and `time` (last
+    used) of each file. Entries for files that no longer exist are dropped.
+    """
+    def __init__(self, directory=DIRECTORY):
+        """
+        Parameters
+        ----------
+        directory : str
+        """
+        self.directory = directory
+        self.filepath = os.path.join(directory, INDEX_NAME)
+        self.lockpath = os.path.join(directory, LOCK_NAME)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """
+        Hold the index for a load, change and save, so concurrent updates
+        don't overwrite each other.
+        """
+        with _lock:
+            if fcntl is None:
+                yield
+                return
+            _makedirs(self.directory)
+            with open(self.lockpath, 'a') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _load(self):
+        # type: () -> Dict[str, Dict[str, Any]]
+        try:
+            with open(self.filepath, 'r') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        # type: (Dict[str, Dict[str, Any]]) -> None
+        _makedirs(self.directory)
+        tmp = '{}.{}.{}.tmp'.format(
+            self.filepath, os.getpid(), threading.current_thread().ident)
+        with open(tmp, 'w') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        # Replace atomically so readers never see a partial index.
+        getattr(os, 'replace', os.rename)(tmp, self.filepath)
+
+    def get(self, ident):
+        """
+        Get the entry of a cached file.
+
+        Parameters
+        ----------
+        ident : str
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+        """
+        entry = self._load().get(ident)
+        if entry is None or not os.path.exists(entry['path']):
+            return None
+        return entry
+
+    def cached(self, idents):
+        """
+        Filter to the identifiers which are cached.
+
+        Parameters
+        ----------
+        idents : Iterable[str]
+
+        Returns
+        -------
+        List[str]
+        """
+        entries = self._load()
+        return [x for x in idents
+                if x in entries and os.path.exists(entries[x]['path'])]
+
+    def add(self, ident, path):
+        """
+        Add or refresh a file in the index.
+
+        Parameters
+        ----------
+        ident : str
+        path : str
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        entry = {
+            'path': path,
+            'size': os.path.getsize(path),
+            'time': time.time(),
+        }
+        with self._locked():
+            entries = self._load()
+            entries[ident] = entry
+            self._save(entries)
+        return entry
+
+    def touch(self, *idents):
+        """
+        Mark cached files as used.
+
+        Parameters
+        ----------
+        idents : *str
+        """
+        now = time.time()
+        with self._locked():
+            entries = self._load()
+            for ident in idents:
+                if ident in entries:
+                    entries[ident]['time'] = now
+            self._save(entries)
+
+    def remove(self, ident):
+        """
+        Remove a file from the cache.
+
+        Parameters
+        ----------
+        ident : str
+        """
+        with self._locked():
+            entries = self._load()
+            entry = entries.pop(ident, None)
+            if entry is not None:
+                _remove(entry['path'])
+                self._save(entries)
+
+    def evict(self, size=CACHE_SIZE, keep=()):
+        """
+        Remove the least recently used files until the cache is no larger
+        than `size` bytes.
+
+        Parameters
+        ----------
+        size : int
+        keep : Iterable[str]
+            Identifiers which are never removed.
+
+        Returns
+        -------
+        List[str]
+            Identifiers of the removed files.
+        """
+        keep = set(keep)
+        removed = []
+        with self._locked():
+            entries = self._load()
+            entries = dict((k, v) for k, v in entries.items()
+                           if os.path.exists(v['path']))
+
+            total = sum(x['size'] for x in entries.values())
+
+            for k, v in sorted(entries.items(), key=lambda x: x[1]['time']):
+                if total <= size:
+                    break
+                if k in keep:
+                    continue
+                _remove(v['path'])
+                total -= v['size']
+                del entries[k]
+                removed.append(k)
+
+            self._save(entries)
+        return removed
@@ -0,0 +1,570 @@
+"""
+Packing of columnar geometry into binary chunks for streaming.
+
+Rather than sending each point as a dictionary, points are sent in fixed size
+blocks. Each block holds the raw bytes of every column for that range of
+points, concatenated in the order described by the layout. The layout is
+sent once up front as part of negotiating the transfer.
+
+When both processes run on the same host the columns can instead be written
+once to a memory-mapped file, which Houdini maps read-only. Only the path and
+the layout (including the offset of each column) are sent over RPC.
+
+Over the network chunks can be compressed (see `hyview.compression`), and
+some columns can be quantized to smaller types (see `quantize`).
+
+Houdini decodes the chunks and maps the columns with this same module, so it
+must stay python2.7 compatible.
+"""
+import os
+import mmap
+
+import numpy
+
+import hyview.compression
+from hyview.constants import CHUNK_SIZE
+
+from typing import *
+
+
+# Transfer modes agreed on between the application and Houdini.
+MODE_POINTS = 'points'
+MODE_CHUNKED = 'chunked'
+MODE_MAPPED = 'mapped'
+
+# Hosts which are only reachable from the same machine.
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+# Name used for the point positions column within a layout.
+POSITION = 'P'
+
+# Lossy encodings of float columns used when quantizing. Colors are expected
+# within [0, 1] and are scaled to the range of the integer type. Bounded
+# columns are scaled from their bounds to the range of the integer type
+# instead, so positions are as precise as their extent allows and can't
+# overflow the way float16 does. They're only quantized when their bounds
+# are known up front.
+QUANTIZATION = {
+    POSITION: {'dtype': '<u2', 'bounded': True},
+    'Cd': {'dtype': '|u1', 'scale': 255.0},
+}
+
+
+def supports(geo):
+    """
+    Whether the geometry can be sent as binary chunks. Only numeric columns
+    have a fixed size binary representation.
+
+    Parameters
+    ----------
+    geo : Union[hyview.Geometry, hyview.GeometryStream]
+
+    Returns
+    -------
+    bool
+    """
+    if geo.is_streamed:
+        return all(x.dtype.kind in 'biuf' for x in geo.point_attributes)
+    return all(x.dtype.kind in 'biuf' for x in geo.columns.values())
+
+
+def is_local(host):
+    """
+    Whether `host` refers to the machine we're running on. Memory-mapped
+    transfers are only possible between processes on the same host.
+
+    Parameters
+    ----------
+    host : str
+
+    Returns
+    -------
+    bool
+    """
+    return host in LOCAL_HOSTS
+
+
+def iter_columns(geo):
+    """
+    Get all columns of a geometry in layout order.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+
+    Returns
+    -------
+    Iterator[Tuple[str, numpy.ndarray]]
+    """
+    yield POSITION, geo.positions
+    for name in sorted(geo.columns):
+        yield name, geo.columns[name]
+
+
+def layout(geo):
+    """
+    Describe the binary layout of the chunks for a geometry.
+
+    Parameters
+    ----------
+    geo : Union[hyview.Geometry, hyview.GeometryStream]
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Entries contain the `name`, `dtype` string, `size` (components per
+        point) and `stride` (bytes per point) of each column.
+    """
+    if geo.is_streamed:
+        # The columns aren't available, but will match their definitions.
+        columns = [(POSITION, numpy.dtype(numpy.float32), 3)]
+        for x in sorted(geo.point_attributes, key=lambda x: x.name):
+            columns.append((x.name, x.dtype, x.size))
+    else:
+        columns = []
+        for name, column in iter_columns(geo):
+            size = column.shape[1] if column.ndim > 1 else 1
+            columns.append((name, column.dtype, size))
+
+    result = []
+    for name, dtype, size in columns:
+        result.append({
+            'name': name,
+            'dtype': dtype.str,
+            'size': size,
+            'stride': dtype.itemsize * size,
+        })
+    return result
+
+
+def bounds(geo):
+    """
+    Get the bounds of the columns of a geometry which `quantize` needs them
+    for.
+
+    Parameters
+    ----------
+    geo : Union[hyview.Geometry, hyview.GeometryStream]
+
+    Returns
+    -------
+    Dict[str, Tuple[List[float], List[float]]]
+        The lower and upper bounds of each component by column name. Empty
+        for streamed geometry, which isn't read up front.
+    """
+    if geo.is_streamed or not geo.count:
+        return {}
+    result = {}
+    for name, column in iter_columns(geo):
+        rule = QUANTIZATION.get(name)
+        if rule is not None and rule.get('bounded') \
+                and column.dtype.kind == 'f':
+            result[name] = (column.min(axis=0).tolist(),
+                            column.max(axis=0).tolist())
+    return result
+
+
+def quantize(layout, rules=None, bounds=None):
+    """
+    Encode float columns of a layout with the lossy encodings of `rules`.
+    Encoded entries contain an `encoding` of the `dtype` sent, an optional
+    `scale` applied before converting to it and an optional `offset`
+    subtracted before scaling, and their `stride` is that of the encoded
+    values.
+
+    Parameters
+    ----------
+    layout : List[Dict[str, Any]]
+    rules : Optional[Dict[str, Dict[str, Any]]]
+        Encodings by column name. Defaults to `QUANTIZATION`.
+    bounds : Optional[Dict[str, Tuple[List[float], List[float]]]]
+        Bounds of the columns, see `bounds`. Bounded columns without them,
+        or with non-finite bounds, are sent as they are.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    if rules is None:
+        rules = QUANTIZATION
+    bounds = bounds or {}
+
+    result = []
+    for entry in layout:
+        entry = dict(entry)
+        rule = rules.get(entry['name'])
+        if rule is not None \
+                and numpy.dtype(str(entry['dtype'])).kind == 'f':
+            encoding = dict(rule)
+            if encoding.pop('bounded', False):
+                encoding = _bounded(encoding, bounds.get(entry['name']))
+            if encoding is not None:
+                entry['encoding'] = encoding
+                entry['stride'] = \
+                    numpy.dtype(str(rule['dtype'])).itemsize * entry['size']
+        result.append(entry)
+    return result
+
+
+def _bounded(encoding, bounds):
+    """
+    Scale and offset an encoding to map `bounds` onto its integer type.
+
+    Parameters
+    ----------
+    encoding : Dict[str, Any]
+    bounds : Optional[Tuple[List[float], List[float]]]
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        None when the bounds are unknown or not finite.
+    """
+    if bounds is None:
+        return None
+    lower, upper = (numpy.asarray(x, dtype=numpy.float64) for x in bounds)
+    if not (numpy.isfinite(lower).all() and numpy.isfinite(upper).all()):
+        return None
+    extent = upper - lower
+    info = numpy.iinfo(numpy.dtype(str(encoding['dtype'])))
+    # Flat components are all sent as 0.
+    scale = numpy.ones_like(extent)
+    scale[extent > 0] = info.max / extent[extent > 0]
+    encoding['offset'] = lower.tolist()
+    encoding['scale'] = scale.tolist()
+    return encoding
+
+
+def _encode(entry, column):
+    """
+    Parameters
+    ----------
+    entry : Dict[str, Any]
+    column : numpy.ndarray
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    encoding = entry.get('encoding')
+    if encoding is None:
+        return column
+    dtype = numpy.dtype(str(encoding['dtype']))
+    offset = encoding.get('offset')
+    if offset is not None:
+        column = column - numpy.asarray(offset, dtype=column.dtype)
+    scale = encoding.get('scale')
+    if scale:
+        info = numpy.iinfo(dtype)
+        column = numpy.clip(
+            numpy.rint(column * numpy.asarray(scale, dtype=column.dtype)),
+            info.min, info.max)
+    return column.astype(dtype)
+
+
+def _decode(entry, column):
+    """
+    Parameters
+    ----------
+    entry : Dict[str, Any]
+    column : numpy.ndarray
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    encoding = entry.get('encoding')
+    if encoding is None:
+        return column
+    dtype = numpy.dtype(str(entry['dtype']))
+    column = column.astype(dtype)
+    scale = encoding.get('scale')
+    if scale:
+        column /= numpy.asarray(scale, dtype=dtype)
+    offset = encoding.get('offset')
+    if offset is not None:
+        column += numpy.asarray(offset, dtype=dtype)
+    return column
+
+
+def iter_blocks(geo, chunk_size):
+    """
+    Read a geometry in blocks of columns.
+
+    Parameters
+    ----------
+    geo : Union[hyview.Geometry, hyview.GeometryStream]
+    chunk_size : int
+        Number of points per block. Blocks of a `hyview.GeometryStream`
+        may be larger.
+
+    Returns
+    -------
+    Iterator[Tuple[int, List[numpy.ndarray]]]
+        The index of the first point of the block and its columns in layout
+        order.
+    """
+    if geo.is_streamed:
+        start = 0
+        for positions, columns in geo.iter_blocks(chunk_size):
+            yield start, [positions] + [columns[k] for k in sorted(columns)]
+            start += len(positions)
+    else:
+        columns = [x for _, x in iter_columns(geo)]
+        for start in range(0, geo.count, chunk_size):
+            stop = min(start + chunk_size, geo.count)
+            yield start, [x[start:stop] for x in columns]
+
+
+def iter_chunks(geo, chunk_size, entries=None, compression=None):
+    """
+    Pack a geometry into binary chunks.
+
+    Parameters
+    ----------
+    geo : Union[hyview.Geometry, hyview.GeometryStream]
+    chunk_size : int
+        Number of points per chunk.
+    entries : Optional[List[Dict[str, Any]]]
+        The negotiated layout, which may encode some columns. Defaults to
+        the `layout` of the geometry.
+    compression : Optional[str]
+        Compressor of the chunk data. See `hyview.compression`.
+
+    Returns
+    -------
+    Iterator[Dict[str, Any]]
+        Chunks also contain the `size` of their data before encoding and
+        compression.
+    """
+    if entries is None:
+        entries = layout(geo)
+
+    for start, columns in iter_blocks(geo, chunk_size):
+        data = b''.join(
+            _encode(entry, x).tobytes() for entry, x in zip(entries, columns))
+        yield {
+            'start': start,
+            'count': len(columns[0]),
+            'size': sum(x.nbytes for x in columns),
+            'data': hyview.compression.compress(compression, data),
+        }
+
+
+def decode_chunk(layout, chunk, compression=None):
+    """
+    Unpack a binary chunk into its columns. The arrays returned are read-only
+    views into the chunk data, unless they were encoded.
+
+    Parameters
+    ----------
+    layout : List[Dict[str, Any]]
+    chunk : Dict[str, Any]
+    compression : Optional[str]
+        Compressor of the chunk data. See `hyview.compression`.
+
+    Returns
+    -------
+    Dict[str, numpy.ndarray]
+    """
+    count = chunk['count']
+    data = hyview.compression.decompress(compression, chunk['data'])
+
+    result = {}
+    offset = 0
+    for entry in layout:
+        dtype = entry.get('encoding', entry)['dtype']
+        column = numpy.frombuffer(
+            data, dtype=numpy.dtype(str(dtype)),
+            count=count * entry['size'], offset=offset)
+        if entry['size'] > 1:
+            column = column.reshape(count, entry['size'])
+        result[entry['name']] = _decode(entry, column)
+        offset += count * entry['stride']
+    return result
+
+
+def changed_range(old, new):
+    """
+    Find the range of points whose values differ between two columns.
+
+    Parameters
+    ----------
+    old : Optional[numpy.ndarray]
+        None if the column is new.
+    new : numpy.ndarray
+
+    Returns
+    -------
+    Optional[Tuple[int, int]]
+        Start and stop of the changed points, or None if nothing changed.
+    """
+    if old is None or old.shape != new.shape or old.dtype != new.dtype:
+        return 0, len(new)
+    changed = numpy.flatnonzero(
+        (old != new).reshape(len(new), -1).any(axis=1))
+    if not len(changed):
+        return None
+    return int(changed[0]), int(changed[-1]) + 1
+
+
+def patch_layout(geo, ranges):
+    """
+    Describe the changed points of the columns of a geometry.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+    ranges : Dict[str, Tuple[int, int]]
+        Start and stop of the changed points of each column.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Entries are like `layout`, with the `start` and `stop` of the
+        changed points.
+    """
+    result = []
+    for entry in layout(geo):
+        if entry['name'] in ranges:
+            entry['start'], entry['stop'] = ranges[entry['name']]
+            result.append(entry)
+    return result
+
+
+def iter_patch_chunks(geo, layout, chunk_size):
+    """
+    Pack the changed points of each column into binary chunks. Unlike
+    `iter_chunks` each chunk holds a single column, named by the chunk.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+    layout : List[Dict[str, Any]]
+        See `patch_layout`.
+    chunk_size : int
+        Number of points per chunk.
+
+    Returns
+    -------
+    Iterator[Dict[str, Any]]
+    """
+    columns = dict(iter_columns(geo))
+    for entry in layout:
+        column = columns[entry['name']]
+        for start in range(entry['start'], entry['stop'], chunk_size):
+            stop = min(start + chunk_size, entry['stop'])
+            yield {
+                'name': entry['name'],
+                'start': start,
+                'count': stop - start,
+                'data': numpy.ascontiguousarray(column[start:stop]).tobytes(),
+            }
+
+
+def write_mapped(geo, path):
+    """
+    Write all columns of a geometry to a file to be memory-mapped by Houdini.
+
+    Parameters
+    ----------
+    geo : Union[hyview.Geometry, hyview.GeometryStream]
+    path : str
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Layout of the columns, see `layout`. Each entry also contains the
+        `offset` of the column within the file.
+    """
+    result = layout(geo)
+    offset = 0
+    for entry in result:
+        entry['offset'] = offset
+        offset += entry['stride'] * geo.count
+
+    with open(path, 'wb') as f:
+        if geo.is_streamed:
+            # Write each block of the columns in place.
+            for start, columns in iter_blocks(geo, CHUNK_SIZE):
+                for entry, column in zip(result, columns):
+                    f.seek(entry['offset'] + start * entry['stride'])
+                    numpy.ascontiguousarray(column).tofile(f)
+            f.truncate(offset)
+        else:
+            for _, column in iter_columns(geo):
+                numpy.ascontiguousarray(column).tofile(f)
+    return result
+
+
+class MappedColumns(dict):
+    """
+    Columns memory-mapped by `map_columns`, by name.
+
+    Close them once they're built, or use them as a context manager, so the
+    file is unmapped then rather than whenever the arrays are garbage
+    collected.
+    """
+    def __init__(self, data, columns):
+        """
+        Parameters
+        ----------
+        data : Union[mmap.mmap, bytes]
+        columns : Dict[str, numpy.ndarray]
+        """
+        super(MappedColumns, self).__init__(columns)
+        self._data = data
+
+    def close(self):
+        """
+        Forget the columns and unmap the file. Columns still referenced
+        elsewhere keep the file mapped until they're released.
+        """
+        self.clear()
+        data, self._data = self._data, None
+        if isinstance(data, mmap.mmap):
+            try:
+                data.close()
+            except BufferError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def map_columns(path, layout, count):
+    """
+    Map the columns written by `write_mapped`. The arrays returned are
+    read-only views into the mapped file, so no data is copied until it is
+    read.
+
+    Parameters
+    ----------
+    path : str
+    layout : List[Dict[str, Any]]
+    count : int
+        Number of points.
+
+    Returns
+    -------
+    MappedColumns
+    """
+    if not os.path.getsize(path):
+        # Empty files can not be mapped.
+        data = b''
+    else:
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    result = {}
+    for entry in layout:
+        column = numpy.frombuffer(
+            data, dtype=numpy.dtype(str(entry['dtype'])),
+            count=count * entry['size'], offset=entry['offset'])
+        if entry['size'] > 1:
+            column = column.reshape(count, entry['size'])
+        result[entry['name']] = column
+    return MappedColumns(data, result)
@@ -0,0 +1,215 @@
+"""
+Compression of the binary chunks streamed to Houdini.
+
+Compressors are registered by name and only offered when their module can
+be imported, so `zlib` from the standard library is always available while
+`lz4` and `zstd` are used when installed. Houdini offers the compressors it
+has and the application picks its most preferred one, see
+`ApplicationInterface.negotiate`.
+
+Houdini decompresses chunks with these same compressors, so this module must
+stay python2.7 compatible.
+"""
+from hyview.constants import COMPRESSION, COMPRESSION_LEVEL
+
+from typing import *
+
+
+NONE = 'none'
+AUTO = 'auto'
+
+
+class Compressor(object):
+    """
+    Base class of the compressors.
+    """
+    name = None  # type: str
+
+    def is_available(self):
+        """
+        Returns
+        -------
+        bool
+        """
+        try:
+            self.module()
+        except ImportError:
+            return False
+        return True
+
+    def module(self):
+        """
+        Import the module doing the work.
+
+        Returns
+        -------
+        ModuleType
+        """
+        raise NotImplementedError
+
+    def compress(self, data, level=None):
+        """
+        Parameters
+        ----------
+        data : bytes
+        level : Optional[int]
+
+        Returns
+        -------
+        bytes
+        """
+        raise NotImplementedError
+
+    def decompress(self, data):
+        """
+        Parameters
+        ----------
+        data : bytes
+
+        Returns
+        -------
+        bytes
+        """
+        raise NotImplementedError
+
+
+class ZlibCompressor(Compressor):
+    name = 'zlib'
+
+    def module(self):
+        import zlib
+        return zlib
+
+    def compress(self, data, level=None):
+        # Favor speed, the link rather than the cpu is the bottleneck.
+        return self.module().compress(data, 1 if level is None else level)
+
+    def decompress(self, data):
+        return self.module().decompress(data)
+
+
+class LZ4Compressor(Compressor):
+    name = 'lz4'
+
+    def module(self):
+        import lz4.frame
+        return lz4.frame
+
+    def compress(self, data, level=None):
+        return self.module().compress(data, compression_level=level or 0)
+
+    def decompress(self, data):
+        return self.module().decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    name = 'zstd'
+
+    def module(self):
+        import zstandard
+        return zstandard
+
+    def compress(self, data, level=None):
+        return self.module().ZstdCompressor(
+            level=3 if level is None else level).compress(data)
+
+    def decompress(self, data):
+        return self.module().ZstdDecompressor().decompress(data)
+
+
+# Registered compressors, most preferred first.
+COMPRESSORS = [ZstdCompressor(), LZ4Compressor(), ZlibCompressor()]
+
+
+def get(name):
+    """
+    Get a registered compressor.
+
+    Parameters
+    ----------
+    name : str
+
+    Returns
+    -------
+    Compressor
+    """
+    for x in COMPRESSORS:
+        if x.name == name:
+            return x
+    raise KeyError('No compressor named {!r}'.format(name))
+
+
+def available():
+    """
+    Names of the compressors which can be used here, most preferred first.
+
+    Returns
+    -------
+    List[str]
+    """
+    return [x.name for x in COMPRESSORS if x.is_available()]
+
+
+def choose(offered, remote, setting=COMPRESSION):
+    """
+    Pick the compressor to use for a transfer.
+
+    Parameters
+    ----------
+    offered : Iterable[str]
+        Compressors the receiving end can decompress.
+    remote : bool
+        Whether the transfer crosses the network. With the `auto` setting
+        only remote transfers are compressed, as compressing costs more than
+        it saves locally.
+    setting : str
+        A compressor name, `auto` or `none`. See `HYVIEW_COMPRESSION`.
+
+    Returns
+    -------
+    Optional[str]
+        None if the transfer shouldn't be compressed.
+    """
+    offered = set(offered)
+    if setting == NONE or (setting == AUTO and not remote):
+        return None
+    if setting == AUTO:
+        for name in available():
+            if name in offered:
+                return name
+        return None
+    if setting in offered and get(setting).is_available():
+        return setting
+    return None
+
+
+def compress(name, data):
+    """
+    Parameters
+    ----------
+    name : Optional[str]
+    data : bytes
+
+    Returns
+    -------
+    bytes
+    """
+    if name is None:
+        return data
+    return get(name).compress(data, level=COMPRESSION_LEVEL)
+
+
+def decompress(name, data):
+    """
+    Parameters
+    ----------
+    name : Optional[str]
+    data : bytes
+
+    Returns
+    -------
+    bytes
+    """
+    if name is None:
+        return data
+    return get(name).decompress(data)
@@ -1,5 +1,7 @@
 import os
 import logging
+import tempfile
+import multiprocessing
 
 
 HOST = os.environ.get('HYVIEW_HOST', '127.0.0.1')
@@ -10,6 +12,73 @@ APP_PORT = os.environ.get('HYVIEW_APP_PORT', '4241')
 
 # Directory to use for cachine results.
 CACHE_DIR = os.environ.get('HYVIEW_CACHE_DIR', '/tmp/hyview')
+# Size in bytes the cache is allowed to grow to before the least recently used
+# files are removed.
+CACHE_SIZE = int(os.environ.get('HYVIEW_CACHE_SIZE', str(20 * 2 ** 30)))
+
+# Directory for files memory-mapped between processes on the same host. Use
+# shared memory when it's available so the files never touch the disk.
+SHARED_DIR = os.environ.get(
+    'HYVIEW_SHARED_DIR',
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+
+# Number of threads used to hash the files within a directory.
+C4_THREADS = int(os.environ.get(
+    'HYVIEW_C4_THREADS', str(min(8, multiprocessing.cpu_count()))))
+# File to persist the digests of hashed files to. Unchanged files are not
+# read again.
+C4_CACHE = os.environ.get('HYVIEW_C4_CACHE')
+# Version of how objects are encoded into C4 ids. Bump it whenever the id of
+# existing data changes, so geometry cached by the old ids is ignored rather
+# than mistaken for, or shadowing, data under the new ones.
+C4_VERSION = 2
+
+# Number of points sent per chunk when streaming geometry.
+CHUNK_SIZE = int(os.environ.get('HYVIEW_CHUNK_SIZE', '65536'))
+# Number of built geometries kept by the application for Houdini to pull
+# regions of, or to update. The least recently used are dropped beyond it.
+REGIONS = int(os.environ.get('HYVIEW_REGIONS', '16'))
+
+# Number of threads within Houdini receiving and decoding geometry, so a cook
+# only spends its time building it.
+FETCH_THREADS = int(os.environ.get('HYVIEW_FETCH_THREADS', '2'))
+# Number of geometries Houdini receives ahead of cooking them, which bounds
+# the memory they hold. 0 only receives a geometry once it's cooked.
+PREFETCH = int(os.environ.get('HYVIEW_PREFETCH', '4'))
+# Number of chunks received ahead of decoding them. 0 decodes each chunk as
+# it's received.
+STREAM_DEPTH = int(os.environ.get('HYVIEW_STREAM_DEPTH', '8'))
+
+# Compressor for streamed chunks, one of `auto`, `none` or a name from
+# `hyview.compression`. `auto` only compresses when Houdini is remote.
+COMPRESSION = os.environ.get('HYVIEW_COMPRESSION', 'auto')
+# Level passed to the compressor, or its default when unset.
+COMPRESSION_LEVEL = os.environ.get('HYVIEW_COMPRESSION_LEVEL')
+if COMPRESSION_LEVEL is not None:
+    COMPRESSION_LEVEL = int(COMPRESSION_LEVEL)
+# Send positions as uint16 steps within their bounding box and colors as
+# uint8 when streaming. This is lossy, so it's off by default.
+QUANTIZE = os.environ.get('HYVIEW_QUANTIZE', '0').lower() in ('1', 'true')
+
+# JSON lines file each build's timings are appended to, see
+# `hyview.telemetry`.
+TRACE = os.environ.get('HYVIEW_TRACE')
+
+# Number of idle connections kept open per endpoint by `hyview.transport.Pool`.
+POOL_SIZE = int(os.environ.get('HYVIEW_POOL_SIZE', '2'))
+# Seconds a pooled connection may sit idle before it's pinged on reuse.
+POOL_CHECK_INTERVAL = float(os.environ.get('HYVIEW_POOL_CHECK_INTERVAL', '10'))
+
+# Profile the calls served over rpc, see `hyview.profiling`.
+PROFILE = os.environ.get('HYVIEW_PROFILE', '0').lower() in ('1', 'true')
+# Seconds over which a profiled call's `cProfile` stats are dumped as a pstats
+# file to `HYVIEW_PROFILE_DIR`. Unset to not run `cProfile`.
+PROFILE_THRESHOLD = os.environ.get('HYVIEW_PROFILE_THRESHOLD')
+if PROFILE_THRESHOLD is not None:
+    PROFILE_THRESHOLD = float(PROFILE_THRESHOLD)
+PROFILE_DIR = os.environ.get(
+    'HYVIEW_PROFILE_DIR',
+    os.path.join(tempfile.gettempdir(), 'hyview-profiles'))
 
 _LOGGING_LOOKUP = {
     'CRITICAL': logging.CRITICAL,
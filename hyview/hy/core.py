@@ -1,6 +1,9 @@
 """
 Helper methods for hyview in Houdini.
 """
+import functools
+import threading
+
 import hou
 
 
@@ -27,6 +30,31 @@ def root():
     return hou.node('/obj/hyview')
 
 
+def in_main_thread(func):
+    """
+    Wrap a function to run on Houdini's main thread, which is the only
+    thread `hou` may be called from while the UI is running. Without a UI,
+    such as in hython, it's called directly.
+
+    Parameters
+    ----------
+    func : Callable
+
+    Returns
+    -------
+    Callable
+    """
+    @functools.wraps(func)
+    def _wrap(*args, **kwargs):
+        main = isinstance(threading.current_thread(), threading._MainThread)
+        if main or not hou.isUIAvailable():
+            return func(*args, **kwargs)
+        import hdefereval
+        return hdefereval.executeInMainThreadWithResult(func, *args, **kwargs)
+
+    return _wrap
+
+
 class BatchUpdate(object):
     """
     Context manager for blocking any cooking.
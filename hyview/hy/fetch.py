@@ -0,0 +1,306 @@
+"""
+Receiving geometry within Houdini on background threads.
+
+A cook runs on Houdini's main thread, so time it spends waiting on the
+network or decoding chunks is time the UI is frozen. Instead, receiving and
+decoding are jobs run by a few worker threads, and the cook only builds the
+result with `hou` calls.
+
+Jobs are queued when their nodes are created so geometry is usually received
+by the time it's cooked. At most `HYVIEW_PREFETCH` geometries are received
+ahead of their cook, which bounds the memory they hold. A cook asking for a
+geometry that isn't received yet moves it to the front of the queue, past
+that limit, so it never waits on geometry it doesn't need.
+
+Within a job, `pipeline` decodes chunks on another thread while the next
+ones are still being received.
+
+The Fetcher runs in Houdini's python, so this module must stay python2.7
+compatible. Its jobs run off the main thread, where `hou` must not be
+called; only the cook touches `hou`.
+"""
+import threading
+
+import hyview
+from hyview.constants import FETCH_THREADS, PREFETCH, STREAM_DEPTH
+
+from typing import *
+
+
+_logger = hyview.get_logger(__name__)
+
+
+class Job(object):
+    """
+    Geometry being received.
+    """
+    def __init__(self, key, func):
+        """
+        Parameters
+        ----------
+        key : Tuple[Any, ...]
+            Identifies the geometry. Starts with its node name.
+        func : Callable[[], Any]
+            Receives and decodes the geometry.
+        """
+        self.key = key
+        self.func = func
+        # Asked for by a cook, so it's run regardless of the prefetch limit.
+        self.urgent = False
+        self.started = False
+        # Counts towards the prefetch limit until it's taken or discarded.
+        self.held = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # type: Optional[BaseException]
+
+
+class Fetcher(object):
+    """
+    Worker threads running receive jobs, prefetched ones in the order they
+    were queued.
+    """
+    def __init__(self, threads=FETCH_THREADS, depth=PREFETCH):
+        """
+        Parameters
+        ----------
+        threads : int
+        depth : int
+            Number of prefetched jobs which may be running or done but not
+            yet taken.
+        """
+        self.threads = max(1, threads)
+        self.depth = depth
+        self._cond = threading.Condition(threading.Lock())
+        self._queue = []  # type: List[Job]
+        self._jobs = {}  # type: Dict[Tuple[Any, ...], Job]
+        self._held = 0
+        self._workers = []  # type: List[threading.Thread]
+
+    def _start(self):
+        if len(self._workers) >= self.threads:
+            return
+        thread = threading.Thread(
+            target=self._work,
+            name='hyview-fetch-{}'.format(len(self._workers)))
+        thread.daemon = True
+        thread.start()
+        self._workers.append(thread)
+
+    def _next(self):
+        # type: () -> Optional[Job]
+        for job in self._queue:
+            if job.urgent:
+                return job
+        if self._queue and self._held < self.depth:
+            return self._queue[0]
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next()
+                self._queue.remove(job)
+                job.started = True
+                if not job.urgent:
+                    job.held = True
+                    self._held += 1
+
+            try:
+                job.result = job.func()
+            except Exception as e:
+                _logger.debug('Failed to receive {!r}: {}'.format(job.key, e))
+                job.error = e
+            finally:
+                job.done.set()
+
+    def _release(self, job):
+        """
+        Stop counting a job towards the prefetch limit. Must be called with
+        the lock held.
+
+        Parameters
+        ----------
+        job : Job
+        """
+        if job.held:
+            job.held = False
+            self._held -= 1
+            self._cond.notify_all()
+
+    def _drop(self, key):
+        """
+        Forget a job. Must be called with the lock held.
+
+        Parameters
+        ----------
+        key : Tuple[Any, ...]
+        """
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return
+        if not job.started:
+            self._queue.remove(job)
+        self._release(job)
+
+    def prefetch(self, key, func):
+        """
+        Queue a geometry to be received ahead of its cook, replacing any
+        job of the same key.
+
+        Parameters
+        ----------
+        key : Tuple[Any, ...]
+        func : Callable[[], Any]
+        """
+        if self.depth <= 0:
+            return
+        with self._cond:
+            self._drop(key)
+            job = self._jobs[key] = Job(key, func)
+            self._queue.append(job)
+            self._start()
+            self._cond.notify_all()
+
+    def take(self, key, func):
+        """
+        Get a received geometry, waiting for it if needed. It's received now
+        if it wasn't prefetched.
+
+        Parameters
+        ----------
+        key : Tuple[Any, ...]
+        func : Callable[[], Any]
+            Receives the geometry if it wasn't prefetched.
+
+        Returns
+        -------
+        Any
+            What `func` returned.
+        """
+        with self._cond:
+            job = self._jobs.pop(key, None)
+            if job is None:
+                job = Job(key, func)
+                job.urgent = True
+                self._queue.insert(0, job)
+            elif not job.started:
+                job.urgent = True
+                self._queue.remove(job)
+                self._queue.insert(0, job)
+            self._start()
+            self._cond.notify_all()
+
+        job.done.wait()
+
+        with self._cond:
+            self._release(job)
+
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def discard(self, name=None):
+        """
+        Forget the prefetched geometry of a node, such as when it's deleted.
+
+        Parameters
+        ----------
+        name : Optional[str]
+            Defaults to all nodes.
+        """
+        with self._cond:
+            for key in list(self._jobs):
+                if name is None or key[0] == name:
+                    self._drop(key)
+
+
+# Marks the end of the items passed along by `pipeline`.
+_DONE = object()
+
+
+def pipeline(iterable, consume, depth=STREAM_DEPTH):
+    """
+    Consume items on another thread while the next ones are read, such as
+    decoding chunks while the next ones are received.
+
+    At most `depth` items are read ahead of the consumer. Reading waits
+    while that many are queued, so memory stays bounded however slow the
+    consumer is.
+
+    Parameters
+    ----------
+    iterable : Iterable[Any]
+        Read on the calling thread, as the connection it's streamed from is
+        bound to it.
+    consume : Callable[[Iterator[Any]], Any]
+        Called on another thread with an iterator of the items.
+    depth : int
+        0 consumes the items on the calling thread as they're read.
+
+    Returns
+    -------
+    Any
+        What `consume` returned.
+    """
+    try:
+        import queue
+    except ImportError:
+        import Queue as queue
+
+    if depth <= 0:
+        return consume(iter(iterable))
+
+    items = queue.Queue(maxsize=depth)
+    result = {}
+
+    def _items():
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def _consume():
+        try:
+            result['value'] = consume(_items())
+        except Exception as e:
+            result['error'] = e
+        finally:
+            # Let the reader finish rather than wait on a full queue.
+            while True:
+                try:
+                    items.get_nowait()
+                except queue.Empty:
+                    break
+            result['done'] = True
+
+    thread = threading.Thread(target=_consume, name='hyview-pipeline')
+    thread.daemon = True
+    thread.start()
+
+    try:
+        for item in iterable:
+            while 'done' not in result:
+                try:
+                    items.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            else:
+                break
+    finally:
+        while 'done' not in result:
+            try:
+                items.put(_DONE, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        thread.join()
+
+    if 'error' in result:
+        raise result['error']
+    return result['value']
@@ -2,7 +2,9 @@
 Implementation module for remote procedures to run in Houdini.
 """
 import os
-from hyview.constants import CACHE_DIR, HOST, PORT
+import functools
+import threading
+from hyview.constants import CACHE_SIZE, CHUNK_SIZE, HOST, PORT
 import hyview
 
 from typing import *
@@ -11,6 +13,14 @@ from typing import *
 _logger = hyview.get_logger(__name__)
 
 
+# Timings of the builds being streamed, by name.
+_TIMERS = {}  # type: Dict[str, hyview.telemetry.Timer]
+
+# Threads receiving geometry for the cooks, see `_fetcher`.
+_FETCHER = None  # type: Optional[hyview.hy.fetch.Fetcher]
+_FETCHER_LOCK = threading.Lock()
+
+
 @hyview.rpc()
 def all_nodes():
     """
@@ -32,6 +42,31 @@ def clear():
     from hyview.hy.core import root
     for node in root().children():
         node.destroy()
+    _fetcher().discard()
+
+
+@hyview.rpc(main_thread=False)
+def cached(idents):
+    """
+    Get which geometry is already cached, so it doesn't need to be sent.
+    Cached files are marked as used so they aren't evicted before they're
+    read.
+
+    Parameters
+    ----------
+    idents : List[str]
+        See `hyview.cache.ident`.
+
+    Returns
+    -------
+    List[str]
+    """
+    import hyview.cache
+
+    index = hyview.cache.Index()
+    result = index.cached(idents)
+    index.touch(*result)
+    return result
 
 
 @hyview.rpc()
@@ -44,10 +79,34 @@ def sync_complete(name):
     ----------
     name : str
     """
+    _sync_complete([name])
+
+
+@hyview.rpc()
+def sync_complete_many(names):
+    """
+    Called after many geometry syncs are completed. See `sync_complete`.
+
+    Parameters
+    ----------
+    names : Iterable[str]
+    """
+    _sync_complete(names)
+
+
+def _sync_complete(names):
+    """
+    Remove the python nodes syncing the data of the geometries `names`.
+
+    Parameters
+    ----------
+    names : Iterable[str]
+    """
     import hyview.hy.core
 
+    lookup = set(names)
     for node in hyview.hy.core.root().children():
-        if node.name() == name:
+        if node.name() in lookup:
             for child in node.children():
                 if child.type().name() == 'python':
                     child.destroy()
@@ -80,6 +139,541 @@ def build(geo, attrs, points):
             p.setAttribValue(k, v)
 
 
+def build_blocks(geo, attrs, blocks):
+    """
+    Build a geometry in Houdini from blocks of plain values, see
+    `ApplicationInterface.iter_point_blocks`. Points are created in one call
+    and numeric attributes set from single buffers, while other attributes
+    are set point by point.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    attrs : Iterable[Dict[str, Any]]
+    blocks : Iterable[Dict[str, Any]]
+    """
+    import hou
+    import numpy
+
+    blocks = list(blocks)
+
+    for attr in attrs:
+        geo.addAttrib(
+            getattr(hou.attribType, attr['type']),
+            attr['name'],
+            default_value=attr['default'])
+
+    points = geo.createPoints(
+        [tuple(x) for block in blocks for x in block['positions']])
+
+    names = set(k for block in blocks for k in block['columns'])
+    for name in sorted(names):
+        values = [x for block in blocks for x in block['columns'][name]]
+        array = numpy.asarray(values)
+        if array.dtype.kind in 'biuf':
+            _set_column(geo, name, array)
+        else:
+            for point, value in zip(points, values):
+                point.setAttribValue(name, value)
+
+
+def build_columns(geo, attrs, positions, columns):
+    """
+    Build a geometry in Houdini from columns using the bulk geometry methods.
+    All points are created in one call and each attribute is set from a
+    single buffer.
+
+    The geometry is expected to be empty, as the bulk setters assign values
+    for every point of the geometry.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    attrs : Iterable[Dict[str, Any]]
+    positions : numpy.ndarray
+        Point positions with shape (N, 3).
+    columns : Dict[str, numpy.ndarray]
+        Point attribute values by attribute name.
+    """
+    import hou
+    import numpy
+
+    for attr in attrs:
+        geo.addAttrib(
+            getattr(hou.attribType, attr['type']),
+            attr['name'],
+            default_value=attr['default'])
+
+    geo.createPoints(((0.0, 0.0, 0.0),) * len(positions))
+
+    _set_column(geo, 'P', positions)
+
+    for name, values in columns.items():
+        _set_column(geo, name, values)
+
+
+def _set_column(geo, name, values):
+    """
+    Set the values of a point attribute for every point from a single
+    buffer.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    name : str
+    values : numpy.ndarray
+    """
+    import hou
+    import numpy
+
+    if values.dtype.kind == 'f':
+        geo.setPointFloatAttribValuesFromString(
+            name,
+            numpy.ascontiguousarray(values, dtype=numpy.float32).tobytes(),
+            float_type=hou.numericData.Float32)
+    else:
+        geo.setPointIntAttribValuesFromString(
+            name,
+            numpy.ascontiguousarray(values, dtype=numpy.int32).tobytes(),
+            int_type=hou.numericData.Int32)
+
+
+def _get_column(geo, name, kind):
+    """
+    Read the values of a point attribute for every point into an array.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    name : str
+    kind : str
+        The numpy dtype kind of the values.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    import hou
+    import numpy
+
+    if kind == 'f':
+        data = geo.pointFloatAttribValuesAsString(
+            name, float_type=hou.numericData.Float32)
+        values = numpy.frombuffer(data, dtype=numpy.float32)
+    else:
+        data = geo.pointIntAttribValuesAsString(
+            name, int_type=hou.numericData.Int32)
+        values = numpy.frombuffer(data, dtype=numpy.int32)
+
+    size = geo.findPointAttrib(name).size()
+    if size > 1:
+        values = values.reshape(-1, size)
+    return values.copy()
+
+
+def build_chunks(geo, attrs, info, chunks):
+    """
+    Build a geometry in Houdini from binary chunks. Chunks are collected into
+    columns which are then built in bulk.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    attrs : Iterable[Dict[str, Any]]
+    info : Dict[str, Any]
+        The negotiated transfer. See `ApplicationInterface.negotiate`.
+    chunks : Iterable[Dict[str, Any]]
+    """
+    import hyview.codec
+
+    columns = decode_chunks(info, chunks)
+    positions = columns.pop(hyview.codec.POSITION)
+    build_columns(geo, attrs, positions, columns)
+
+
+def decode_chunks(info, chunks):
+    """
+    Collect binary chunks into columns. This doesn't call `hou`, so it can
+    run outside of a cook.
+
+    Parameters
+    ----------
+    info : Dict[str, Any]
+        The negotiated transfer. See `ApplicationInterface.negotiate`.
+    chunks : Iterable[Dict[str, Any]]
+
+    Returns
+    -------
+    Dict[str, numpy.ndarray]
+        Point attribute values by attribute name, including positions.
+    """
+    import numpy
+    import hyview.codec
+
+    count = info['count']
+
+    columns = {}
+    for entry in info['layout']:
+        shape = (count, entry['size']) if entry['size'] > 1 else (count,)
+        columns[entry['name']] = numpy.empty(
+            shape, dtype=numpy.dtype(str(entry['dtype'])))
+
+    compression = info.get('compression')
+    for chunk in chunks:
+        start, stop = chunk['start'], chunk['start'] + chunk['count']
+        decoded = hyview.codec.decode_chunk(info['layout'], chunk, compression)
+        for k, v in decoded.items():
+            columns[k][start:stop] = v
+
+    return columns
+
+
+def build_patch(geo, layout, chunks):
+    """
+    Patch the changed points of some columns of an existing geometry. Each
+    column is read in bulk, patched and then set back in bulk.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    layout : List[Dict[str, Any]]
+        See `hyview.codec.patch_layout`.
+    chunks : Iterable[Dict[str, Any]]
+    """
+    import hou
+    import numpy
+    import hyview.codec
+
+    entries = {}
+    columns = {}
+    for entry in layout:
+        name = entry['name']
+        kind = numpy.dtype(str(entry['dtype'])).kind
+        if geo.findPointAttrib(name) is None:
+            default = 0.0 if kind == 'f' else 0
+            geo.addAttrib(
+                hou.attribType.Point, name,
+                default_value=(default,) * entry['size']
+                if entry['size'] > 1 else default)
+        entries[name] = entry
+        columns[name] = _get_column(geo, name, kind)
+
+    for chunk in chunks:
+        name = chunk['name']
+        start, stop = chunk['start'], chunk['start'] + chunk['count']
+        values = hyview.codec.decode_chunk([entries[name]], chunk)[name]
+        columns[name][start:stop] = values
+
+    for name, values in columns.items():
+        _set_column(geo, name, values)
+
+
+def build_mapped(geo, attrs, info):
+    """
+    Build a geometry in Houdini from columns memory-mapped from a file written
+    by the application.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    attrs : Iterable[Dict[str, Any]]
+    info : Dict[str, Any]
+        The negotiated transfer. See `ApplicationInterface.negotiate`.
+    """
+    import hyview.codec
+
+    with hyview.codec.map_columns(
+            info['path'], info['layout'], info['count']) as columns:
+        _build_columns(geo, attrs, columns)
+
+
+def _build_columns(geo, attrs, columns):
+    """
+    Build a geometry from columns which include its positions. No reference
+    to the columns is kept, so mapped ones can be closed after.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    attrs : Iterable[Dict[str, Any]]
+    columns : Dict[str, numpy.ndarray]
+    """
+    import hyview.codec
+
+    columns = dict(columns)
+    positions = columns.pop(hyview.codec.POSITION)
+    build_columns(geo, attrs, positions, columns)
+
+
+def _connection():
+    """
+    Get a connection to the application from the shared pool, so cooks reuse
+    the same sockets.
+
+    Returns
+    -------
+    ContextManager[hyview.transport.Client]
+    """
+    import hyview.transport
+
+    return hyview.transport.pool(
+        'tcp://{}:{}'.format(HOST, PORT)).connection()
+
+
+def _timer(name):
+    """
+    Start timing the stages of a build within Houdini. The timings are sent
+    to the application by `cook_complete`.
+
+    Parameters
+    ----------
+    name : str
+
+    Returns
+    -------
+    hyview.telemetry.Timer
+    """
+    import hyview.telemetry
+
+    timer = _TIMERS[name] = hyview.telemetry.Timer()
+    return timer
+
+
+def _fetcher():
+    """
+    Get the threads receiving geometry for the cooks, starting them on first
+    use.
+
+    Returns
+    -------
+    hyview.hy.fetch.Fetcher
+    """
+    import hyview.hy.fetch
+
+    global _FETCHER
+    with _FETCHER_LOCK:
+        if _FETCHER is None:
+            _FETCHER = hyview.hy.fetch.Fetcher()
+        return _FETCHER
+
+
+def _receive(name, frame=None, bbox=None, timer=None):
+    """
+    Negotiate the transfer of a geometry, receive it and decode it. This
+    doesn't call `hou`, so it runs on the fetch threads rather than within
+    the cook.
+
+    Parameters
+    ----------
+    name : str
+    frame : Optional[int]
+        Frame of a sequence.
+    bbox : Optional[List[List[float]]]
+        Only receive the points within a bounding box.
+    timer : Optional[hyview.telemetry.Timer]
+        Times negotiating, receiving and decoding the geometry.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The negotiated transfer `info` and the received `attrs`, along with
+        either the `columns` or the `blocks` of the geometry.
+    """
+    import hyview.codec
+    import hyview.compression
+    import hyview.telemetry
+    import hyview.hy.fetch
+
+    if timer is None:
+        timer = hyview.telemetry.Timer()
+
+    modes = [hyview.codec.MODE_CHUNKED, hyview.codec.MODE_POINTS]
+    if hyview.codec.is_local(HOST) and bbox is None:
+        modes.insert(0, hyview.codec.MODE_MAPPED)
+
+    options = {
+        'modes': modes,
+        'chunk_size': CHUNK_SIZE,
+        'compressions': hyview.compression.available(),
+        'quantize': True,
+    }
+    if bbox is not None:
+        options['bbox'] = bbox
+
+    with _connection() as client:
+        with timer.stage('negotiate'):
+            info = client.negotiate(name, options, frame)
+
+        result = {'info': info}
+        result['attrs'] = list(timer.iter(
+            'receive', client.iter_attributes(name, frame, bbox)))
+
+        if info['mode'] == hyview.codec.MODE_MAPPED:
+            with timer.stage('decode'):
+                result['columns'] = hyview.codec.map_columns(
+                    info['path'], info['layout'], info['count'])
+        elif info['mode'] == hyview.codec.MODE_CHUNKED:
+            result['columns'] = hyview.hy.fetch.pipeline(
+                timer.iter('receive', client.iter_chunks(
+                    name, info['chunk_size'], frame, bbox, info['layout'],
+                    info.get('compression'))),
+                functools.partial(_decode, info, timer))
+        else:
+            result['blocks'] = list(timer.iter(
+                'receive', client.iter_point_blocks(
+                    name, CHUNK_SIZE, frame, bbox)))
+
+    return result
+
+
+def _decode(info, timer, chunks):
+    """
+    Decode chunks as they're received. See `decode_chunks`.
+
+    Parameters
+    ----------
+    info : Dict[str, Any]
+    timer : hyview.telemetry.Timer
+        Times decoding, but not waiting for the chunks.
+    chunks : Iterator[Dict[str, Any]]
+
+    Returns
+    -------
+    Dict[str, numpy.ndarray]
+    """
+    import hyview.telemetry
+
+    # Waits are timed apart, as the receiving thread adds to `timer` too.
+    waits = hyview.telemetry.Timer()
+    columns = decode_chunks(info, waits.iter('wait', chunks))
+    timer.add('decode', waits.elapsed() - waits.stages.get('wait', 0.0))
+    return columns
+
+
+def _receive_patch(name, timer):
+    """
+    Receive the changed columns of an update. See `_receive`.
+
+    Parameters
+    ----------
+    name : str
+    timer : hyview.telemetry.Timer
+
+    Returns
+    -------
+    Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]
+        The layout of the changed columns and their chunks.
+    """
+    with _connection() as client:
+        with timer.stage('negotiate'):
+            layout = client.patch_layout(name)
+        chunks = list(timer.iter(
+            'receive', client.iter_patch(name, CHUNK_SIZE)))
+    return layout, chunks
+
+
+def _prefetch(name, frame=None, timer=None):
+    """
+    Start receiving a geometry ahead of its cook, so the cook only has to
+    build it.
+
+    Only one frame of a sequence is received at a time, as the application
+    replaces the file a sequence is mapped from with each frame.
+
+    Parameters
+    ----------
+    name : str
+    frame : Optional[int]
+        Frame of a sequence.
+    timer : Optional[hyview.telemetry.Timer]
+        Defaults to a new timer for the build.
+    """
+    if timer is None:
+        timer = _timer(name)
+        _fetcher().discard(name)
+    _fetcher().prefetch(
+        (name, frame, None),
+        functools.partial(_receive, name, frame, None, timer))
+
+
+def _take(name, frame=None, bbox=None, timer=None):
+    """
+    Get a geometry received by the fetch threads, waiting for it if needed.
+
+    Parameters
+    ----------
+    name : str
+    frame : Optional[int]
+        Frame of a sequence.
+    bbox : Optional[List[List[float]]]
+        Only the points within a bounding box.
+    timer : Optional[hyview.telemetry.Timer]
+        Times waiting on the fetch threads.
+
+    Returns
+    -------
+    Dict[str, Any]
+        See `_receive`.
+    """
+    import hyview.telemetry
+
+    if timer is None:
+        timer = hyview.telemetry.Timer()
+
+    key = (name, frame,
+           None if bbox is None else tuple(tuple(x) for x in bbox))
+    with timer.stage('fetch'):
+        return _fetcher().take(
+            key, functools.partial(_receive, name, frame, bbox, timer))
+
+
+def _build(geo, received, timer=None):
+    """
+    Build a received geometry.
+
+    Parameters
+    ----------
+    geo : hou.Geometry
+    received : Dict[str, Any]
+        See `_receive`.
+    timer : Optional[hyview.telemetry.Timer]
+    """
+    import hyview.codec
+    import hyview.telemetry
+
+    if timer is None:
+        timer = hyview.telemetry.Timer()
+
+    with timer.stage('build'):
+        if 'blocks' in received:
+            build_blocks(geo, received['attrs'], received['blocks'])
+        else:
+            columns = received['columns']
+            try:
+                _build_columns(geo, received['attrs'], columns)
+            finally:
+                if isinstance(columns, hyview.codec.MappedColumns):
+                    columns.close()
+
+
+def _stream(name, geo, frame=None, bbox=None, timer=None):
+    """
+    Build a geometry, once the fetch threads have received it.
+
+    Parameters
+    ----------
+    name : str
+    geo : hou.Geometry
+    frame : Optional[int]
+        Frame of a sequence.
+    bbox : Optional[List[List[float]]]
+        Only build the points within a bounding box.
+    timer : Optional[hyview.telemetry.Timer]
+        Times waiting on the fetch threads and building the geometry.
+    """
+    _build(geo, _take(name, frame, bbox, timer), timer)
+
+
 def stream(node):
     """
     Called from the Houdini python node to build the geometry.
@@ -88,17 +682,125 @@ def stream(node):
     ----------
     node : hou.Node
     """
-    import hyview.transport
-
     name = node.parent().name()
 
     _logger.debug('RPC build called for {!r}...'.format(name))
 
-    client = hyview.transport.Client()
-    client.connect('tcp://{}:{}'.format(HOST, PORT))
+    timer = _TIMERS.get(name) or _timer(name)
+    _stream(name, node.geometry(), timer=timer)
+    timer.mark('streamed')
+
+
+def stream_sequence(node, key, frames):
+    """
+    Called from the Houdini python node to build all frames of a sequence.
+
+    Frames are built in order and each is written to the cache as soon as
+    it's built. Each frame is received while the one before it is built.
+    The node outputs the current frame.
+
+    Parameters
+    ----------
+    node : hou.Node
+    key : str
+        C4 id of the sequence the cache is stored by.
+    frames : Iterable[int]
+    """
+    import hou
+    import hyview.cache
+
+    name = node.parent().name()
+    current = hou.intFrame()
+
+    _logger.debug('RPC build sequence called for {!r}...'.format(name))
+
+    index = hyview.cache.Index()
+    if not os.path.isdir(index.directory):
+        os.makedirs(index.directory)
+
+    frames = list(frames)
+    timer = _TIMERS.get(name) or _timer(name)
+    idents = []
+    for i, frame in enumerate(frames):
+        received = _take(name, frame, timer=timer)
+        if i + 1 < len(frames):
+            _prefetch(name, frames[i + 1], timer=timer)
+
+        geo = hou.Geometry()
+        _build(geo, received, timer)
 
-    with client as c:
-        build(node.geometry(), c.iter_attributes(), c.iter_points())
+        ident = hyview.cache.ident(key, frame)
+        path = hyview.cache.path(key, frame)
+        with timer.stage('write'):
+            geo.saveToFile(path)
+        index.add(ident, path)
+        idents.append(ident)
+
+        if frame == current:
+            node.geometry().merge(geo)
+
+    for x in index.evict(CACHE_SIZE, keep=idents):
+        _logger.debug('Evicted {!r} from the cache'.format(x))
+
+    timer.mark('streamed')
+
+
+def stream_patch(node, path):
+    """
+    Called from the Houdini python node to patch the changed attributes of a
+    geometry into its previously cached file.
+
+    Parameters
+    ----------
+    node : hou.Node
+    path : str
+        The cached file of the geometry being patched.
+    """
+    name = node.parent().name()
+
+    _logger.debug('RPC patch called for {!r}...'.format(name))
+
+    timer = _TIMERS.get(name) or _timer(name)
+
+    geo = node.geometry()
+    geo.clear()
+    with timer.stage('read'):
+        geo.loadFromFile(path)
+
+    with timer.stage('fetch'):
+        layout, chunks = _fetcher().take(
+            (name, 'patch'), functools.partial(_receive_patch, name, timer))
+    with timer.stage('build'):
+        build_patch(geo, layout, chunks)
+
+    timer.mark('streamed')
+
+
+def stream_box(node, name, bbox=None):
+    """
+    Called from the Houdini python node to build only the points of a
+    geometry within a bounding box. The box defaults to the bounding box of
+    the node's input, so moving the input refreshes the points.
+
+    Parameters
+    ----------
+    node : hou.Node
+    name : str
+        Name of the geometry to crop.
+    bbox : Optional[List[List[float]]]
+    """
+    geo = node.geometry()
+
+    if bbox is None:
+        box = geo.boundingBox()
+        bbox = [list(box.minvec()), list(box.maxvec())]
+
+    # Replace the input geometry with the crop.
+    geo.clear()
+
+    _logger.debug('RPC build box called for {!r}...'.format(name))
+
+    _stream(name, geo, bbox=bbox)
 
 
 def cook_complete(node):
@@ -109,23 +811,154 @@ def cook_complete(node):
     ----------
     node : hou.Node
     """
-    import hyview.transport
+    import hyview.cache
+    import hyview.telemetry
 
     name = node.parent().name()
 
     _logger.debug('RPC complete called for {!r}...'.format(name))
 
-    client = hyview.transport.Client()
-    client.connect('tcp://{}:{}'.format(HOST, PORT))
+    # The file node writes the cache after the geometry is streamed.
+    timer = _TIMERS.pop(name, None)
+    stages = {}
+    if timer is not None:
+        if 'streamed' in timer.marks:
+            timer.since('write', timer.marks['streamed'])
+        stages = timer.stages
+
+    # The file node has written (or read) the cache by now.
+    path = node.input(0).evalParm('file')
+    if os.path.exists(path):
+        ident = os.path.splitext(os.path.basename(path))[0]
+        index = hyview.cache.Index()
+        index.add(ident, path)
+        for x in index.evict(CACHE_SIZE, keep=[ident]):
+            _logger.debug('Evicted {!r} from the cache'.format(x))
 
-    with client as c:
-        c.complete()
+    with _connection() as c:
+        c.complete(name, {
+            'stages': stages,
+            'peak_memory': hyview.telemetry.peak_memory(),
+        })
 
     node.parm('python').set('')
 
 
+def _create(name, key, frame, index, cache=True, frames=None):
+    """
+    Create the nodes for a new geometry. This should be called within a
+    `BatchUpdate` with the frame already set.
+
+    Parameters
+    ----------
+    name : str
+    key : str
+        C4 id of the geometry the cache is stored by.
+    frame : int
+    index : hyview.cache.Index
+    cache : bool
+        Use existing cached files with `key` identifier if it exists.
+    frames : Optional[List[int]]
+        Frame numbers of a sequence. All frames are cached by the one node.
+    """
+    from hyview.hy.core import root
+
+    geo = root().createNode('geo', node_name=name)
+    geo.moveToGoodPosition()
+
+    fnode = geo.createNode('file')
+    fnode.parm('filemode').set(0)
+
+    _load(geo, fnode, key, frame, index, cache=cache, frames=frames)
+
+
+def _load(geo, fnode, key, frame, index, cache=True, frames=None,
+          source=None):
+    """
+    Point the file node of a geometry at the cache of `key`, and connect the
+    python nodes which stream the geometry if it isn't cached yet.
+
+    Parameters
+    ----------
+    geo : hou.Node
+    fnode : hou.Node
+    key : str
+    frame : int
+    index : hyview.cache.Index
+    cache : bool
+    frames : Optional[List[int]]
+    source : Optional[str]
+        Python code of the node which streams the geometry. Defaults to
+        `stream` or `stream_sequence`, and the geometry starts being received
+        right away.
+
+    Returns
+    -------
+    bool
+        False if the geometry is read from the cache rather than streamed.
+    """
+    import hyview.cache
+    from hyview.hy.core import reformat_python
+
+    fpath = hyview.cache.pattern(key)
+
+    idents = []
+    for x in frames or [frame]:
+        ident = hyview.cache.ident(key, x)
+        cache_path = hyview.cache.path(key, x)
+        if os.path.exists(cache_path) and index.get(ident) is None:
+            # Cached before the index existed.
+            index.add(ident, cache_path)
+        idents.append(ident)
+
+    use_cache = False
+    if all(index.get(x) is not None for x in idents):
+        if not cache:
+            for x in idents:
+                index.remove(x)
+        else:
+            index.touch(*idents)
+            use_cache = True
+
+    fnode.parm('file').set(fpath)
+
+    signal_node = geo.createNode('python')
+    signal_node.moveToGoodPosition()
+    signal_node.setInput(0, fnode)
+    signal_node.parm('python').set(reformat_python('''
+        import hyview.hy.impl
+        hyview.hy.impl.cook_complete(hou.pwd())
+    '''))
+    signal_node.setDisplayFlag(True)
+
+    if not use_cache:
+        if source is None:
+            _prefetch(geo.name(), frames[0] if frames else None)
+        if source is None and frames:
+            source = '''
+                import hyview.hy.impl
+                hyview.hy.impl.stream_sequence(hou.pwd(), {!r}, {!r})
+            '''.format(str(key), [int(x) for x in frames])
+        elif source is None:
+            source = '''
+                import hyview.hy.impl
+                hyview.hy.impl.stream(hou.pwd())
+            '''
+        python_in = geo.createNode('python')
+        python_in.parm('python').set(reformat_python(source))
+        python_in.moveToGoodPosition()
+        fnode.setInput(0, python_in)
+    else:
+        fnode.setInput(0, None)
+
+    fnode.moveToGoodPosition()
+    signal_node.moveToGoodPosition()
+
+    return not use_cache
+
+
 @hyview.rpc()
-def create(name, frame=1, cache=True):
+def create(name, frame=1, cache=True, key=None):
     """
     Create a new geometry.
 
@@ -137,72 +970,237 @@ def create(name, frame=1, cache=True):
     name : str
     frame : int
     cache : bool
-        Use existing cached files with `name` identifier if it exists.
+        Use existing cached files with `key` identifier if it exists.
+    key : Optional[str]
+        C4 id of the geometry. Defaults to `name`.
     """
-    import hou
-    from hyview.hy.core import root, BatchUpdate, reformat_python
+    _create_many(
+        [name], frame=frame, cache=cache,
+        keys=None if key is None else [key])
 
-    hou.setFrame(frame)
 
-    fpath = os.path.join(CACHE_DIR, '{}.$F4.bgeo'.format(name))
-    cache_path = hou.expandString(fpath)
+@hyview.rpc()
+def create_many(names, frame=1, cache=True, keys=None, frames=None):
+    """
+    Create many new geometries at once. All nodes are created within a single
+    `BatchUpdate`.
 
-    use_cache = False
-    if os.path.exists(cache_path):
-        if not cache:
-            os.remove(cache_path)
-        else:
-            use_cache = True
+    Parameters
+    ----------
+    names : Iterable[str]
+    frame : int
+    cache : bool
+        Use existing cached files with `keys` identifiers if they exist.
+    keys : Optional[Iterable[str]]
+        C4 ids of the geometries. Defaults to `names`.
+    frames : Optional[Iterable[Optional[List[int]]]]
+        Frame numbers of each geometry which is a sequence, otherwise None.
+    """
+    _create_many(names, frame=frame, cache=cache, keys=keys, frames=frames)
+
+
+def _create_many(names, frame=1, cache=True, keys=None, frames=None):
+    """
+    Parameters
+    ----------
+    names : Iterable[str]
+    frame : int
+    cache : bool
+    keys : Optional[Iterable[str]]
+    frames : Optional[Iterable[Optional[List[int]]]]
+    """
+    import hou
+    import hyview.cache
+    from hyview.hy.core import root, BatchUpdate
+
+    names = list(names)
+    keys = names if keys is None else list(keys)
+    frames = [None] * len(names) if frames is None else list(frames)
+
+    hou.setFrame(frame)
 
+    lookup = set(names)
     for node in root().children():
-        if node.name() == name:
+        if node.name() in lookup:
             node.destroy()
 
+    index = hyview.cache.Index()
+
     with BatchUpdate():
+        for name, key, numbers in zip(names, keys, frames):
+            _create(name, key, frame, index, cache=cache, frames=numbers)
 
-        geo = root().createNode('geo', node_name=name)
-        geo.moveToGoodPosition()
 
-        fnode = geo.createNode('file')
-        fnode.parm('file').set(fpath)
-        fnode.parm('filemode').set(0)
+@hyview.rpc()
+def refine(name, key, frame=1, cache=True):
+    """
+    Replace the geometry of an existing node, such as with a finer level of
+    detail. The node is kept and only its cache is swapped.
 
-        signal_node = geo.createNode('python')
-        signal_node.moveToGoodPosition()
-        signal_node.setInput(0, fnode)
-        signal_node.parm('python').set(reformat_python('''
-            import hyview.hy.impl
-            hyview.hy.impl.cook_complete(hou.pwd())
-        '''))
-        signal_node.setDisplayFlag(True)
+    Parameters
+    ----------
+    name : str
+    key : str
+        C4 id of the new geometry.
+    frame : int
+    cache : bool
+        Use existing cached files with `key` identifier if it exists.
+    """
+    import hou
+    import hyview.cache
+    from hyview.hy.core import BatchUpdate
+
+    geo, fnode = _reset(name)
+
+    hou.setFrame(frame)
+
+    with BatchUpdate():
+        _load(geo, fnode, key, frame, hyview.cache.Index(), cache=cache)
+
+
+@hyview.rpc()
+def patch(name, key, base, frame=1):
+    """
+    Patch changed attributes into an existing geometry. The geometry is read
+    from the cache of `base` and the result is cached as `key`.
+
+    Parameters
+    ----------
+    name : str
+    key : str
+        C4 id of the patched geometry.
+    base : str
+        C4 id of the geometry being patched.
+    frame : int
+
+    Returns
+    -------
+    bool
+        False if `base` is no longer cached, so it can't be patched.
+    """
+    import hou
+    import hyview.cache
+    from hyview.hy.core import BatchUpdate
+
+    path = hyview.cache.path(base, frame)
+    if not os.path.exists(path):
+        return False
+
+    geo, fnode = _reset(name)
+
+    hou.setFrame(frame)
 
-        if not use_cache:
-            python_in = geo.createNode('python')
-            python_in.parm('python').set(reformat_python('''
+    with BatchUpdate():
+        streams = _load(
+            geo, fnode, key, frame, hyview.cache.Index(), source='''
                 import hyview.hy.impl
-                hyview.hy.impl.stream(hou.pwd())
-            '''))
-            python_in.moveToGoodPosition()
-            fnode.setInput(0, python_in)
+                hyview.hy.impl.stream_patch(hou.pwd(), {!r})
+            '''.format(str(path)))
+        if streams:
+            _fetcher().prefetch((name, 'patch'), functools.partial(
+                _receive_patch, name, _timer(name)))
+
+    return True
+
+
+def _reset(name):
+    """
+    Remove the python nodes of an existing geometry.
+
+    Parameters
+    ----------
+    name : str
+
+    Returns
+    -------
+    Tuple[hou.Node, hou.Node]
+        The geometry and its file node.
+    """
+    from hyview.hy.core import root
+
+    geo = root().node(name)
+    if geo is None:
+        raise KeyError('No node named {!r}'.format(name))
+    _fetcher().discard(name)
+
+    fnode = None
+    for child in geo.children():
+        if child.type().name() == 'python':
+            child.destroy()
+        elif fnode is None and child.type().name() == 'file':
+            fnode = child
+    if fnode is None:
+        raise KeyError('Node {!r} has no file node'.format(name))
+    return geo, fnode
+
+
+@hyview.rpc()
+def inspect(name, bbox, node_name=None):
+    """
+    Create a node showing only the points of a geometry within a bounding
+    box. The box is a regular box node, so it can be moved and resized to
+    inspect other regions without rebuilding anything.
+
+    The geometry must have been built from memory by this application. See
+    `hyview.spatial`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the geometry to inspect.
+    bbox : List[List[float]]
+        The lower and upper corners.
+    node_name : Optional[str]
+        Defaults to `{name}_box`.
+    """
+    from hyview.hy.core import root, reformat_python, BatchUpdate
+
+    node_name = node_name or '{}_box'.format(name)
+    lower, upper = bbox
+
+    existing = root().node(node_name)
+    if existing is not None:
+        existing.destroy()
+
+    with BatchUpdate():
+        geo = root().createNode('geo', node_name=node_name)
+        geo.moveToGoodPosition()
+
+        box = geo.createNode('box')
+        box.parmTuple('size').set([b - a for a, b in zip(lower, upper)])
+        box.parmTuple('t').set([(a + b) / 2.0 for a, b in zip(lower, upper)])
+
+        python_in = geo.createNode('python')
+        python_in.setInput(0, box)
+        python_in.parm('python').set(reformat_python('''
+            import hyview.hy.impl
+            hyview.hy.impl.stream_box(hou.pwd(), {!r})
+        '''.format(str(name))))
+        python_in.setDisplayFlag(True)
 
-        fnode.moveToGoodPosition()
-        signal_node.moveToGoodPosition()
+        box.moveToGoodPosition()
+        python_in.moveToGoodPosition()
 
 
 # Provided helper methods that are more for examples.
 
 
 @hyview.rpc()
-def mesh_all(**kwargs):
+def mesh_all(parms=None, **kwargs):
     """
     Create a particle fliud mesh for all geo within the hyview root subnet.
 
     Parameters
     ----------
+    parms : Optional[Dict[str, Any]]
+        Parameter values of the mesh nodes. Calls over rpc must pass them
+        this way, as `**kwargs` can't be sent.
     kwargs : **Any
+        Parameter values, taking precedence over `parms`.
     """
     import hyview.hy.core
 
+    kwargs = dict(parms or {}, **kwargs)
     kwargs.setdefault('particlesep', 8)
     kwargs.setdefault('transferattribs', 'Cd')
 
@@ -2,6 +2,7 @@
 Initialization methods for the Houdini RPC server.
 """
 import os
+import inspect
 import threading
 import hyview.transport
 import hyview.plugins
@@ -29,9 +30,19 @@ def _run(plugin_paths=None):
     if plugin_paths:
         hyview.plugins.import_modules(plugin_paths)
 
-    hyview.hy.core.initialize()
+    hyview.hy.core.in_main_thread(hyview.hy.core.initialize)()
 
-    s = hyview.transport.Server(hyview.plugins.RPC_METHODS)
+    # The server's thread receives the calls, and those calling hou are
+    # handed to the main thread. Streamed methods stay on the server's
+    # thread, as they're resumed for each item.
+    methods = {}
+    for k, f in hyview.plugins.RPC_METHODS.items():
+        if k in hyview.plugins.RPC_MAIN_THREAD \
+                and not inspect.isgeneratorfunction(f):
+            f = hyview.hy.core.in_main_thread(f)
+        methods[k] = f
+
+    s = hyview.transport.Server(methods)
     s.bind('tcp://{}:{}'.format(HOST, APP_PORT))
     _logger.debug('Starting hyview controller')
     s.run()
@@ -6,6 +6,10 @@ These objects act as the interface between the python sessions.
 import attr
 from attr.validators import in_ as choices
 
+import numpy
+
+from hyview.c4 import C4, to_bytes
+
 from typing import *
 
 
@@ -41,6 +45,62 @@ class AttributeDefinition(object):
     type = attr.ib(type=str, validator=choices(Types.ALL))
     default = attr.ib(type=Union[str, Tuple, int, float], default=-1)
 
+    @classmethod
+    def from_array(cls, name, array, type=Types.Point):
+        """
+        Infer an attribute definition from an array of values.
+
+        Parameters
+        ----------
+        name : str
+        array : numpy.ndarray
+            Array with shape (N,) or (N, size).
+        type : str
+
+        Returns
+        -------
+        AttributeDefinition
+        """
+        array = numpy.asarray(array)
+        if array.dtype.kind in 'f':
+            value = 0.0
+        elif array.dtype.kind in 'iub':
+            value = 0
+        else:
+            value = ''
+        if array.ndim > 1:
+            default = (value,) * array.shape[1]
+        else:
+            default = value
+        return cls(name=name, type=type, default=default)
+
+    @property
+    def size(self):
+        # type: () -> int
+        """
+        Number of components of each value (e.g. 3 for a color).
+        """
+        if isinstance(self.default, (tuple, list)):
+            return len(self.default)
+        return 1
+
+    @property
+    def dtype(self):
+        # type: () -> numpy.dtype
+        """
+        Numpy dtype used to store values of this attribute in columns.
+        Houdini stores numeric attributes as 32 bit values by default.
+        """
+        if isinstance(self.default, (tuple, list)):
+            values = self.default
+        else:
+            values = (self.default,)
+        if any(isinstance(x, float) for x in values):
+            return numpy.dtype(numpy.float32)
+        elif all(isinstance(x, int) for x in values):
+            return numpy.dtype(numpy.int32)
+        return numpy.dtype(object)
+
 
 @attr.s
 class Point(object):
@@ -66,21 +126,758 @@ class Point(object):
         return self.x, self.y, self.z
 
 
-@attr.s
+def _as_positions(value):
+    """
+    Converter for geometry positions to a contiguous float32 Nx3 array.
+
+    Parameters
+    ----------
+    value : Optional[numpy.ndarray]
+
+    Returns
+    -------
+    Optional[numpy.ndarray]
+    """
+    if value is None:
+        return None
+    return numpy.ascontiguousarray(value, dtype=numpy.float32).reshape(-1, 3)
+
+
+def _as_points(value):
+    """
+    Converter for geometry points, reading an iterator of them once so they
+    can be read again.
+
+    Parameters
+    ----------
+    value : Optional[Iterable[Point]]
+
+    Returns
+    -------
+    Optional[Sequence[Point]]
+    """
+    if value is None or hasattr(value, '__len__'):
+        return value
+    return list(value)
+
+
+class _PointView(object):
+    """
+    Read-only sequence of `Point` objects generated on demand from the
+    columns of a geometry.
+    """
+    def __init__(self, geo):
+        """
+        Parameters
+        ----------
+        geo : Geometry
+        """
+        self._geo = geo
+
+    def __len__(self):
+        return self._geo.count
+
+    def __getitem__(self, index):
+        geo = self._geo
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Point index out of range')
+        x, y, z = geo.positions[index].tolist()
+        return Point(
+            x=x, y=y, z=z,
+            attrs={k: _to_python(v[index]) for k, v in geo.columns.items()})
+
+    def __iter__(self):
+        geo = self._geo
+        names = list(geo.columns)
+        values = [geo.columns[k].tolist() for k in names]
+        for i, (x, y, z) in enumerate(geo.positions.tolist()):
+            yield Point(
+                x=x, y=y, z=z,
+                attrs={k: _to_tuple(v[i]) for k, v in zip(names, values)})
+
+
+def _to_tuple(value):
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def _to_python(value):
+    if isinstance(value, numpy.ndarray):
+        return tuple(value.tolist())
+    elif isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+@attr.s(eq=False)
 class Geometry(object):
     """
     Abstract representation of a Houdini geometry.
 
     A geometry is a simple container of points.
 
+    Points can be provided as a list of `Point` objects or as columns, where
+    all positions are stored in one contiguous float32 Nx3 array and each
+    point `AttributeDefinition` is backed by its own typed array. Columns
+    are far cheaper to build, hash and send for large geometry, see
+    `Geometry.from_arrays`.
+
+    A geometry built from `Point` objects keeps them as they are, so points
+    can still be added. Reading `positions` or `columns` converts them to
+    columns each time, so convert them once with `columnar` when reading
+    them repeatedly, as hashing and building do. A geometry built from
+    columns has a read-only view over them as its `points`.
+
     For reference:
         http://www.sidefx.com/docs/houdini/basics/objects.html
     """
     attributes = attr.ib(
-        type=Iterable[AttributeDefinition],
+        type=List[AttributeDefinition],
         default=attr.Factory(list),
         repr=False)
-    points = attr.ib(
-        type=Iterable[Point],
-        default=attr.Factory(list),
+    _points = attr.ib(
+        type=Optional[Iterable[Point]],
+        default=None,
+        converter=_as_points,
+        repr=False)
+    _positions = attr.ib(
+        type=Optional[numpy.ndarray],
+        default=None,
+        converter=_as_positions,
         repr=False)
+    _columns = attr.ib(
+        type=Dict[str, numpy.ndarray],
+        default=attr.Factory(dict),
+        repr=False)
+
+    @classmethod
+    def from_points(cls, points, attributes=None):
+        """
+        Create a geometry from `Point` objects.
+
+        Parameters
+        ----------
+        points : Iterable[Point]
+        attributes : Optional[Iterable[AttributeDefinition]]
+
+        Returns
+        -------
+        Geometry
+        """
+        return cls(attributes=list(attributes or []), points=points)
+
+    @classmethod
+    def from_arrays(cls, positions, columns=None, attributes=None):
+        """
+        Create a columnar geometry from arrays.
+
+        Examples
+        --------
+        >>> geo = Geometry.from_arrays(
+        ...     numpy.random.random((1000, 3)) * 100,
+        ...     columns={'Cd': numpy.random.random((1000, 3))},
+        ...     attributes=[
+        ...         AttributeDefinition(
+        ...             name='Cd', type='Point', default=(0.1, 0.1, 0.1))])
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            Point positions with shape (N, 3).
+        columns : Optional[Dict[str, numpy.ndarray]]
+            Point attribute values by attribute name, with shape (N,) or
+            (N, size).
+        attributes : Optional[Iterable[AttributeDefinition]]
+            Definitions for the columns. Point attributes without a column are
+            filled with their default value, columns without a definition
+            have one inferred from the array.
+
+        Returns
+        -------
+        Geometry
+        """
+        positions = _as_positions(positions)
+        columns = dict(columns or {})
+        attributes = list(attributes or [])
+
+        defined = set(x.name for x in attributes)
+        for name in sorted(columns):
+            if name not in defined:
+                attributes.append(
+                    AttributeDefinition.from_array(name, columns[name]))
+
+        result = {}
+        for i, definition in enumerate(attributes):
+            if definition.type != AttributeDefinition.Types.Point:
+                continue
+            values = columns.get(definition.name)
+            if values is not None:
+                definition = attributes[i] = _promote(definition, values)
+            if values is None:
+                values = numpy.empty(
+                    _column_shape(definition, len(positions)),
+                    dtype=definition.dtype)
+                values[...] = definition.default
+            result[definition.name] = _as_column(
+                definition, values, len(positions))
+
+        return cls(attributes=attributes, positions=positions, columns=result)
+
+    @property
+    def is_columnar(self):
+        # type: () -> bool
+        return self._points is None
+
+    @property
+    def is_streamed(self):
+        # type: () -> bool
+        return False
+
+    @property
+    def point_attributes(self):
+        # type: () -> List[AttributeDefinition]
+        """
+        Attribute definitions that are stored per point.
+        """
+        return [x for x in self.attributes
+                if x.type == AttributeDefinition.Types.Point]
+
+    @property
+    def points(self):
+        # type: () -> Union[List[Point], _PointView]
+        if self._points is None:
+            if self._positions is None:
+                # An empty geometry still supports appending points.
+                self._points = []
+            else:
+                return _PointView(self)
+        return self._points
+
+    @property
+    def positions(self):
+        # type: () -> numpy.ndarray
+        """
+        Point positions as a contiguous float32 Nx3 array.
+        """
+        if self._points is not None:
+            return self.columnar().positions
+        if self._positions is None:
+            self._positions = numpy.empty((0, 3), dtype=numpy.float32)
+        return self._positions
+
+    @property
+    def columns(self):
+        # type: () -> Dict[str, numpy.ndarray]
+        """
+        Point attribute arrays by attribute name.
+        """
+        if self._points is not None:
+            return self.columnar().columns
+        return self._columns
+
+    @property
+    def count(self):
+        # type: () -> int
+        """
+        Number of points.
+        """
+        if self._points is not None and hasattr(self._points, '__len__'):
+            return len(self._points)
+        return len(self.positions)
+
+    def take(self, indices):
+        """
+        Get a new geometry of a subset of the points.
+
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            Indices or a boolean mask of the points to keep.
+
+        Returns
+        -------
+        Geometry
+        """
+        return Geometry.from_arrays(
+            self.positions[indices],
+            columns={k: v[indices] for k, v in self.columns.items()},
+            attributes=self.attributes)
+
+    def with_columns(self, columns, attributes=None):
+        """
+        Get a new geometry with some of the columns replaced or added. The
+        positions and other columns are shared with this geometry.
+
+        Parameters
+        ----------
+        columns : Dict[str, numpy.ndarray]
+        attributes : Optional[Iterable[AttributeDefinition]]
+            Definitions of new columns. Inferred from the arrays otherwise.
+
+        Returns
+        -------
+        Geometry
+        """
+        merged = dict(self.columns)
+        merged.update(columns)
+        defined = set(x.name for x in self.attributes)
+        return Geometry.from_arrays(
+            self.positions,
+            columns=merged,
+            attributes=self.attributes + [
+                x for x in attributes or [] if x.name not in defined])
+
+    def columnar(self):
+        """
+        Get this geometry backed by columns. A geometry built from `Point`
+        objects is converted to a new geometry, leaving its points untouched.
+
+        Integer attributes given float values are promoted to float, as in
+        `from_arrays`.
+
+        Returns
+        -------
+        Geometry
+        """
+        if self._points is None:
+            return self
+
+        points = self._points
+        count = len(points)
+
+        positions = numpy.array(
+            [p.pos for p in points], dtype=numpy.float32).reshape(count, 3)
+
+        columns = {}
+        if count:
+            for definition in self.point_attributes:
+                name, default = definition.name, definition.default
+                columns[name] = numpy.asarray(
+                    [p.attrs.get(name, default) for p in points])
+
+        return Geometry.from_arrays(
+            positions, columns=columns, attributes=self.attributes)
+
+    def __eq__(self, other):
+        if not isinstance(other, Geometry):
+            return NotImplemented
+        if self.attributes != other.attributes:
+            return False
+        if not numpy.array_equal(self.positions, other.positions):
+            return False
+        if set(self.columns) != set(other.columns):
+            return False
+        return all(numpy.array_equal(v, other.columns[k])
+                   for k, v in self.columns.items())
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+
+@attr.s(eq=False)
+class GeometryStream(object):
+    """
+    Abstract representation of a Houdini geometry which is read block by
+    block as it is sent, rather than held in memory. This allows building
+    geometry from sources larger than memory.
+
+    `blocks` is called each time the geometry is read and must produce the
+    same `count` points every time. Blocks provide positions and point
+    attribute columns like `Geometry.from_arrays`.
+
+    As the data isn't available up front, `key` must identify the contents
+    of the geometry. It is used in place of the data for the C4 id.
+
+    Examples
+    --------
+    >>> def blocks():
+    ...     for i in range(10):
+    ...         yield numpy.random.random((1000, 3)), {}
+    >>> geo = GeometryStream(attributes=[], count=10000, blocks=blocks,
+    ...                      key='random')
+    """
+    attributes = attr.ib(type=List[AttributeDefinition], repr=False)
+    count = attr.ib(type=int)
+    blocks = attr.ib(
+        type=Callable[[], Iterable[Tuple[numpy.ndarray,
+                                         Dict[str, numpy.ndarray]]]],
+        repr=False)
+    key = attr.ib(type=str)
+
+    @property
+    def is_streamed(self):
+        # type: () -> bool
+        return True
+
+    @property
+    def point_attributes(self):
+        # type: () -> List[AttributeDefinition]
+        """
+        Attribute definitions that are stored per point.
+        """
+        return [x for x in self.attributes
+                if x.type == AttributeDefinition.Types.Point]
+
+    def iter_blocks(self, size):
+        """
+        Read the geometry in blocks of at least `size` points (except for the
+        last block). Columns are coerced to match their definitions.
+
+        Parameters
+        ----------
+        size : int
+
+        Returns
+        -------
+        Iterator[Tuple[numpy.ndarray, Dict[str, numpy.ndarray]]]
+        """
+        definitions = self.point_attributes
+
+        pending = []  # type: List[Tuple[numpy.ndarray, Dict[str, numpy.ndarray]]]
+        pending_count = 0
+        total = 0
+
+        for positions, columns in self.blocks():
+            positions = _as_positions(positions)
+            count = len(positions)
+            if not count:
+                continue
+
+            result = {}
+            for definition in definitions:
+                values = columns.get(definition.name)
+                if values is None:
+                    values = numpy.empty(
+                        _column_shape(definition, count),
+                        dtype=definition.dtype)
+                    values[...] = definition.default
+                result[definition.name] = _as_column(
+                    definition, values, count)
+
+            total += count
+            pending.append((positions, result))
+            pending_count += count
+
+            if pending_count >= size:
+                yield _concatenate(pending)
+                pending = []
+                pending_count = 0
+
+        if pending:
+            yield _concatenate(pending)
+
+        if total != self.count:
+            raise ValueError(
+                'Expected {} points, got {}'.format(self.count, total))
+
+
+def _promote(definition, values):
+    """
+    Get a float definition in place of an integer one when given float
+    values, so they aren't truncated.
+
+    Parameters
+    ----------
+    definition : AttributeDefinition
+    values : numpy.ndarray
+
+    Returns
+    -------
+    AttributeDefinition
+    """
+    if definition.dtype.kind not in 'iu' \
+            or numpy.asarray(values).dtype.kind != 'f':
+        return definition
+    if isinstance(definition.default, (tuple, list)):
+        default = tuple(float(x) for x in definition.default)
+    else:
+        default = float(definition.default)
+    return attr.evolve(definition, default=default)
+
+
+def _as_frames(value):
+    """
+    Converter for the frames of a `Sequence`.
+
+    Parameters
+    ----------
+    value : Iterable[Tuple[int, Union[Geometry, GeometryStream]]]
+
+    Returns
+    -------
+    List[Tuple[int, Union[Geometry, GeometryStream]]]
+    """
+    # Frames built from points are converted to columns once up front.
+    result = sorted(
+        ((int(f), g.columnar() if isinstance(g, Geometry) else g)
+         for f, g in value),
+        key=lambda x: x[0])
+    frames = [f for f, _ in result]
+    if len(set(frames)) != len(frames):
+        raise ValueError('Sequence has duplicate frames')
+    return result
+
+
+@attr.s
+class Sequence(object):
+    """
+    Geometry sampled over time. Each frame holds its own geometry, which may
+    differ in points and attributes from the other frames.
+
+    A sequence is built into a single Houdini node. All frames are streamed
+    in one session, in frame order, and each is written to the node's frame
+    numbered cache as soon as it arrives.
+
+    Examples
+    --------
+    >>> seq = Sequence([(1, geo1), (2, geo2), (3, geo3)])
+    >>> hyview.build(seq, name='animated')
+    """
+    frames = attr.ib(
+        type=List[Tuple[int, Union[Geometry, GeometryStream]]],
+        converter=_as_frames, repr=False)
+
+    @property
+    def numbers(self):
+        # type: () -> List[int]
+        """
+        The frame numbers of the sequence, in order.
+        """
+        return [x for x, _ in self.frames]
+
+    def get(self, frame):
+        """
+        Get the geometry of a frame.
+
+        Parameters
+        ----------
+        frame : int
+
+        Returns
+        -------
+        Union[Geometry, GeometryStream]
+        """
+        for number, geo in self.frames:
+            if number == frame:
+                return geo
+        raise KeyError('Sequence has no frame {!r}'.format(frame))
+
+
+def _concatenate(blocks):
+    """
+    Parameters
+    ----------
+    blocks : List[Tuple[numpy.ndarray, Dict[str, numpy.ndarray]]]
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, Dict[str, numpy.ndarray]]
+    """
+    if len(blocks) == 1:
+        return blocks[0]
+    positions = numpy.concatenate([x for x, _ in blocks])
+    columns = {k: numpy.concatenate([x[k] for _, x in blocks])
+               for k in blocks[0][1]}
+    return positions, columns
+
+
+def _column_shape(definition, count):
+    """
+    Parameters
+    ----------
+    definition : AttributeDefinition
+    count : int
+
+    Returns
+    -------
+    Tuple[int, ...]
+    """
+    if definition.size > 1:
+        return count, definition.size
+    return count,
+
+
+def _as_column(definition, values, count):
+    """
+    Coerce `values` to a contiguous array matching `definition`.
+
+    Parameters
+    ----------
+    definition : AttributeDefinition
+    values : numpy.ndarray
+    count : int
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    shape = _column_shape(definition, count)
+    values = numpy.asarray(values)
+    if values.dtype.kind == 'f' and definition.dtype.kind in 'iu':
+        raise ValueError(
+            'Attribute {!r} has an integer default but float values, which '
+            'would be truncated. Give it a float default.'.format(
+                definition.name))
+    values = numpy.ascontiguousarray(values, dtype=definition.dtype)
+    if values.shape != shape:
+        if values.size != numpy.prod(shape):
+            raise ValueError(
+                'Attribute {!r} expects shape {!r}, got {!r}'.format(
+                    definition.name, shape, values.shape))
+        values = values.reshape(shape)
+    return values
+
+
+def _claim_point(obj):
+    """
+    Claim method for Point objects.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(obj, Point)
+
+
+@C4.register(_claim_point)
+def hash_point(obj):
+    """
+    Yield bytes from the position and attributes of a point.
+
+    Parameters
+    ----------
+    obj : Point
+
+    Returns
+    -------
+    Iterator[bytes]
+    """
+    yield to_bytes('Point')
+    yield C4((obj.x, obj.y, obj.z)).digest()
+    yield C4(obj.attrs).digest()
+
+
+def _claim_geometry(obj):
+    """
+    Claim method for Geometry objects.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(obj, Geometry)
+
+
+@C4.register(_claim_geometry)
+def hash_geometry(obj):
+    """
+    Yield bytes from the attribute definitions and columns of a geometry.
+    Geometry built from `Point` objects is converted to columns first, so the
+    same data hashes the same either way.
+
+    Parameters
+    ----------
+    obj : Geometry
+
+    Returns
+    -------
+    Iterator[Union[bytes, numpy.ndarray]]
+    """
+    obj = obj.columnar()
+    yield to_bytes('Geometry')
+    for x in obj.attributes:
+        yield C4((x.name, x.type, x.default)).digest()
+
+    columns = [('P', obj.positions)] + sorted(obj.columns.items())
+    for name, column in columns:
+        yield to_bytes(name)
+        for block in C4.iter_blocks(column):
+            yield block
+
+
+def _claim_geometry_stream(obj):
+    """
+    Claim method for GeometryStream objects.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(obj, GeometryStream)
+
+
+@C4.register(_claim_geometry_stream)
+def hash_geometry_stream(obj):
+    """
+    Yield bytes from the attribute definitions, count and key of a geometry
+    stream. The data itself is not read.
+
+    Parameters
+    ----------
+    obj : GeometryStream
+
+    Returns
+    -------
+    Iterator[bytes]
+    """
+    yield to_bytes('GeometryStream')
+    for x in obj.attributes:
+        yield C4((x.name, x.type, x.default)).digest()
+    yield C4(obj.count).digest()
+    yield C4(obj.key).digest()
+
+
+def _claim_sequence(obj):
+    """
+    Claim method for Sequence objects.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(obj, Sequence)
+
+
+@C4.register(_claim_sequence)
+def hash_sequence(obj):
+    """
+    Yield bytes from the frame numbers and geometry of a sequence.
+
+    Parameters
+    ----------
+    obj : Sequence
+
+    Returns
+    -------
+    Iterator[bytes]
+    """
+    yield to_bytes('Sequence')
+    for frame, geo in obj.frames:
+        yield C4(frame).digest()
+        yield C4(geo).digest()
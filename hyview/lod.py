@@ -0,0 +1,143 @@
+"""
+Level of detail (LOD) pyramids for large point clouds.
+
+A pyramid is the same geometry decimated to a few levels of detail. Levels
+are given as the fraction of points they keep, as a denominator; the default
+of `(64, 8, 1)` keeps 1/64, 1/8 and then all of the points. The coarsest level
+is built first so something shows up in Houdini right away, and the node is
+then refined with each finer level. See `hyview.build_lod`.
+"""
+import numpy
+
+from hyview.interface import Geometry
+
+from typing import *
+
+
+LEVELS = (64, 8, 1)
+
+METHOD_RANDOM = 'random'
+METHOD_VOXEL = 'voxel'
+
+METHODS = (METHOD_RANDOM, METHOD_VOXEL)
+
+
+def random_indices(count, level, seed=0):
+    """
+    Pick a random `1 / level` of the points. Levels of the same `seed` are
+    nested, so every point of a coarse level is also within the finer ones.
+
+    Parameters
+    ----------
+    count : int
+    level : int
+    seed : int
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices of the picked points.
+    """
+    size = -(-count // level)
+    order = numpy.random.RandomState(seed).permutation(count)
+    return numpy.sort(order[:size])
+
+
+def voxel_indices(positions, level):
+    """
+    Pick a point from each cell of a voxel grid, sized so there are roughly
+    `1 / level` as many cells as points. This keeps sparse areas that random
+    decimation tends to lose.
+
+    Parameters
+    ----------
+    positions : numpy.ndarray
+        Point positions with shape (N, 3).
+    level : int
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices of the picked points.
+    """
+    count = len(positions)
+    if not count or level <= 1:
+        return numpy.arange(count)
+
+    lower = positions.min(axis=0)
+    extent = (positions.max(axis=0) - lower).astype(numpy.float64)
+
+    # Size the cells over the axes with any extent, so flat clouds still get
+    # enough cells.
+    axes = extent > 0
+    if not axes.any():
+        return numpy.arange(1)
+
+    cells = max(1.0, float(count) / level)
+    size = (numpy.prod(extent[axes]) / cells) ** (1.0 / axes.sum())
+
+    shape = numpy.floor(extent / size).astype(numpy.int64) + 1
+    cell = numpy.floor((positions - lower) / size).astype(numpy.int64)
+    cell = numpy.minimum(cell, shape - 1)
+
+    ids = (cell[:, 0] * shape[1] + cell[:, 1]) * shape[2] + cell[:, 2]
+    _, result = numpy.unique(ids, return_index=True)
+    return numpy.sort(result)
+
+
+def decimate(geo, level, method=METHOD_RANDOM, seed=0):
+    """
+    Decimate a geometry to roughly `1 / level` of its points.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+    level : int
+    method : str
+        One of `METHODS`.
+    seed : int
+        Seed of the random method.
+
+    Returns
+    -------
+    hyview.Geometry
+    """
+    if not isinstance(geo, Geometry):
+        raise TypeError(
+            'Only Geometry can be decimated, got {!r}'.format(type(geo)))
+    if method not in METHODS:
+        raise ValueError('Unknown decimation method {!r}'.format(method))
+
+    if level <= 1:
+        return geo
+
+    if method == METHOD_VOXEL:
+        indices = voxel_indices(geo.positions, level)
+    else:
+        indices = random_indices(geo.count, level, seed=seed)
+
+    return geo.take(indices)
+
+
+def pyramid(geo, levels=LEVELS, method=METHOD_RANDOM, seed=0):
+    """
+    Decimate a geometry to each level of detail.
+
+    Parameters
+    ----------
+    geo : hyview.Geometry
+    levels : Iterable[int]
+    method : str
+        One of `METHODS`.
+    seed : int
+        Seed of the random method.
+
+    Returns
+    -------
+    List[hyview.Geometry]
+        Geometry of each level, coarsest first.
+    """
+    levels = sorted(set(int(x) for x in levels), reverse=True)
+    if not levels:
+        raise ValueError('No levels of detail given')
+    return [decimate(geo, x, method=method, seed=seed) for x in levels]
@@ -1,6 +1,7 @@
 import sys
 import os
 import functools
+import inspect
 import six
 import uuid
 
@@ -16,9 +17,11 @@ ModuleType = type(sys)
 
 
 RPC_METHODS = {}  # type: Dict[str, Callable]
+# Names of the methods which Houdini runs on its main thread.
+RPC_MAIN_THREAD = set()  # type: Set[str]
 
 
-def rpc(name=None):
+def rpc(name=None, main_thread=True):
     """
     Decorator to register a RPC command.
 
@@ -27,6 +30,10 @@ def rpc(name=None):
     name : Optional[str]
         If not provided the decorated method's name will be used. This name
         must be unique in all registered commands.
+    main_thread : bool
+        Run the command on Houdini's main thread, where `hou` can be called
+        safely. Commands which don't call `hou` can run on the server's
+        thread instead, so they're answered while Houdini is busy cooking.
 
     Returns
     -------
@@ -43,7 +50,7 @@ def rpc(name=None):
 
         @functools.wraps(f)
         def _wrap(*args, **kwargs):
-            return getattr(hyview.app().client, fname)(*args, **kwargs)
+            return call(fname, *args, **kwargs)
 
         _logger.debug('Registering RPC method {!r}'.format(fname))
 
@@ -53,12 +60,66 @@ def rpc(name=None):
         #  other rpc methods will execute them remotely. Is that something we
         #  don't want?
         RPC_METHODS[fname] = f
+        if main_thread:
+            RPC_MAIN_THREAD.add(fname)
 
         return _wrap
 
     return _deco
 
 
+def call(name, *args, **kwargs):
+    """
+    Call a registered RPC command remotely.
+
+    Parameters
+    ----------
+    name : str
+    args : *Any
+    kwargs : **Any
+
+    Returns
+    -------
+    Any
+    """
+    if kwargs:
+        args = _positional(RPC_METHODS[name], args, kwargs)
+    with hyview.app().pool.connection() as c:
+        return getattr(c, name)(*args)
+
+
+def _positional(func, args, kwargs):
+    """
+    Get the arguments of a call as positional arguments only, which is all
+    zerorpc sends.
+
+    Parameters
+    ----------
+    func : Callable
+    args : Tuple[Any, ...]
+    kwargs : Dict[str, Any]
+
+    Returns
+    -------
+    List[Any]
+    """
+    getargspec = getattr(inspect, 'getfullargspec', None) \
+        or getattr(inspect, 'getargspec')
+    spec = getargspec(func)
+    values = inspect.getcallargs(func, *args, **kwargs)
+
+    varkw = getattr(spec, 'varkw', None) or getattr(spec, 'keywords', None)
+    if varkw and values[varkw]:
+        raise TypeError(
+            'RPC {!r} can not be sent the keyword arguments {!r}'.format(
+                func.__name__, sorted(values[varkw])))
+
+    result = [values[x] for x in spec.args]
+    if spec.varargs:
+        result.extend(values[spec.varargs])
+    return result
+
+
 def iter_modules(paths):
     # type: (Union[str, Iterable[str]]) -> List[str]
     """
@@ -0,0 +1,359 @@
+"""
+Profiling of the calls served over rpc.
+
+When enabled, `hyview.transport.Server` wraps each of its methods to count
+calls, time them into a latency histogram, and measure the size of their
+arguments and results. Streamed methods also count the items they yield,
+and are timed from the call until the stream is exhausted. The numbers are
+served by the built-in `_hyview_profile` rpc method, see `hyview.profile`.
+
+Setting a threshold also runs each call under `cProfile` and dumps the stats
+of calls slower than it as pstats files. A profiler follows its thread
+rather than a call, so work done by other greenlets while a call waits shows
+up in its stats too.
+"""
+import os
+import time
+import itertools
+import threading
+import functools
+
+import hyview
+from hyview.constants import PROFILE_THRESHOLD, PROFILE_DIR
+
+from typing import *
+
+
+_logger = hyview.get_logger(__name__)
+
+
+# Upper bounds in seconds of the latency histogram buckets. Slower calls fall
+# into a last, unbounded bucket.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+           2.5, 5.0, 10.0)
+
+# Number of pstats files of slow calls listed per method.
+PROFILES_KEPT = 10
+
+
+def payload_size(obj):
+    """
+    Estimate the size in bytes of a value sent over rpc. Strings and binary
+    data count their length and other scalars eight bytes, which is close
+    enough to their packed size to compare calls.
+
+    Parameters
+    ----------
+    obj : Any
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(obj, (bytes, bytearray, type(u''))):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(payload_size(x) for x in obj)
+    nbytes = getattr(obj, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return 8
+
+
+class MethodStats(object):
+    """
+    Calls of one method.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.min = None  # type: Optional[float]
+        self.max = None  # type: Optional[float]
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.args_bytes = 0
+        self.result_bytes = 0
+        self.items = 0
+        self.slow = 0
+        self.profiles = []  # type: List[str]
+
+    def add(self, seconds, error=False):
+        """
+        Parameters
+        ----------
+        seconds : float
+        error : bool
+        """
+        self.calls += 1
+        self.errors += int(error)
+        self.seconds += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.buckets[i] += 1
+
+    def percentile(self, q):
+        """
+        Estimate a latency percentile from the histogram.
+
+        Parameters
+        ----------
+        q : float
+            Between 0 and 100.
+
+        Returns
+        -------
+        Optional[float]
+            Upper bound of the bucket the percentile falls in, or the slowest
+            call for the last bucket.
+        """
+        if not self.calls:
+            return None
+        rank = q / 100.0 * self.calls
+        total = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            total += count
+            if total >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        """
+        Returns
+        -------
+        Dict[str, Any]
+        """
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'seconds': self.seconds,
+            'mean': self.seconds / self.calls if self.calls else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            # None stands for the unbounded last bucket.
+            'histogram': list(zip(list(BUCKETS) + [None], self.buckets)),
+            'args_bytes': self.args_bytes,
+            'result_bytes': self.result_bytes,
+            'items': self.items,
+            'slow': self.slow,
+            'profiles': list(self.profiles),
+        }
+
+
+class _Call(object):
+    """
+    One call being profiled.
+    """
+    def __init__(self, profiler, name, args):
+        """
+        Parameters
+        ----------
+        profiler : Profiler
+        name : str
+        args : Tuple[Any, ...]
+        """
+        self.profiler = profiler
+        self.name = name
+        self.args_bytes = payload_size(args)
+        self.result_bytes = 0
+        self.items = 0
+        self.error = False
+        self.started = time.time()
+        self._profile = None
+
+    def run(self, func, *args):
+        """
+        Run part of the call, under `cProfile` when a threshold is set and no
+        other call on this thread is being profiled.
+
+        Parameters
+        ----------
+        func : Callable
+        args : *Any
+
+        Returns
+        -------
+        Any
+        """
+        if self.profiler.threshold is None \
+                or getattr(self.profiler._local, 'active', False):
+            return func(*args)
+
+        if self._profile is None:
+            import cProfile
+            self._profile = cProfile.Profile()
+        self.profiler._local.active = True
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Another profiler is enabled on this thread.
+            self.profiler._local.active = False
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            self._profile.disable()
+            self.profiler._local.active = False
+
+    def finish(self):
+        seconds = time.time() - self.started
+        path = None
+        if self._profile is not None and seconds >= self.profiler.threshold:
+            path = self.profiler._dump(self.name, self._profile)
+        self.profiler._record(self, seconds, path)
+
+
+class Profiler(object):
+    """
+    Stats of the calls of each method served by a `hyview.transport.Server`.
+    """
+    def __init__(self, threshold=PROFILE_THRESHOLD, directory=PROFILE_DIR):
+        """
+        Parameters
+        ----------
+        threshold : Optional[float]
+            Seconds over which a call's `cProfile` stats are dumped. None
+            disables `cProfile`.
+        directory : str
+            Where the pstats files are dumped.
+        """
+        self.threshold = threshold
+        self.directory = directory
+        self.methods = {}  # type: Dict[str, MethodStats]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._dumps = itertools.count()
+
+    def wrap(self, name, func, stream=False):
+        """
+        Wrap a method to profile its calls.
+
+        Parameters
+        ----------
+        name : str
+        func : Callable
+        stream : bool
+            Whether the method returns an iterator to stream.
+
+        Returns
+        -------
+        Callable
+        """
+        if stream:
+            @functools.wraps(func)
+            def _stream(*args):
+                call = _Call(self, name, args)
+                try:
+                    it = iter(call.run(func, *args))
+                    while True:
+                        try:
+                            item = call.run(next, it)
+                        except StopIteration:
+                            break
+                        call.items += 1
+                        call.result_bytes += payload_size(item)
+                        yield item
+                except GeneratorExit:
+                    raise
+                except BaseException:
+                    call.error = True
+                    raise
+                finally:
+                    call.finish()
+
+            return _stream
+
+        @functools.wraps(func)
+        def _call(*args):
+            call = _Call(self, name, args)
+            try:
+                result = call.run(func, *args)
+                call.result_bytes = payload_size(result)
+                return result
+            except BaseException:
+                call.error = True
+                raise
+            finally:
+                call.finish()
+
+        return _call
+
+    def _stats(self, name):
+        # type: (str) -> MethodStats
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = MethodStats()
+        return stats
+
+    def _record(self, call, seconds, path=None):
+        """
+        Parameters
+        ----------
+        call : _Call
+        seconds : float
+        path : Optional[str]
+            The pstats file of a slow call.
+        """
+        with self._lock:
+            stats = self._stats(call.name)
+            stats.add(seconds, error=call.error)
+            stats.args_bytes += call.args_bytes
+            stats.result_bytes += call.result_bytes
+            stats.items += call.items
+            if path is not None:
+                stats.slow += 1
+                stats.profiles = (stats.profiles + [path])[-PROFILES_KEPT:]
+
+    def _dump(self, name, profile):
+        """
+        Parameters
+        ----------
+        name : str
+        profile : cProfile.Profile
+
+        Returns
+        -------
+        Optional[str]
+            Path of the pstats file.
+        """
+        path = os.path.join(
+            self.directory, 'hyview-{}-{}-{}-{}.pstats'.format(
+                name, os.getpid(), int(time.time()), next(self._dumps)))
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            profile.dump_stats(path)
+        except (IOError, OSError) as e:
+            _logger.warning('Could not dump the profile of {!r}: {}'.format(
+                name, e))
+            return None
+        _logger.debug('Dumped the profile of a slow {!r} call to {!r}'.format(
+            name, path))
+        return path
+
+    def snapshot(self, reset=False):
+        """
+        Parameters
+        ----------
+        reset : bool
+            Start over once the stats are taken.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            Stats of each method by name. See `MethodStats.to_dict`.
+        """
+        with self._lock:
+            result = dict((k, v.to_dict()) for k, v in self.methods.items())
+            if reset:
+                self.methods = {}
+        return result
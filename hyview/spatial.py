@@ -0,0 +1,228 @@
+"""
+Spatial index of point positions for region of interest queries.
+
+Points are hashed into a voxel grid and sorted by cell, so the points within
+a bounding box are found by looking up only the cells it overlaps rather than
+testing every point.
+
+Bounding boxes are given as a pair of corners,
+`((xmin, ymin, zmin), (xmax, ymax, zmax))`, and are inclusive.
+"""
+import numpy
+
+from typing import *
+
+
+# Average number of points per occupied cell the grid is sized for.
+POINTS_PER_CELL = 64
+
+
+def as_bbox(bbox):
+    """
+    Parameters
+    ----------
+    bbox : Iterable[Iterable[float]]
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        The lower and upper corners.
+    """
+    lower, upper = (numpy.asarray(x, dtype=numpy.float64) for x in bbox)
+    if lower.shape != (3,) or upper.shape != (3,):
+        raise ValueError(
+            'Expected a pair of 3D corners, got {!r}'.format(bbox))
+    return lower, upper
+
+
+class VoxelIndex(object):
+    """
+    Voxel hash of point positions.
+
+    The index holds the order of the points sorted by cell and where each
+    occupied cell starts and stops within it, which is a few integers per
+    point.
+    """
+    def __init__(self, positions, size=None):
+        """
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            Point positions with shape (N, 3).
+        size : Optional[float]
+            Edge length of the cells. Defaults to a size holding around
+            `POINTS_PER_CELL` points per cell.
+        """
+        self.positions = positions
+        count = len(positions)
+
+        if count:
+            self.lower = positions.min(axis=0).astype(numpy.float64)
+            self.upper = positions.max(axis=0).astype(numpy.float64)
+        else:
+            self.lower = self.upper = numpy.zeros(3)
+
+        if size is None:
+            size = self._size(self.upper - self.lower, count)
+        self.size = float(size)
+
+        self.shape = numpy.floor(
+            (self.upper - self.lower) / self.size).astype(numpy.int64) + 1
+
+        ids = self._ids(self._cells(positions))
+        self.order = numpy.argsort(ids, kind='stable')
+        self.ids, self.starts = numpy.unique(
+            ids[self.order], return_index=True)
+        self.stops = numpy.append(self.starts[1:], count)
+
+    @staticmethod
+    def _size(extent, count):
+        """
+        Parameters
+        ----------
+        extent : numpy.ndarray
+        count : int
+
+        Returns
+        -------
+        float
+        """
+        axes = extent > 0
+        if not axes.any():
+            return 1.0
+        cells = max(1.0, float(count) / POINTS_PER_CELL)
+        return (numpy.prod(extent[axes]) / cells) ** (1.0 / axes.sum())
+
+    def _cells(self, positions):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        cells = numpy.floor(
+            (positions - self.lower) / self.size).astype(numpy.int64)
+        return numpy.clip(cells, 0, self.shape - 1)
+
+    def _ids(self, cells):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        return (cells[:, 0] * self.shape[1] + cells[:, 1]) * self.shape[2] \
+            + cells[:, 2]
+
+    def _decode(self, ids):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        result = numpy.empty((len(ids), 3), dtype=numpy.int64)
+        result[:, 2] = ids % self.shape[2]
+        result[:, 1] = (ids // self.shape[2]) % self.shape[1]
+        result[:, 0] = ids // (self.shape[1] * self.shape[2])
+        return result
+
+    def query(self, bbox):
+        """
+        Find the points within a bounding box.
+
+        Parameters
+        ----------
+        bbox : Iterable[Iterable[float]]
+
+        Returns
+        -------
+        numpy.ndarray
+            Sorted indices of the points.
+        """
+        lower, upper = as_bbox(bbox)
+
+        if not len(self.ids) or (upper < self.lower).any() \
+                or (lower > self.upper).any() or (lower > upper).any():
+            return numpy.empty(0, dtype=numpy.int64)
+
+        if (lower <= self.lower).all() and (upper >= self.upper).all():
+            return numpy.arange(len(self.positions))
+
+        first = self._cells(lower[numpy.newaxis])[0]
+        last = self._cells(upper[numpy.newaxis])[0]
+
+        # Find the occupied cells the box overlaps, either by looking up each
+        # cell of the box or by testing each occupied cell, whichever is less.
+        if numpy.prod(last - first + 1) < len(self.ids):
+            grid = numpy.indices(last - first + 1).reshape(3, -1).T + first
+            ids = self._ids(grid)
+            found = numpy.minimum(
+                numpy.searchsorted(self.ids, ids), len(self.ids) - 1)
+            cells = found[self.ids[found] == ids]
+        else:
+            decoded = self._decode(self.ids)
+            cells = numpy.nonzero(
+                ((decoded >= first) & (decoded <= last)).all(axis=1))[0]
+
+        starts, stops = self.starts[cells], self.stops[cells]
+        lengths = stops - starts
+        total = int(lengths.sum())
+        if not total:
+            return numpy.empty(0, dtype=numpy.int64)
+
+        # Concatenate the ranges of each cell without looping over them.
+        offsets = numpy.repeat(starts - numpy.cumsum(lengths) + lengths,
+                               lengths)
+        candidates = self.order[offsets + numpy.arange(total)]
+
+        positions = self.positions[candidates]
+        inside = ((positions >= lower) & (positions <= upper)).all(axis=1)
+        return numpy.sort(candidates[inside])
+
+
+class IndexedGeometry(object):
+    """
+    A geometry along with a spatial index of its points, which is built on
+    the first query.
+    """
+    def __init__(self, geo, key=None, index=None):
+        """
+        Parameters
+        ----------
+        geo : hyview.Geometry
+        key : Optional[str]
+            C4 id of the geometry.
+        index : Optional[VoxelIndex]
+            Index of the same positions, to reuse.
+        """
+        self.geo = geo
+        self.key = key
+        self._index = index  # type: Optional[VoxelIndex]
+        self._crop = None  # type: Optional[Tuple[Any, hyview.Geometry]]
+
+    @property
+    def index(self):
+        # type: () -> VoxelIndex
+        if self._index is None:
+            self._index = VoxelIndex(self.geo.positions)
+        return self._index
+
+    def with_geometry(self, geo, key=None):
+        """
+        Get an indexed geometry for a geometry with the same positions, which
+        shares this index.
+
+        Parameters
+        ----------
+        geo : hyview.Geometry
+        key : Optional[str]
+
+        Returns
+        -------
+        IndexedGeometry
+        """
+        return IndexedGeometry(geo, key=key, index=self._index)
+
+    def crop(self, bbox):
+        """
+        Get the geometry of the points within a bounding box. The last crop
+        is remembered, as a transfer asks for the same box several times.
+
+        Parameters
+        ----------
+        bbox : Iterable[Iterable[float]]
+
+        Returns
+        -------
+        hyview.Geometry
+        """
+        key = tuple(tuple(float(v) for v in x) for x in bbox)
+        if self._crop is None or self._crop[0] != key:
+            self._crop = (key, self.geo.take(self.index.query(bbox)))
+        return self._crop[1]
@@ -0,0 +1,157 @@
+"""
+Timing of the stages of a build.
+
+Both ends of a build time their own stages. Houdini sends its timings along
+with the signal that it's done cooking, and the application combines them
+with its own into one record per build. Records are logged to the
+`hyview.telemetry` logger, with the record itself on the `telemetry`
+attribute of the log record, and appended to the JSON lines file at
+`HYVIEW_TRACE` when it's set. See `hyview.stats`.
+
+Houdini times its stages with `Timer` too, so this module must stay python2.7
+compatible.
+"""
+import json
+import time
+import contextlib
+
+import hyview
+from hyview.constants import TRACE
+
+from typing import *
+
+
+_logger = hyview.get_logger(__name__)
+
+
+def peak_memory():
+    """
+    Get the peak resident memory of this process.
+
+    Returns
+    -------
+    Optional[int]
+        Size in bytes, or None where it can't be measured.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes.
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+class Timer(object):
+    """
+    Seconds spent in each stage. Time spent in the same stage more than
+    once, such as for each frame of a sequence, adds up.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}  # type: Dict[str, float]
+        # Timestamps of events, for stages which span several calls.
+        self.marks = {}  # type: Dict[str, float]
+
+    def mark(self, event):
+        """
+        Note when an event first happened.
+
+        Parameters
+        ----------
+        event : str
+        """
+        self.marks.setdefault(event, time.time())
+
+    def add(self, stage, seconds):
+        """
+        Parameters
+        ----------
+        stage : str
+        seconds : float
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def since(self, stage, start):
+        """
+        Add the time from `start` until now.
+
+        Parameters
+        ----------
+        stage : str
+        start : float
+            Timestamp from `time.time`.
+        """
+        self.add(stage, time.time() - start)
+
+    @contextlib.contextmanager
+    def stage(self, stage, exclude=None):
+        """
+        Context manager timing a stage.
+
+        Parameters
+        ----------
+        stage : str
+        exclude : Optional[str]
+            A stage timed within this one, whose time is left out of it.
+        """
+        start = time.time()
+        before = self.stages.get(exclude, 0.0)
+        try:
+            yield
+        finally:
+            excluded = self.stages.get(exclude, 0.0) - before
+            self.add(stage, time.time() - start - excluded)
+
+    def iter(self, stage, iterable):
+        """
+        Time waiting on each item of an iterable, but not what's done with
+        them.
+
+        Parameters
+        ----------
+        stage : str
+        iterable : Iterable[Any]
+
+        Returns
+        -------
+        Iterator[Any]
+        """
+        it = iter(iterable)
+        while True:
+            start = time.time()
+            try:
+                x = next(it)
+            except StopIteration:
+                self.since(stage, start)
+                return
+            self.since(stage, start)
+            yield x
+
+    def elapsed(self):
+        """
+        Returns
+        -------
+        float
+            Seconds since the timer was created.
+        """
+        return time.time() - self.started
+
+
+def emit(record):
+    """
+    Log a build record and append it to the trace file.
+
+    Parameters
+    ----------
+    record : Dict[str, Any]
+    """
+    _logger.debug(
+        'Built {!r} in {:.3f}s'.format(record.get('name'), record['seconds']),
+        extra={'telemetry': record})
+    if TRACE:
+        with open(TRACE, 'a') as f:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
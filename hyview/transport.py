@@ -1,6 +1,19 @@
+import os
+import time
 import inspect
+import threading
+import contextlib
 import zerorpc
 
+import hyview
+import hyview.profiling
+from hyview.constants import POOL_SIZE, POOL_CHECK_INTERVAL, PROFILE
+
+from typing import *
+
+
+_logger = hyview.get_logger(__name__)
+
 
 class Client(zerorpc.Client):
     """
@@ -19,11 +32,23 @@ class Server(zerorpc.Server):
     Slightly extended version of the `zerorpc.Server` that fixes some issues
     with ipython tab completion (for objects over RPC) and promotes methods
     with the appropriate zerorpc decorators.
+
+    With `profile` on, the calls of each method are profiled and served by
+    the built-in `_hyview_profile` method. See `hyview.profiling`.
     """
     def __init__(self, methods=None, name=None, context=None, pool_size=None,
-                 heartbeat=5):
+                 heartbeat=5, profile=PROFILE):
 
-        _methods = self._filter_methods(Server, self, methods)
+        self.profiler = hyview.profiling.Profiler() if profile else None
+
+        # Copied so a dict of methods isn't changed.
+        _methods = dict(self._filter_methods(Server, self, methods))
+        streams = set(k for k, f in _methods.items()
+                      if inspect.isgeneratorfunction(f))
+        if self.profiler is not None:
+            _methods = dict(
+                (k, self.profiler.wrap(k, f, stream=k in streams))
+                for k, f in _methods.items())
         # for ipython tab completion
         _methods['trait_names'] = lambda: _methods.keys()
         _methods['_getAttributeNames'] = lambda: _methods.keys()
@@ -31,12 +56,209 @@ class Server(zerorpc.Server):
         # I wonder way base zerorpc implementation didn't do this?
         methods = {}
         for (k, f) in _methods.items():
-            if inspect.isgeneratorfunction(f):
+            if k in streams:
                 f = zerorpc.stream(f)
             else:
                 f = zerorpc.rep(f)
             methods[k] = f
 
+        methods['_hyview_profile'] = zerorpc.rep(self._hyview_profile)
+
         super(Server, self).__init__(
             methods=methods, name=name, context=context, pool_size=pool_size,
             heartbeat=heartbeat)
+
+    def _hyview_profile(self, reset=False):
+        """
+        Parameters
+        ----------
+        reset : bool
+            Start over once the stats are taken.
+
+        Returns
+        -------
+        Optional[Dict[str, Dict[str, Any]]]
+            Stats of each method by name, or None when profiling is off. See
+            `hyview.profiling.Profiler.snapshot`.
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.snapshot(reset=reset)
+
+
+class Pool(object):
+    """
+    Clients connected to one endpoint, reused across calls so each call
+    doesn't pay for setting up a new socket and connection.
+
+    Up to `size` idle clients are kept open. More are connected when they're
+    all in use and closed once released. A client which sat idle for longer
+    than `check_interval` seconds is pinged before it's reused, and a client
+    which fails is closed rather than returned, so the next call reconnects.
+
+    Clients are bound to the gevent hub of the thread that connected them, so
+    idle clients are kept per thread.
+    """
+    def __init__(self, endpoint, size=POOL_SIZE,
+                 check_interval=POOL_CHECK_INTERVAL, check_timeout=2,
+                 timeout=30, heartbeat=5):
+        """
+        Parameters
+        ----------
+        endpoint : str
+            e.g. 'tcp://127.0.0.1:4242'
+        size : int
+            Number of idle clients kept open per thread.
+        check_interval : Optional[float]
+            Seconds a client may be idle before it's pinged on reuse. None
+            disables the check.
+        check_timeout : float
+            Seconds to wait for the ping.
+        timeout : int
+            Seconds to wait for a call, passed to the clients.
+        heartbeat : int
+            Passed to the clients.
+        """
+        self.endpoint = endpoint
+        self.size = size
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.timeout = timeout
+        self.heartbeat = heartbeat
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._closed = False
+
+    @property
+    def _idle(self):
+        # type: () -> List[Tuple[Client, float]]
+        # Clients of a forked parent can't be used, start over.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+        if not hasattr(self._local, 'idle'):
+            self._local.idle = []
+        return self._local.idle
+
+    def _connect(self):
+        # type: () -> Client
+        _logger.debug('Connecting to {!r}'.format(self.endpoint))
+        client = Client(timeout=self.timeout, heartbeat=self.heartbeat)
+        client.connect(self.endpoint)
+        return client
+
+    def _is_healthy(self, client):
+        """
+        Parameters
+        ----------
+        client : Client
+
+        Returns
+        -------
+        bool
+        """
+        try:
+            client._zerorpc_ping(timeout=self.check_timeout)
+        except (zerorpc.LostRemote, zerorpc.TimeoutExpired):
+            return False
+        return True
+
+    def acquire(self):
+        """
+        Get a connected client. It must be given back with `release`.
+
+        Returns
+        -------
+        Client
+        """
+        if self._closed:
+            raise RuntimeError('Pool for {!r} is closed'.format(self.endpoint))
+
+        idle = self._idle
+        while idle:
+            client, released = idle.pop()
+            if self.check_interval is None \
+                    or time.time() - released < self.check_interval \
+                    or self._is_healthy(client):
+                return client
+            _logger.debug('Reconnecting to {!r}'.format(self.endpoint))
+            client.close()
+
+        return self._connect()
+
+    def release(self, client, healthy=True):
+        """
+        Give back a client from `acquire`.
+
+        Parameters
+        ----------
+        client : Client
+        healthy : bool
+            False if the client failed, so it's closed rather than reused.
+        """
+        idle = self._idle
+        if healthy and not self._closed and len(idle) < self.size:
+            idle.append((client, time.time()))
+        else:
+            client.close()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Context manager of a connected client.
+
+        Examples
+        --------
+        >>> with pool.connection() as c:
+        ...     c.complete(name)
+
+        Returns
+        -------
+        ContextManager[Client]
+        """
+        client = self.acquire()
+        try:
+            yield client
+        except zerorpc.RemoteError:
+            # The call failed on the other end, the connection is fine.
+            self.release(client)
+            raise
+        except BaseException:
+            self.release(client, healthy=False)
+            raise
+        else:
+            self.release(client)
+
+    def close(self):
+        """
+        Close the idle clients of the calling thread and stop pooling.
+        """
+        self._closed = True
+        idle = self._idle
+        while idle:
+            client, _ = idle.pop()
+            client.close()
+
+
+_POOLS = {}  # type: Dict[str, Pool]
+_POOLS_LOCK = threading.Lock()
+
+
+def pool(endpoint):
+    """
+    Get the shared pool of an endpoint.
+
+    Parameters
+    ----------
+    endpoint : str
+        e.g. 'tcp://127.0.0.1:4242'
+
+    Returns
+    -------
+    Pool
+    """
+    with _POOLS_LOCK:
+        result = _POOLS.get(endpoint)
+        if result is None or result._closed:
+            result = _POOLS[endpoint] = Pool(endpoint)
+        return result
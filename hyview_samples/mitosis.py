@@ -18,6 +18,10 @@ SAMPLE_PATH = os.path.join(
     'mitosis.tif')
 
 
+# Channels of the dataset in order.
+CHANNELS = ('dna', 'microtubles')
+
+
 DEFAULTS = {
     'size': None,
     'znth': None,
@@ -31,10 +35,28 @@ DEFAULTS = {
 
 def sample(**kwargs):
     """
-    Build a sample of the mitosis data set.
+    Build a sample of the mitosis data set. Each channel is built as a single
+    animated node.
+
+    Parameters
+    ----------
+    kwargs : **Any
+        See `geogen`.
     """
+    from collections import OrderedDict
+
+    sequences = OrderedDict()
     for geo, name, frame in geogen(**kwargs):
-        hyview.build(geo, name=name, frame=frame)
+        sequences.setdefault(name, []).append((frame, geo))
+
+    futures = []
+    for name, frames in sequences.items():
+        _logger.info('Sending {!r} ({} frames) to Houdini...'.format(
+            name, len(frames)))
+        futures.append(hyview.build(hyview.Sequence(frames), name=name))
+
+    for future in futures:
+        future.get()
 
 
 def load_data():
@@ -95,11 +117,13 @@ def iterdata(data, **kwargs):
                            'microtubles': float(microtubules - minimum) / maximum}
 
 
-def pointgen(channel, **kwargs):
+def pointgen(channel, data=None, **kwargs):
     """
     Parameters
     ----------
     channel : str
+    data : Optional[numpy.array]
+        The dataset. Loaded from disk if not provided.
     kwargs : **Any
         colorize : bool
         minimum : float
@@ -115,7 +139,10 @@ def pointgen(channel, **kwargs):
 
     colors = ColorGenerator()
 
-    for time, x, y, z, channels in iterdata(load_data(), **kwargs):
+    if data is None:
+        data = load_data()
+
+    for time, x, y, z, channels in iterdata(data, **kwargs):
         value = channels[channel]
         if minimum and value < minimum:
             continue
@@ -133,8 +160,11 @@ def pointgen(channel, **kwargs):
         )
 
 
-def geogen(**kwargs):
+def geogen_points(**kwargs):
     """
+    Generate the geometry of each frame one `hyview.Point` at a time. This is
+    far slower than `geogen`, which yields the same geometry.
+
     Parameters
     ----------
     kwargs : **Any
@@ -153,7 +183,28 @@ def geogen(**kwargs):
     for k, v in DEFAULTS.items():
         kwargs.setdefault(k, v)
 
-    attributes = [
+    attributes = get_attributes()
+
+    data = load_data()
+
+    for chan in channels:
+        bytime = defaultdict(list)
+        for point in pointgen(chan, data=data, **kwargs):
+            bytime[point.attrs['time']].append(point)
+        for frame, points in bytime.items():
+            geo = hyview.Geometry(attributes=attributes, points=points)
+            yield geo, get_name(chan, kwargs), frame
+
+
+def get_attributes():
+    """
+    Get the attribute definitions of the mitosis geometry.
+
+    Returns
+    -------
+    List[hyview.AttributeDefinition]
+    """
+    return [
         hyview.AttributeDefinition(
             name='Cd', type='Point', default=(0.1, 0.1, 0.1)),
         hyview.AttributeDefinition(
@@ -166,11 +217,167 @@ def geogen(**kwargs):
             name='microtubles', type='Point', default=0.0),
     ]
 
-    for chan in channels:
-        bytime = defaultdict(list)
-        for point in pointgen(chan, **kwargs):
-            bytime[point.attrs['time']].append(point)
-        for frame, points in bytime.items():
-            geo = hyview.Geometry(attributes=attributes, points=points)
-            yield geo, 'mitosis-{}-{}'.format(
-                chan, C4(kwargs)), frame
+
+def get_name(channel, kwargs):
+    """
+    Get the name of the geometry of a channel.
+
+    Parameters
+    ----------
+    channel : str
+    kwargs : Dict[str, Any]
+
+    Returns
+    -------
+    str
+    """
+    from hyview.c4 import C4
+    return 'mitosis-{}-{}'.format(channel, C4(kwargs))
+
+
+def framegen(data, frame, colors=None, **kwargs):
+    """
+    Vectorized equivalent of `pointgen` for a single frame.
+
+    Rows are normalized by the range of both channels within the row and
+    thresholded with masks. Rows without any range are all zero.
+
+    Parameters
+    ----------
+    data : numpy.array
+        4D array of a single frame (z, y, x, channels).
+    frame : int
+    colors : Optional[Dict[str, Tuple[float, float, float]]]
+        Color of each channel when colorizing.
+    kwargs : **Any
+        channels : Iterable[str]
+        znth : Optional[int]
+        nth : Optional[int]
+        zmult : int
+        minimum : float
+
+    Returns
+    -------
+    Dict[str, hyview.Geometry]
+        Geometry of each channel.
+    """
+    import numpy
+
+    channels = kwargs.get('channels', DEFAULTS['channels'])
+    znth = kwargs.get('znth', DEFAULTS['znth'])
+    nth = kwargs.get('nth', DEFAULTS['nth'])
+    zmult = kwargs.get('zmult', DEFAULTS['zmult'])
+    minimum = kwargs.get('minimum', DEFAULTS['minimum'])
+
+    data = numpy.asarray(data)[::znth or 1, ::nth or 1]
+
+    # The range of each row is taken before skipping along x.
+    low = data.min(axis=(2, 3)).astype(numpy.float64)[..., numpy.newaxis]
+    span = data.max(axis=(2, 3)) - low[..., 0]
+    span = span[..., numpy.newaxis]
+
+    data = data[:, :, ::nth or 1]
+
+    values = {}
+    for i, name in enumerate(CHANNELS):
+        values[name] = numpy.divide(
+            data[..., i] - low, span,
+            out=numpy.zeros(data.shape[:3], dtype=numpy.float64),
+            where=span > 0)
+
+    result = {}
+    for channel in channels:
+        value = values[channel]
+        if minimum:
+            mask = value >= minimum
+        else:
+            mask = numpy.ones(value.shape, dtype=bool)
+
+        z, y, x = numpy.nonzero(mask)
+        value = value[mask]
+
+        positions = numpy.empty((len(x), 3), dtype=numpy.float64)
+        positions[:, 0] = x
+        positions[:, 1] = y
+        positions[:, 2] = z * zmult
+
+        if colors:
+            color = numpy.empty((len(x), 3), dtype=numpy.float64)
+            color[:] = colors[channel]
+        else:
+            color = numpy.repeat(value[:, numpy.newaxis], 3, axis=1)
+
+        result[channel] = hyview.Geometry.from_arrays(
+            positions,
+            columns={
+                'Cd': color,
+                'Alpha': value,
+                'time': numpy.full(len(x), frame),
+                channel: value,
+            },
+            attributes=get_attributes())
+
+    return result
+
+
+def _framegen(args):
+    """
+    Process pool entry point for `framegen`.
+
+    Parameters
+    ----------
+    args : Tuple[numpy.array, int, Optional[Dict[str, Tuple[float, float, float]]], Dict[str, Any]]
+
+    Returns
+    -------
+    Tuple[int, Dict[str, hyview.Geometry]]
+    """
+    data, frame, colors, kwargs = args
+    return frame, framegen(data, frame, colors=colors, **kwargs)
+
+
+def geogen(processes=None, **kwargs):
+    """
+    Generate the geometry of each frame. The dataset is loaded once and each
+    frame is prepared within a process pool. Frames are yielded as soon as
+    they're ready, so not necessarily in order.
+
+    Parameters
+    ----------
+    processes : Optional[int]
+        Number of processes to use. Defaults to the number of cpus.
+    kwargs : **Any
+        channels : Iterable[str]
+
+    Returns
+    -------
+    Iterator[Tuple[hyview.Geometry, str, int]]
+    """
+    import multiprocessing
+    from hyview_samples.utils import ColorGenerator
+
+    channels = kwargs.get('channels', DEFAULTS['channels'])
+
+    # Do this for the hash!
+    for k, v in DEFAULTS.items():
+        kwargs.setdefault(k, v)
+
+    colors = None
+    if kwargs['colorize']:
+        colors = {x: ColorGenerator().get(x) for x in channels}
+
+    data = load_data()
+    size = kwargs['size']
+    if size:
+        data = data[:size]
+
+    tasks = ((x, i + 1, colors, kwargs) for i, x in enumerate(data))
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for frame, geos in pool.imap_unordered(_framegen, tasks):
+            for channel in channels:
+                yield geos[channel], get_name(channel, kwargs), frame
+    finally:
+        pool.terminate()
+        pool.join()
@@ -4,6 +4,7 @@ Sample module showcasing uses displaying datasets from neurons.
 NOTE: Some thirdparty modules may be required to use some of these methods.
 """
 import os
+import functools
 from collections import defaultdict
 
 import hyview
@@ -48,20 +49,20 @@ def sample(filters=None, minimum=2000000, nth=8, mesh=True):
 
     _logger.info('Filtering data...')
 
-    for name, geo in geogen(
-            images, labels,
-            group='label',
-            colorize=True,
-            filters=filters,
-            size=0, znth=0, nth=nth, zmult=10):
+    geos = list(streamgen(
+        images, labels,
+        colorize=True,
+        filters=filters,
+        size=0, znth=0, nth=nth, zmult=10))
 
-        _logger.info('Sending {!r} to Houdini...'.format(name))
+    _logger.info('Sending {} geos to Houdini...'.format(len(geos)))
 
-        hyview.build(geo, name=name)
+    for future in hyview.build_many((name, geo, 1) for name, geo in geos):
+        future.get()
 
     if mesh:
         _logger.info('Meshing all geo...')
-        hyview.hy.impl.mesh_all(particlesep=8)
+        hyview.hy.impl.mesh_all({'particlesep': 8})
 
 
 def load_data_from_h5py(path, *keys):
@@ -136,13 +137,96 @@ def iterfilter(images, labels, size=None, znth=None, nth=None, zmult=10):
                 yield int(label), float(x), float(y), float(z * zmult), int(c)
 
 
+def iter_chunk_slices(dataset, size=None, znth=None, nth=None):
+    """
+    Iterate over a volume by its chunk layout, so each chunk of a h5py dataset
+    is only read once. Volumes that aren't chunked are read a z slice at a
+    time.
+
+    Parameters
+    ----------
+    dataset : Union[numpy.array, h5py.Dataset]
+    size : Optional[int]
+        Specify the number of z slices.
+    znth : Optional[int]
+        Specify how many of each z slice to use.
+    nth : Optional[int]
+        Filters the points to every `nth`.
+
+    Returns
+    -------
+    Iterator[Tuple[slice, slice, slice]]
+        Strided slices of each chunk.
+    """
+    import itertools
+
+    shape = list(dataset.shape)
+    if size:
+        shape[0] = min(shape[0], size)
+
+    steps = (znth or 1, nth or 1, nth or 1)
+    chunks = getattr(dataset, 'chunks', None) or (1,) + tuple(shape[1:])
+
+    axes = []
+    for length, chunk, step in zip(shape, chunks, steps):
+        axis = []
+        for start in range(0, length, chunk):
+            stop = min(start + chunk, length)
+            # First index within the chunk on the stride.
+            first = -(-start // step) * step
+            if first < stop:
+                axis.append(slice(first, stop, step))
+        axes.append(axis)
+
+    return itertools.product(*axes)
+
+
+def count_labels(labels, filters=None, size=None, znth=3, nth=8):
+    """
+    Count the voxels of each label, reading one chunk at a time.
+
+    Parameters
+    ----------
+    labels : Union[numpy.array, h5py.Dataset]
+    filters : Optional[List[int]]
+        Only count labels within this list.
+    size : Optional[int]
+    znth : Optional[int]
+    nth : Optional[int]
+        See `iter_chunk_slices`.
+
+    Returns
+    -------
+    Tuple[Dict[int, int], Dict[int, List[int]]]
+        The count of each label in order of the chunk they first appear in,
+        and the indices of the chunks each label appears in.
+    """
+    import numpy
+    from collections import OrderedDict
+
+    counts = OrderedDict()
+    chunks = defaultdict(list)
+
+    slices = iter_chunk_slices(labels, size=size, znth=znth, nth=nth)
+    for i, s in enumerate(slices):
+        block = numpy.asarray(labels[s])
+        if filters:
+            block = block[numpy.isin(block, numpy.asarray(filters))]
+        items, n = numpy.unique(block, return_counts=True)
+        for item, count in zip(items.tolist(), n.tolist()):
+            counts[item] = counts.get(item, 0) + count
+            chunks[item].append(i)
+
+    return counts, chunks
+
+
 def iter_unique_by_count(ar, minimum=None, maximum=None, return_counts=False):
     """
-    Filter an array by unique count.
+    Filter an array by unique count. The array is read one chunk at a time.
 
     Parameters
     ----------
-    ar : numpy.array
+    ar : Union[numpy.array, h5py.Dataset]
     minimum : Optional[int]
     maximum : Optional[int]
     return_counts : bool
@@ -151,9 +235,9 @@ def iter_unique_by_count(ar, minimum=None, maximum=None, return_counts=False):
     -------
     Union[Iterator[Any], Iterator[Tuple[Any, int]]]
     """
-    import numpy
+    counts, _ = count_labels(ar, znth=None, nth=None)
 
-    for item, count in zip(*numpy.unique(ar, return_counts=True)):
+    for item, count in sorted(counts.items()):
         if minimum is not None and count < minimum:
             continue
         if maximum is not None and count > maximum:
@@ -218,9 +302,31 @@ def pointgen(images, labels, colorize=False, filters=None, size=None, znth=3,
         )
 
 
-def geogen(images, labels, group=None, **kwargs):
+def get_attributes():
     """
-    Helper to generate abstract data representations of the test neuron data.
+    Get the attribute definitions of the neuron geometry.
+
+    Returns
+    -------
+    List[hyview.AttributeDefinition]
+    """
+    return [
+        hyview.AttributeDefinition(
+            name='Cd', type='Point', default=(0.1, 0.1, 0.1)),
+        hyview.AttributeDefinition(
+            name='Alpha', type='Point', default=1.0),
+        hyview.AttributeDefinition(
+            name='luminance', type='Point', default=1),
+        hyview.AttributeDefinition(
+            name='label', type='Point', default=-1),
+    ]
+
+
+def geogen_points(images, labels, group=None, **kwargs):
+    """
+    Helper to generate abstract data representations of the test neuron data
+    one `hyview.Point` at a time. This is far slower than `geogen`, which
+    yields the same geometry.
 
     Parameters
     ----------
@@ -253,16 +359,7 @@ def geogen(images, labels, group=None, **kwargs):
             else:
                 raise NotImplementedError('Unknown group {!r}'.format(group))
 
-    attributes = [
-        hyview.AttributeDefinition(
-            name='Cd', type='Point', default=(0.1, 0.1, 0.1)),
-        hyview.AttributeDefinition(
-            name='Alpha', type='Point', default=1.0),
-        hyview.AttributeDefinition(
-            name='luminance', type='Point', default=1),
-        hyview.AttributeDefinition(
-            name='label', type='Point', default=-1),
-    ]
+    attributes = get_attributes()
 
     for k, v in points.items():
         geo = hyview.Geometry(attributes=attributes, points=v)
@@ -273,6 +370,249 @@ def geogen(images, labels, group=None, **kwargs):
         yield name, geo
 
 
+def columngen(images, labels, colorize=False, filters=None, size=None,
+              znth=3, nth=8, zmult=10):
+    """
+    Vectorized equivalent of `pointgen` which produces columns rather than
+    points. Points are in the same order and colors are assigned in the
+    same order.
+
+    Parameters
+    ----------
+    images : numpy.array
+    labels : numpy.array
+    colorize : bool
+        Colorize the data per-label.
+    filters : Optional[List[int]]
+        Filters the data to only those that have labels within this list.
+    size : Optional[int]
+        Specify the number of z slices.
+    znth : Optional[int]
+        Specify how many of each z slice to use.
+    nth : Optional[int]
+        Filters the points to every `nth`.
+    zmult : int
+        Scale multiplier for z.
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, Dict[str, numpy.ndarray]]
+        Positions and point attribute columns.
+    """
+    import numpy
+    from hyview_samples.utils import ColorGenerator
+
+    if size:
+        images = images[:size]
+        labels = labels[:size]
+
+    zstep = znth or 1
+    step = nth or 1
+
+    # Strided slicing also only reads what's needed from h5py datasets.
+    images = numpy.asarray(images[::zstep, ::step, ::step])
+    labels = numpy.asarray(labels[::zstep, ::step, ::step])
+
+    if filters:
+        mask = numpy.isin(labels, numpy.asarray(filters))
+    else:
+        mask = numpy.ones(labels.shape, dtype=bool)
+
+    z, y, x = numpy.nonzero(mask)
+
+    positions = numpy.empty((len(x), 3), dtype=numpy.float64)
+    positions[:, 0] = x * step
+    positions[:, 1] = y * step
+    positions[:, 2] = z * zstep * zmult
+
+    luminance = images[mask]
+    label = labels[mask]
+    alpha = luminance.astype(numpy.float64) / 255.0
+
+    if colorize:
+        colors = ColorGenerator()
+        unique, first, inverse = numpy.unique(
+            label, return_index=True, return_inverse=True)
+        palette = numpy.empty((len(unique), 3), dtype=numpy.float64)
+        # Colors are handed out in order of appearance.
+        for i in numpy.argsort(first, kind='stable'):
+            palette[i] = colors.get(int(unique[i]))
+        color = palette[inverse.reshape(-1)]
+    else:
+        color = numpy.repeat(alpha[:, numpy.newaxis], 3, axis=1)
+
+    return positions, {
+        'label': label,
+        'luminance': luminance,
+        'Cd': color,
+        'Alpha': alpha,
+    }
+
+
+def geogen(images, labels, group=None, **kwargs):
+    """
+    Helper to generate abstract data representations of the test neuron data.
+
+    Parameters
+    ----------
+    images : numpy.array
+    labels : numpy.array
+    group : Optional[str]
+        {'label', 'z'}
+        Whether geo is generated by label, by z slice or other.
+    kwargs : **Any
+        See `columngen`
+
+    Returns
+    -------
+    Iterator[Tuple[str, hyview.Geometry]]
+    """
+    import numpy
+    from hyview.c4 import C4
+
+    attributes = get_attributes()
+
+    positions, columns = columngen(images, labels, **kwargs)
+
+    if group is None:
+        yield str(C4(kwargs)), hyview.Geometry.from_arrays(
+            positions, columns=columns, attributes=attributes)
+        return
+    elif group == 'label':
+        keys = columns['label']
+    elif group == 'z':
+        keys = positions[:, 2]
+    else:
+        raise NotImplementedError('Unknown group {!r}'.format(group))
+
+    unique, first, inverse, counts = numpy.unique(
+        keys, return_index=True, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    # Indices of the points sorted by group, keeping the point order within
+    # each group.
+    order = numpy.argsort(inverse, kind='stable')
+    offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+    # Groups are yielded in order of appearance.
+    for i in numpy.argsort(first, kind='stable'):
+        k = unique[i].item()
+        indices = order[offsets[i]:offsets[i + 1]]
+        geo = hyview.Geometry.from_arrays(
+            positions[indices],
+            columns={name: v[indices] for name, v in columns.items()},
+            attributes=attributes)
+        yield '{}-{}-{}'.format(group, k, C4(kwargs)), geo
+
+
+def _source_key(dataset):
+    """
+    Something to identify the contents of a dataset by in a C4 id without
+    reading it.
+
+    Parameters
+    ----------
+    dataset : Union[numpy.array, h5py.Dataset]
+
+    Returns
+    -------
+    Any
+    """
+    filename = getattr(getattr(dataset, 'file', None), 'filename', None)
+    if filename:
+        # Hashing the file itself means reading all of it, so it's
+        # identified by its path, size and modification time instead. The
+        # path is split as C4 would otherwise hash the file it names.
+        stat = os.stat(filename)
+        return (os.path.realpath(filename).split(os.sep),
+                stat.st_size, stat.st_mtime, dataset.name)
+    return dataset
+
+
+def streamgen(images, labels, colorize=False, filters=None, size=None,
+              znth=3, nth=8, zmult=10):
+    """
+    Out-of-core equivalent of `geogen` grouped by label, for volumes larger
+    than memory.
+
+    The labels are counted up front one chunk at a time. The geometry of each
+    label is then only read as it is sent to Houdini, one chunk at a time,
+    reading only the chunks the label appears in.
+
+    Parameters
+    ----------
+    images : Union[numpy.array, h5py.Dataset]
+    labels : Union[numpy.array, h5py.Dataset]
+    colorize : bool
+        Colorize the data per-label.
+    filters : Optional[List[int]]
+        Filters the data to only those that have labels within this list.
+    size : Optional[int]
+        Specify the number of z slices.
+    znth : Optional[int]
+        Specify how many of each z slice to use.
+    nth : Optional[int]
+        Filters the points to every `nth`.
+    zmult : int
+        Scale multiplier for z.
+
+    Returns
+    -------
+    Iterator[Tuple[str, hyview.GeometryStream]]
+    """
+    import numpy
+    from hyview.c4 import C4
+    from hyview_samples.utils import ColorGenerator
+
+    kwargs = dict(colorize=colorize, filters=filters, size=size, znth=znth,
+                  nth=nth, zmult=zmult)
+
+    slices = list(iter_chunk_slices(labels, size=size, znth=znth, nth=nth))
+    counts, chunks = count_labels(
+        labels, filters=filters, size=size, znth=znth, nth=nth)
+
+    attributes = get_attributes()
+    colors = ColorGenerator()
+    # Hashed once, as for arrays this reads both volumes.
+    source = C4(_source_key(images), _source_key(labels))
+    params = C4(kwargs)
+
+    def blocks(label, color):
+        for i in chunks[label]:
+            s = slices[i]
+            mask = numpy.asarray(labels[s]) == label
+            z, y, x = numpy.nonzero(mask)
+
+            positions = numpy.empty((len(x), 3), dtype=numpy.float64)
+            positions[:, 0] = s[2].start + x * s[2].step
+            positions[:, 1] = s[1].start + y * s[1].step
+            positions[:, 2] = (s[0].start + z * s[0].step) * zmult
+
+            luminance = numpy.asarray(images[s])[mask]
+            alpha = luminance.astype(numpy.float64) / 255.0
+            if color is None:
+                cd = numpy.repeat(alpha[:, numpy.newaxis], 3, axis=1)
+            else:
+                cd = numpy.empty((len(x), 3), dtype=numpy.float64)
+                cd[:] = color
+
+            yield positions, {
+                'label': numpy.full(len(x), label),
+                'luminance': luminance,
+                'Cd': cd,
+                'Alpha': alpha,
+            }
+
+    for label, count in counts.items():
+        color = colors.get(label) if colorize else None
+        geo = hyview.GeometryStream(
+            attributes=attributes,
+            count=count,
+            blocks=functools.partial(blocks, label, color),
+            key=str(C4(source, label, params)))
+        yield 'label-{}-{}'.format(label, params), geo
+
+
 def build_neuron_sample(images, labels, **kwargs):
     """
     Helper to visualize the neuron dataset.
@@ -285,8 +625,10 @@ def build_neuron_sample(images, labels, **kwargs):
         See `geogen`.
     """
     kwargs.setdefault('group', 'z')
-    for name, geo in geogen(images, labels, **kwargs):
-        hyview.build(geo, name=name)
+    futures = hyview.build_many(
+        (name, geo, 1) for name, geo in geogen(images, labels, **kwargs))
+    for future in futures:
+        future.get()
 
 
 def build_slice(nth=3):
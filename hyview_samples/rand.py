@@ -60,4 +60,4 @@ def sample(size=200):
     size : int
         Number of points.
     """
-    hyview.build(get_geo(size=size))
+    hyview.build(get_geo(size=size)).get()